@@ -0,0 +1,8 @@
+from src.infrastructure.logging_config import configure_logging
+from src.interface.asgi_app import create_asgi_app
+
+# Setup logging for the whole application (queue-backed; see CATALOG_LOG_* in the README)
+configure_logging()
+
+# ASGI entry point: hypercorn asgi:app --bind 0.0.0.0:5000
+app = create_asgi_app()
@@ -0,0 +1,254 @@
+"""
+Load benchmark: drives the catalog API at a fixed concurrency and reports latency percentiles
+and throughput per scenario as JSON, so runs can be compared across commits.
+
+The synthetic catalog (benchmarks/catalog_data.py) is loaded into a dedicated database of a local
+mongod, or into the in-process storage backend with --backend memory (no database needed). Requests
+go through the Flask app in-process, or to a running server with --url.
+
+    python benchmarks/bench_api.py --backend memory --services 5000 --output before.json
+    python benchmarks/bench_api.py --backend memory --services 5000 --compare before.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.catalog_data import CATEGORIES, TAGS, generate_services, generate_vendors, search_terms  # noqa: E402
+
+# (method, path, json body or None)
+Request = Tuple[str, str, Optional[Any]]
+
+BULK_BATCH = 50
+
+
+def build_scenarios(service_count: int, vendor_ids: List[str], seed: int) -> Dict[str, Callable[[random.Random], Request]]:
+    """Request factories per scenario; each is called with the worker's private RNG."""
+    terms = search_terms()
+    next_bulk_id = itertools.count(service_count + 1_000_000)
+    bulk_lock = threading.Lock()
+
+    def bulk_create(rng: random.Random) -> Request:
+        with bulk_lock:
+            start = next(next_bulk_id) * BULK_BATCH
+        return "POST", "/services/bulk", list(generate_services(BULK_BATCH, vendor_ids, seed, start=start))
+
+    return {
+        "list": lambda rng: ("GET", f"/services?page={rng.randrange(1, 11)}&pageSize=20&total=estimate", None),
+        "list_cursor": lambda rng: ("GET", "/services?pageSize=20&sort_by=base_price&cursor=", None),
+        "detail": lambda rng: ("GET", f"/services/svc-{rng.randrange(service_count):07d}", None),
+        "detail_sparse": lambda rng: ("GET", f"/services/svc-{rng.randrange(service_count):07d}?fields=name,base_price&lang=fr&expand=", None),
+        "filter": lambda rng: ("GET", f"/services?category={rng.choice(CATEGORIES)}&tags={rng.choice(TAGS)}"
+                                      f"&min_price={rng.randrange(0, 200000, 1000)}&pageSize=20", None),
+        "search": lambda rng: ("GET", f"/services/search?q={rng.choice(terms)}&pageSize=20", None),
+        "suggest": lambda rng: ("GET", f"/services/suggest?q={rng.choice(terms)[:rng.randrange(1, 5)]}&limit=10", None),
+        "vendors": lambda rng: ("GET", "/vendors", None),
+        "bulk_create": bulk_create,
+    }
+
+
+def load_catalog(db, services: int, vendors: int, seed: int, chunk: int = 1000) -> List[str]:
+    """Replaces the services/vendors collections of the benchmark database with the synthetic catalog."""
+    vendor_docs = generate_vendors(vendors, seed)
+    vendor_ids = [v["id"] for v in vendor_docs]
+    db.drop_collection("vendors")
+    db.drop_collection("services")
+    db.vendors.insert_many(vendor_docs)
+    batch = []
+    for doc in generate_services(services, vendor_ids, seed):
+        batch.append(doc)
+        if len(batch) == chunk:
+            db.services.insert_many(batch)
+            batch = []
+    if batch:
+        db.services.insert_many(batch)
+    return vendor_ids
+
+
+class InProcessTarget:
+    """Sends requests through the Flask test client (one client per worker thread)."""
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def __call__(self, method: str, path: str, body: Optional[Any]) -> int:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+
+class HttpTarget:
+    """Sends requests to a running server."""
+
+    def __init__(self, base_url: str):
+        self._base_url = base_url.rstrip("/")
+
+    def __call__(self, method: str, path: str, body: Optional[Any]) -> int:
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self._base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"} if data else {})
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_scenario(target: Callable, factory: Callable[[random.Random], Request], requests: int,
+                 concurrency: int, warmup: int, seed: int) -> Dict[str, Any]:
+    counter = itertools.count()
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def worker(w: int, total: int, record: bool) -> None:
+        rng = random.Random(f"worker-{seed}-{w}-{record}")
+        while next(counter) < total:
+            method, path, body = factory(rng)
+            start = time.perf_counter()
+            try:
+                status = target(method, path, body)
+            except Exception:
+                status = 599
+            elapsed = time.perf_counter() - start
+            if record:
+                latencies[w].append(elapsed * 1000)
+                if status >= 400:
+                    errors[w] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if warmup:
+            list(pool.map(lambda w: worker(w, warmup, False), range(concurrency)))
+            counter = itertools.count()
+        started = time.perf_counter()
+        list(pool.map(lambda w: worker(w, requests, True), range(concurrency)))
+        wall = time.perf_counter() - started
+
+    samples = sorted(itertools.chain.from_iterable(latencies))
+    return {
+        "requests": len(samples),
+        "errors": sum(errors),
+        "rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_target(args) -> Tuple[Callable, List[str]]:
+    """Loads the catalog and returns the request target; startup tasks run only after the data is in place."""
+    if args.url:
+        # The server owns its data; only the ids the scenarios address are needed here
+        return HttpTarget(args.url), [v["id"] for v in generate_vendors(args.vendors, args.seed)]
+
+    os.environ["MONGO_DB_NAME"] = args.db_name
+    os.environ.setdefault("CATALOG_LOG_LEVEL", "WARNING")
+    from main import create_app
+    app = create_app({"STORAGE_BACKEND": args.backend})
+    vendor_ids = load_catalog(app.extensions["storage"].database(args.db_name), args.services, args.vendors, args.seed)
+    app.extensions["catalog_startup"]()  # indexes and the search index over the loaded catalog
+    return InProcessTarget(app), vendor_ids
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\n{'scenario':<16}{'rps':>10}{'Δ rps':>9}{'p95 ms':>10}{'Δ p95':>9}")
+    for name, r in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            print(f"{name:<16}{r['rps']:>10}{'-':>9}{r['p95_ms']:>10}{'-':>9}")
+            continue
+        d_rps = (r["rps"] / base["rps"] - 1) * 100 if base["rps"] else 0.0
+        d_p95 = (r["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+        print(f"{name:<16}{r['rps']:>10}{d_rps:>+8.1f}%{r['p95_ms']:>10}{d_p95:>+8.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("mongo", "memory"), default="mongo",
+                        help="mongo: MONGO_URL (default localhost); memory: in-process storage backend")
+    parser.add_argument("--db-name", default="catalog_benchmark", help="database to (re)create; never the catalog database")
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--services", type=int, default=5000)
+    parser.add_argument("--vendors", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", default="list,list_cursor,detail,detail_sparse,filter,search,suggest,vendors,bulk_create")
+    parser.add_argument("--output", default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="JSON report of an earlier run to print deltas against")
+    args = parser.parse_args()
+
+    target, vendor_ids = prepare_target(args)
+    scenarios = build_scenarios(args.services, vendor_ids, args.seed)
+    unknown = [s for s in args.scenarios.split(",") if s not in scenarios]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(scenarios)})")
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "http" if args.url else args.backend,
+            "services": args.services,
+            "vendors": args.vendors,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios.split(","):
+        report["scenarios"][name] = run_scenario(target, scenarios[name], args.requests, args.concurrency, args.warmup, args.seed)
+        print(f"{name}: {report['scenarios'][name]}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Micro-benchmark: hydrating Service documents into domain objects and back.
+
+Compares the generated codec over the slotted dataclasses (src/domain/service/codec.py) with
+the previous approach: plain (__dict__) dataclasses built through **kwargs from a mutated
+document, and to_dict() via __dict__.
+
+    python benchmarks/bench_domain_model.py [--count 20000] [--repeat 5]
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.domain.service import value_objects  # noqa: E402
+from src.domain.service.codec import decode_service, encode_service  # noqa: E402
+from src.domain.service.service import Service  # noqa: E402
+
+
+def _unslotted(cls):
+    """Rebuilds a slotted dataclass as a plain one, i.e. the class as it was declared before."""
+    fields = []
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            fields.append((f.name, f.type, dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            fields.append((f.name, f.type, dataclasses.field(default_factory=f.default_factory)))
+        else:
+            fields.append((f.name, f.type))
+    return dataclasses.make_dataclass(cls.__name__, fields)
+
+
+LegacyService = _unslotted(Service)
+LegacyPricingTier = _unslotted(value_objects.PricingTier)
+LegacyServiceAttribute = _unslotted(value_objects.ServiceAttribute)
+LegacyMediaReference = _unslotted(value_objects.MediaReference)
+LegacyPricingRule = _unslotted(value_objects.PricingRule)
+LegacyAvailabilityRule = _unslotted(value_objects.AvailabilityRule)
+
+
+def legacy_decode(doc):
+    """The former ServiceRepository._doc_to_service."""
+    doc['pricing_tiers'] = [LegacyPricingTier(**p) for p in doc.get('pricing_tiers', [])]
+    doc['attributes'] = [LegacyServiceAttribute(**a) for a in doc.get('attributes', [])]
+    doc['images'] = [LegacyMediaReference(**i) for i in doc.get('images', [])]
+    doc['videos'] = [LegacyMediaReference(**v) for v in doc.get('videos', [])]
+    doc['pricing_rules'] = [LegacyPricingRule(**p) for p in doc.get('pricing_rules', [])]
+    doc['availability_rules'] = [LegacyAvailabilityRule(**a) for a in doc.get('availability_rules', [])]
+    if '_id' in doc:
+        del doc['_id']
+    if isinstance(doc.get('created_at'), str):
+        doc['created_at'] = datetime.fromisoformat(doc['created_at'])
+    if isinstance(doc.get('updated_at'), str):
+        doc['updated_at'] = datetime.fromisoformat(doc['updated_at'])
+    return LegacyService(**doc)
+
+
+def legacy_encode(service):
+    """The former Service.to_dict."""
+    data = {k: v for k, v in service.__dict__.items() if not k.startswith('_')}
+    data['pricing_tiers'] = [tier.__dict__ for tier in service.pricing_tiers]
+    data['attributes'] = [attr.__dict__ for attr in service.attributes]
+    data['images'] = [img.__dict__ for img in service.images]
+    data['videos'] = [vid.__dict__ for vid in service.videos]
+    data['pricing_rules'] = [rule.__dict__ for rule in service.pricing_rules]
+    data['availability_rules'] = [rule.__dict__ for rule in service.availability_rules]
+    if isinstance(data['created_at'], datetime):
+        data['created_at'] = data['created_at'].isoformat()
+    if isinstance(data['updated_at'], datetime):
+        data['updated_at'] = data['updated_at'].isoformat()
+    return data
+
+
+def make_document(i: int) -> dict:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat()
+    return {
+        "id": f"svc-{i}",
+        "name": {"en": f"Service {i}", "fr": f"Service {i}"},
+        "description": {"en": "Description", "fr": "Description"},
+        "category": "venue",
+        "base_price": float(i % 500),
+        "vendor_id": f"vendor-{i % 100}",
+        "pricing_tiers": [{"min_quantity": q, "price": 100 - q, "currency": "INR"} for q in (1, 10, 50)],
+        "attributes": [{"name": "capacity", "value": i % 300}, {"name": "parking", "value": True}],
+        "images": [{"url": f"https://cdn.example.com/{i}/{n}.jpg", "type": "image"} for n in range(3)],
+        "tags": ["wedding", "hall"],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def _memory_per_object(build, count: int) -> float:
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def run(count: int, repeat: int) -> dict:
+    docs = [make_document(i) for i in range(count)]
+    legacy_inputs = [[dict(d) for d in docs] for _ in range(repeat + 2)]  # legacy decoding mutates its input
+
+    results = {}
+    inputs = iter(legacy_inputs)
+    legacy_objects = [legacy_decode(d) for d in next(inputs)]
+    results["legacy"] = {
+        "decode_us": _best_time(lambda: [legacy_decode(d) for d in next(inputs)], repeat) / count * 1e6,
+        "encode_us": _best_time(lambda: [legacy_encode(s) for s in legacy_objects], repeat) / count * 1e6,
+        "bytes_per_object": _memory_per_object(lambda: [legacy_decode(d) for d in next(inputs)], count),
+    }
+    objects = [decode_service(d) for d in docs]
+    results["slotted"] = {
+        "decode_us": _best_time(lambda: [decode_service(d) for d in docs], repeat) / count * 1e6,
+        "encode_us": _best_time(lambda: [encode_service(s) for s in objects], repeat) / count * 1e6,
+        "bytes_per_object": _memory_per_object(lambda: [decode_service(d) for d in docs], count),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    results = run(args.count, args.repeat)
+    print(f"{'model':<10}{'decode us/obj':>16}{'encode us/obj':>16}{'bytes/obj':>12}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['decode_us']:>16.2f}{r['encode_us']:>16.2f}{r['bytes_per_object']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
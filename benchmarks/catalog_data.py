@@ -0,0 +1,146 @@
+"""
+Synthetic catalog generator for the benchmarks.
+
+Produces Service and Vendor documents shaped like production data (localized names, pricing tiers
+and rules, availability rules, attributes, media, tags). The output is a pure function of the seed,
+so two runs on different commits load the same catalog.
+
+    python benchmarks/catalog_data.py --services 10000 --vendors 200 > catalog.ndjson
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+CATEGORIES = ("venue", "catering", "decor", "photography", "music", "makeup", "transport", "invitations")
+LANGS = ("en", "fr", "hi")
+ADJECTIVES = ("Royal", "Grand", "Classic", "Modern", "Elegant", "Rustic", "Golden", "Premium", "Cozy", "Garden")
+NOUNS = {
+    "venue": ("Hall", "Lawn", "Banquet", "Terrace", "Ballroom"),
+    "catering": ("Buffet", "Feast", "Kitchen", "Thali", "Canapes"),
+    "decor": ("Florals", "Mandap", "Lighting", "Drapes", "Centrepieces"),
+    "photography": ("Studio", "Portraits", "Candids", "Films", "Album"),
+    "music": ("Band", "DJ", "Quartet", "Sangeet", "Dhol"),
+    "makeup": ("Bridal Look", "Mehendi", "Styling", "Glam", "Hair"),
+    "transport": ("Vintage Car", "Shuttle", "Horse Carriage", "Limo", "Coach"),
+    "invitations": ("Cards", "E-Invites", "Boxes", "Scrolls", "Stationery"),
+}
+TAGS = ("wedding", "birthday", "corporate", "outdoor", "indoor", "budget", "luxury", "vegan", "eco", "night")
+LOCATIONS = ("mumbai", "delhi", "bengaluru", "pune", "jaipur", "goa", "chennai", "kolkata")
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _localized(text: str) -> Dict[str, str]:
+    return {lang: text if lang == "en" else f"{text} ({lang})" for lang in LANGS}
+
+
+def _media(rng: random.Random, kind: str, owner: str, n: int) -> List[Dict[str, Any]]:
+    ext = "jpg" if kind == "image" else "mp4"
+    return [{"url": f"https://cdn.example.com/{owner}/{kind}-{k}.{ext}", "type": kind,
+             "alt_text": _localized(f"{owner} {kind} {k}")} for k in range(n)]
+
+
+def make_vendor(i: int, rng: random.Random) -> Dict[str, Any]:
+    vendor_id = f"vendor-{i:05d}"
+    created = EPOCH + timedelta(minutes=rng.randrange(500000))
+    return {
+        "id": vendor_id,
+        "name": f"{rng.choice(ADJECTIVES)} Events {i}",
+        "contact": {"email": f"contact{i}@vendor.example.com", "phone": f"+91-98{i:08d}",
+                    "address": {"city": rng.choice(LOCATIONS).title(), "country": "IN"}},
+        "rating": {"average": round(rng.uniform(2.5, 5.0), 2), "count": rng.randrange(0, 2000),
+                   "breakdown": {str(s): rng.randrange(0, 400) for s in range(1, 6)}},
+        "status": "active",
+        "is_verified": rng.random() < 0.7,
+        "is_deleted": False,
+        "created_at": created.isoformat(),
+        "updated_at": created.isoformat(),
+        "logo": _media(rng, "image", vendor_id, 1)[0],
+        "cover_image": _media(rng, "image", f"{vendor_id}-cover", 1)[0],
+        "legal_name": f"Events {i} Private Limited",
+        "business_type": rng.choice(("company", "partnership", "proprietorship")),
+        "tax_id": f"GST{i:010d}",
+        "payment_terms": rng.choice(("net15", "net30", "advance")),
+    }
+
+
+def make_service(i: int, vendor_ids: List[str], rng: random.Random) -> Dict[str, Any]:
+    category = CATEGORIES[i % len(CATEGORIES)]
+    title = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS[category])} {i}"
+    base_price = float(rng.randrange(500, 500000, 50))
+    created = EPOCH + timedelta(minutes=rng.randrange(500000))
+    tiers = [{"min_quantity": q, "price": int(base_price * (1 - d)), "currency": "INR"}
+             for q, d in ((1, 0.0), (10, 0.05), (50, 0.12))[:rng.randrange(1, 4)]]
+    season_start = EPOCH + timedelta(days=rng.randrange(0, 300))
+    rules = [{"rule_type": "seasonal", "conditions": {"months": sorted(rng.sample(range(1, 13), 3))},
+              "price": round(base_price * 1.2, 2), "currency": "INR",
+              "valid_from": season_start.isoformat(), "valid_to": (season_start + timedelta(days=90)).isoformat()}]
+    if rng.random() < 0.3:
+        rules.append({"rule_type": "weekend", "conditions": {"days": ["sat", "sun"]},
+                      "price": round(base_price * 1.1, 2), "currency": "INR"})
+    on_sale = rng.random() < 0.15
+    return {
+        "id": f"svc-{i:07d}",
+        "name": _localized(title),
+        "description": _localized(f"{title}: {category} service for {rng.choice(TAGS)} events. " * 3),
+        "category": category,
+        "service_type": rng.choices(("atomic", "composite", "package"), (8, 1, 1))[0],
+        "parent_service_ids": [],
+        "related_service_ids": [f"svc-{rng.randrange(max(i, 1)):07d}" for _ in range(rng.randrange(0, 3))],
+        "base_price": base_price,
+        "currency": "INR",
+        "vendor_id": rng.choice(vendor_ids),
+        "pricing_tiers": tiers,
+        "pricing_rules": rules,
+        "availability_rules": [{"conditions": {"days": rng.sample(["mon", "tue", "wed", "thu", "fri", "sat", "sun"], 5)},
+                                "is_available": True}],
+        "is_on_sale": on_sale,
+        "sale_price": round(base_price * 0.9, 2) if on_sale else None,
+        "tags": rng.sample(TAGS, rng.randrange(1, 4)),
+        "metadata": {"source": "benchmark", "batch": i // 1000},
+        "attributes": [{"name": "capacity", "value": rng.randrange(10, 2000)},
+                       {"name": "parking", "value": rng.random() < 0.5},
+                       {"name": "highlights", "value": _localized("Free cancellation"), "localized": True}],
+        "status": "active",
+        "is_deleted": False,
+        "created_at": created.isoformat(),
+        "updated_at": created.isoformat(),
+        "available_locations": rng.sample(LOCATIONS, rng.randrange(1, 4)),
+        "images": _media(rng, "image", f"svc-{i}", rng.randrange(1, 6)),
+        "videos": _media(rng, "video", f"svc-{i}", rng.randrange(0, 2)),
+        "external_refs": {"erp": f"ERP-{i}"},
+    }
+
+
+def generate_vendors(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(f"vendors-{seed}")
+    return [make_vendor(i, rng) for i in range(count)]
+
+
+def generate_services(count: int, vendor_ids: List[str], seed: int = 42, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yields services start..start+count-1; each index always produces the same document for a seed."""
+    for i in range(start, start + count):
+        yield make_service(i, vendor_ids, random.Random(f"service-{seed}-{i}"))
+
+
+def search_terms() -> List[str]:
+    """Words that occur in generated names, for search scenarios."""
+    return [w.lower() for words in NOUNS.values() for w in words] + [a.lower() for a in ADJECTIVES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic catalog as NDJSON ({'collection', 'document'} lines).")
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--vendors", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    vendors = generate_vendors(args.vendors, args.seed)
+    for vendor in vendors:
+        print(json.dumps({"collection": "vendors", "document": vendor}))
+    for service in generate_services(args.services, [v["id"] for v in vendors], args.seed):
+        print(json.dumps({"collection": "services", "document": service}))
+
+
+if __name__ == "__main__":
+    main()
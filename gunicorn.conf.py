@@ -0,0 +1,54 @@
+"""
+Production serving: N pre-forked gunicorn workers, each with its own MongoDB clients, caches and search index
+(which follows the other workers' writes through the change feed, see CATALOG_SEARCH_SYNC_SECONDS).
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+from src.infrastructure.logging_config import configure_logging, shutdown_logging
+
+bind = os.getenv("CATALOG_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("CATALOG_WORKERS", str(multiprocessing.cpu_count())))
+# More than one thread selects the gthread worker, which overlaps requests waiting on MongoDB
+threads = int(os.getenv("CATALOG_THREADS", "4"))
+
+# Graceful restarts: on SIGHUP or SIGTERM (and when recycled after max_requests +/- jitter requests) a
+# worker stops accepting, finishes its in-flight requests within graceful_timeout and is replaced
+graceful_timeout = int(os.getenv("CATALOG_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("CATALOG_WORKER_TIMEOUT", "60"))
+max_requests = int(os.getenv("CATALOG_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("CATALOG_MAX_REQUESTS_JITTER", "0"))
+
+# By default every worker imports wsgi.py after the fork, so nothing is shared with the master. Building the
+# app does no I/O (MongoClients are created with connect=False and startup tasks wait for post_worker_init),
+# so with preload the master may build it once and share the code pages copy-on-write: clients that never
+# connected before the fork are safe to use in the child
+preload_app = os.getenv("CATALOG_PRELOAD_APP", "false").lower() == "true"
+
+# The app writes its own sampled access log
+accesslog = None
+
+
+def when_ready(server):
+    if os.getenv("CATALOG_STORAGE_BACKEND", "mongo").lower() == "memory" and workers > 1:
+        server.log.warning("The memory storage backend keeps a separate catalog in each of the %s workers", workers)
+    if float(os.getenv("CATALOG_SEARCH_SYNC_SECONDS", "2")) <= 0 and workers > 1:
+        server.log.warning("CATALOG_SEARCH_SYNC_SECONDS=0: the search index of each of the %s workers only sees its own writes", workers)
+
+
+def post_fork(server, worker):
+    # The master's log writer thread does not exist in the child: give the worker its own queue and writer
+    configure_logging()
+
+
+def post_worker_init(worker):
+    # Apply indexes, build the search index and start its sync before the worker accepts its first request
+    worker.wsgi.extensions["catalog_startup"]()
+
+
+def worker_exit(server, worker):
+    app = getattr(worker, "wsgi", None)
+    if app is not None:
+        app.extensions["storage"].close()
+    shutdown_logging()
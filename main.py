@@ -1,40 +1,157 @@
 import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+import click
+from pymongo import errors
 from flask import Flask
 from src.infrastructure.service_repository import ServiceRepository
 from src.infrastructure.vendor_repository import VendorRepository
 from src.infrastructure.search_indexer import SearchIndexer
+from src.infrastructure.mongo_connection import get_connection_manager
+from src.infrastructure.storage import create_backend
+from src.infrastructure.indexes import apply_indexes
+from src.infrastructure.cache import ChangeStreamInvalidator
 from src.application.catalog_service import CatalogService
 from src.application.search_service import SearchService
+from src.application.search_sync import SearchIndexSync
 from src.application.vendor_service import VendorService
+from src.application.change_feed_service import ChangeFeedService
 from src.interface.catalog_controller import create_catalog_controller
 from src.interface.search_controller import create_search_controller
 from src.interface.vendor_controller import create_vendor_controller
+from src.interface.change_controller import create_change_controller
+from src.interface.admin_controller import create_admin_controller
+from src.interface.json_provider import CatalogJSONProvider
+from src.interface.request_logging import install_request_logging
+from src.interface.metrics_controller import create_metrics_controller, install_http_metrics
+from src.interface.compression import install_compression
+from src.infrastructure.logging_config import configure_logging
 
-# Setup logging for the whole application
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+# Setup logging for the whole application (queue-backed; see CATALOG_LOG_* in the README)
+configure_logging()
 
-app = Flask(__name__)
 
-# Initialize Repositories
-service_repo = ServiceRepository()
-vendor_repo = VendorRepository()
-search_indexer = SearchIndexer()
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() == "true"
 
-# Initialize Application Services
-catalog_service = CatalogService(service_repo, vendor_repo)
-search_service = SearchService(search_indexer)
-vendor_service = VendorService(vendor_repo)
 
-# Register Blueprints (Controllers)
-app.register_blueprint(create_catalog_controller(catalog_service))
-app.register_blueprint(create_search_controller(search_service))
-app.register_blueprint(create_vendor_controller(vendor_service))
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """
+    Builds the catalog API. Nothing here touches the database: MongoDB clients connect on their first
+    operation, and the startup tasks (index registry, change stream invalidation, search index build, vendor
+    summaries of a memory catalog, search index sync) run before the first request, or when app.extensions["catalog_startup"]()
+    is called. Config keys besides Flask's: STORAGE_BACKEND ("mongo", "memory" or a StorageBackend instance), ENSURE_INDEXES,
+    CACHE_CHANGE_STREAM, CHANGES_SETTLE_SECONDS, SEARCH_SYNC_SECONDS, EXPLAIN_ENABLED and ADMIN_ENABLED.
+    """
+    app = Flask(__name__)
+    # Single-pass JSON encoding of Mongo documents (orjson when installed)
+    app.json = CatalogJSONProvider(app)
+    app.config.update(
+        STORAGE_BACKEND=os.getenv("CATALOG_STORAGE_BACKEND", "mongo"),
+        ENSURE_INDEXES=_env_flag("MONGO_ENSURE_INDEXES", "true"),
+        CACHE_CHANGE_STREAM=_env_flag("CATALOG_CACHE_CHANGE_STREAM", "false"),
+        CHANGES_SETTLE_SECONDS=None,
+        # How often the search index picks up other processes' writes (None: CATALOG_SEARCH_SYNC_SECONDS; 0: never)
+        SEARCH_SYNC_SECONDS=None,
+        # Allows ?explain=true on list endpoints to return MongoDB query plans; keep disabled in production
+        EXPLAIN_ENABLED=_env_flag("CATALOG_DEBUG_EXPLAIN", "false"),
+        # Allows the /admin/* introspection endpoints; keep disabled on public deployments
+        ADMIN_ENABLED=_env_flag("CATALOG_ADMIN_ENDPOINTS", "false"),
+    )
+    if config:
+        app.config.update(config)
+    # One sampled access-log line per request
+    install_request_logging(app)
+    # Per-route latency/size/in-flight metrics, exposed with Mongo/pool/cache metrics at /metrics
+    http_metrics = install_http_metrics(app)
+    # gzip/br for large JSON bodies; registered last so it runs before the metrics hook records sizes
+    install_compression(app)
+
+    # Initialize Repositories
+    backend = create_backend(app.config["STORAGE_BACKEND"])
+    db = backend.database()
+    service_repo = ServiceRepository(db=db)
+    vendor_repo = VendorRepository(db=db)
+    search_indexer = SearchIndexer()
+    app.extensions["storage"] = backend
+
+    # Initialize Application Services
+    catalog_service = CatalogService(service_repo, vendor_repo, search_indexer)
+    search_service = SearchService(search_indexer, service_repo)
+    vendor_service = VendorService(vendor_repo)
+    change_feed_service = ChangeFeedService(service_repo, vendor_repo, app.config["CHANGES_SETTLE_SECONDS"])
+    search_sync = SearchIndexSync(search_indexer, service_repo, app.config["SEARCH_SYNC_SECONDS"], app.config["CHANGES_SETTLE_SECONDS"], vendor_repo=vendor_repo)
+    app.extensions["search_sync"] = search_sync
+
+    startup_lock = threading.Lock()
+    started = []
+
+    def run_startup_tasks():
+        """Runs the startup tasks once per app; later calls return immediately."""
+        if started:
+            return
+        with startup_lock:
+            if started:
+                return
+            # Ensure the declarative index registry is applied (idempotent); the memory backend always
+            # needs it, as its hash indexes and unique constraints come from the registry
+            if app.config["ENSURE_INDEXES"] or backend.name == "memory":
+                try:
+                    apply_indexes(db)
+                except errors.PyMongoError as e:
+                    logging.error("Failed to apply indexes: %s", e)
+            # Optionally keep caches coherent across processes via MongoDB change streams
+            if app.config["CACHE_CHANGE_STREAM"] and backend.name == "mongo":
+                for repo in (service_repo, vendor_repo):
+                    if repo.cache is not None:
+                        ChangeStreamInvalidator(repo.collection, repo.cache).start()
+            # Build the in-memory search index from the catalog; this process's writes keep it current afterwards
+            # and the sync pulls in everyone else's from the change feed, starting from just before the build
+            search_sync.reset()
+            catalog_service.rebuild_search_index()
+            search_sync.start()
+            # Summaries persist in MongoDB (see rebuild-vendor-summaries); a memory catalog may have been loaded
+            # directly into the collections, so its summaries are built once here
+            if backend.name == "memory":
+                service_repo.rebuild_vendor_summaries()
+            started.append(True)
+
+    app.extensions["catalog_startup"] = run_startup_tasks
+    app.before_request(run_startup_tasks)
+
+    # Register Blueprints (Controllers)
+    caches = [service_repo.cache, vendor_repo.cache, service_repo.count_cache, service_repo.facet_cache]
+    app.register_blueprint(create_catalog_controller(catalog_service))
+    app.register_blueprint(create_search_controller(search_service))
+    app.register_blueprint(create_vendor_controller(vendor_service))
+    app.register_blueprint(create_change_controller(change_feed_service))
+    app.register_blueprint(create_admin_controller(get_connection_manager(), caches))
+    app.register_blueprint(create_metrics_controller(http_metrics, get_connection_manager(), caches))
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """Applies the index registry to MongoDB: flask --app main ensure-indexes"""
+        apply_indexes(db)
+
+    @app.cli.command("refresh-derived-fields")
+    @click.option("--all", "all_services", is_flag=True, help="Recompute every service (backfill), not only those due.")
+    def refresh_derived_fields_command(all_services):
+        """Recomputes prices whose pricing rule windows opened or closed: flask --app main refresh-derived-fields"""
+        changed = catalog_service.refresh_derived_fields(all_services=all_services)
+        click.echo(f"Updated {len(changed)} services")
+
+    @app.cli.command("rebuild-vendor-summaries")
+    @click.option("--vendor", "vendor_ids", multiple=True, help="Rebuild only this vendor's summary (repeatable).")
+    def rebuild_vendor_summaries_command(vendor_ids):
+        """Recomputes vendor summaries from the active services: flask --app main rebuild-vendor-summaries"""
+        written = service_repo.rebuild_vendor_summaries(list(vendor_ids) or None)
+        click.echo(f"Rebuilt {written} vendor summaries")
+
+    logging.info("Flask app initialized and all blueprints registered.")
+    return app
 
-logging.info("Flask app initialized and all blueprints registered.")
 
 if __name__ == "__main__":
     logging.info("Starting Flask app on 0.0.0.0:5000")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    create_app().run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,205 @@
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import uuid # Import uuid for generating unique IDs
+import logging
+from src.application.fields import get_path, with_required
+from src.application.service_graph import GRAPH_FIELDS, ServiceGraph
+
+class AsyncCatalogService:
+    """asyncio counterpart of CatalogService, used by the ASGI app with the async repositories."""
+
+    def __init__(self, service_repo, vendor_repo, search_indexer=None):
+        self.service_repo = service_repo
+        self.vendor_repo = vendor_repo
+        self.search_indexer = search_indexer
+
+    async def rebuild_search_index(self) -> int:
+        """Rebuilds the search index from all active services in the repository."""
+        if self.search_indexer is None:
+            return 0
+        return self.search_indexer.rebuild([doc async for doc in self.service_repo.iter_services()])
+
+    async def refresh_derived_fields(self, service_ids: Optional[List[str]] = None, all_services: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Runs the derived-field refresh pass and reindexes the services it changed."""
+        changed = await self.service_repo.refresh_derived_fields(service_ids, all_services)
+        if self.search_indexer is not None and changed:
+            self.search_indexer.index_services((await self.service_repo.get_services_by_ids(list(changed))).values())
+        return changed
+
+    async def expand_vendors(self, services: List[Dict]) -> List[Dict]:
+        """Attaches 'vendorDetails' to each service, resolving all vendors of the page in one query."""
+        vendors = await self.vendor_repo.get_vendors_by_ids([s.get("vendor_id") for s in services])
+        for service in services:
+            service["vendorDetails"] = vendors.get(service.get("vendor_id"))
+        return services
+
+    async def list_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        try:
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services = await self.service_repo.get_all_services(filters, skip, limit, sort, fields, lang)
+            if expand_vendor and services:
+                await self.expand_vendors(services)
+            return services
+        except Exception as e:
+            logging.error("Error listing services: %s", e)
+            return []
+
+    async def list_services_page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = 1, after: Optional[tuple] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Tuple[List[Dict], Optional[tuple]]:
+        try:
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services = await self.service_repo.get_services_after(filters, limit + 1, sort_field, direction, after, fields, lang)
+            next_after = None
+            if len(services) > limit:
+                services = services[:limit]
+                next_after = (get_path(services[-1], sort_field), services[-1]["id"])
+            if expand_vendor and services:
+                await self.expand_vendors(services)
+            return services, next_after
+        except Exception as e:
+            logging.error("Error listing services page: %s", e)
+            return [], None
+
+    async def list_services_with_facets(self, filters: Optional[Dict[str, Any]], facets: List[str], skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None, total: bool = True) -> Tuple[List[Dict], Optional[int], Dict[str, List[Dict]]]:
+        try:
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services, total_count, counts = await self.service_repo.get_services_with_facets(filters, facets, skip, limit, sort, fields, lang, total)
+            if expand_vendor and services:
+                await self.expand_vendors(services)
+            return services, total_count, counts
+        except Exception as e:
+            logging.error("Error listing services with facets: %s", e)
+            return [], None, {}
+
+    async def explain_list_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, keyset: Optional[tuple] = None) -> Dict[str, Any]:
+        if keyset is not None:
+            sort_field, direction, after = keyset
+            return await self.service_repo.explain_services_after(filters, limit + 1, sort_field, direction, after)
+        return await self.service_repo.explain_all_services(filters, skip, limit, sort)
+
+    async def count_services(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact") -> Optional[int]:
+        try:
+            return await self.service_repo.count_services(filters, mode)
+        except Exception as e:
+            logging.error("Error counting services: %s", e)
+            return None
+
+    async def get_service_details(self, service_id: str, expand_vendor: bool = True, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        try:
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            if expand_vendor and self.service_repo.cache is None:
+                service = await self.service_repo.get_service_with_vendor(service_id, fields, lang)
+            else:
+                service = await self.service_repo.get_service_by_id(service_id, fields, lang)
+                if service and expand_vendor:
+                    service["vendorDetails"] = await self.vendor_repo.get_vendor_by_id(service.get("vendor_id"))
+            if not service:
+                logging.warning("Service not found: %s", service_id)
+                return None
+            return service
+        except Exception as e:
+            logging.error("Error fetching service details: %s", e)
+            return None
+
+    async def service_version(self, service_id: str, expand_vendor: bool = False) -> Optional[List[str]]:
+        service = await self.service_repo.get_service_by_id(service_id, ["updated_at", "vendor_id"])
+        if not service:
+            return None
+        stamps = [str(service.get("updated_at") or "")]
+        if expand_vendor:
+            vendor = await self.vendor_repo.get_vendor_by_id(service.get("vendor_id"), ["updated_at"]) if service.get("vendor_id") else None
+            stamps.append(str((vendor or {}).get("updated_at") or ""))
+        return stamps
+
+    async def catalog_version(self, expand_vendor: bool = False) -> List[str]:
+        stamps = [await self.service_repo.last_modified() or ""]
+        if expand_vendor:
+            stamps.append(await self.vendor_repo.last_modified() or "")
+        return stamps
+
+    async def filter_services(self, filters: Dict[str, Any]) -> List[Dict]:
+        try:
+            return await self.service_repo.filter_services(filters)
+        except Exception as e:
+            logging.error("Error filtering services: %s", e)
+            return []
+
+    async def list_available_services(self, location: str, at: datetime, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        try:
+            return await self.service_repo.get_available_services(location, at, filters, skip, limit, fields, lang)
+        except Exception as e:
+            logging.error("Error listing available services: %s", e)
+            return []
+
+    async def get_service_graph(self, service_id: str, depth: int, relations: List[str], expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        try:
+            fields = with_required(fields, *GRAPH_FIELDS, *(("vendor_id",) if expand_vendor else ()))
+            root = await self.service_repo.get_service_by_id(service_id, fields, lang)
+            if not root:
+                return None
+            graph = ServiceGraph(root, depth, relations)
+            while not graph.done:
+                parent_ids, ids = graph.next_query()
+                graph.add_level(await self.service_repo.get_graph_level(parent_ids, ids, fields, lang, graph.level_limit))
+            if expand_vendor:
+                await self.expand_vendors(list(graph.nodes.values()))
+            return graph.to_dict()
+        except Exception as e:
+            logging.error("Error resolving service graph: %s", e)
+            return None
+
+    def export_services(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """Lazily yields every service matching the filters, for streaming exports."""
+        return self.service_repo.export_services(filters, updated_since, batch_size)
+
+    async def create_service(self, service_data: Dict[str, Any]) -> Dict:
+        try:
+            if 'id' not in service_data or not service_data['id']:
+                service_data['id'] = str(uuid.uuid4()) # Generate UUID
+            created = await self.service_repo.create_service(service_data)
+            if created and self.search_indexer is not None:
+                self.search_indexer.index_service(created)
+            return created
+        except Exception as e:
+            logging.error("Error creating service: %s", e)
+            return {}
+
+    async def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
+        try:
+            updated = await self.service_repo.update_service(service_id, update_data)
+            if updated and self.search_indexer is not None:
+                self.search_indexer.index_service(updated)
+            return updated
+        except Exception as e:
+            logging.error("Error updating service: %s", e)
+            return None
+
+    async def delete_service(self, service_id: str) -> None:
+        try:
+            await self.service_repo.soft_delete_service(service_id)
+            if self.search_indexer is not None:
+                self.search_indexer.remove_service(service_id)
+        except Exception as e:
+            logging.error("Error soft-deleting service: %s", e)
+
+    async def bulk_create_services(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        return self._finish_bulk(await self.service_repo.bulk_create_services(items))
+
+    async def bulk_update_services(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        return self._finish_bulk(await self.service_repo.bulk_update_services(items))
+
+    async def bulk_delete_services(self, service_ids: List[str]) -> List[Dict]:
+        results = await self.service_repo.bulk_soft_delete_services(service_ids)
+        if self.search_indexer is not None:
+            self.search_indexer.remove_services(result["id"] for result in results if result["status"] == "deleted")
+        return results
+
+    def _finish_bulk(self, results: List[Dict]) -> List[Dict]:
+        """Indexes the written documents in one batch and strips them from the per-item results."""
+        documents = [result.pop("document", None) for result in results]
+        if self.search_indexer is not None:
+            self.search_indexer.index_services(document for document in documents if document is not None)
+        return results
@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.application.change_feed_service import CHANGES_SETTLE_SECONDS, Position, merge_changes
+
+
+class AsyncChangeFeedService:
+    """asyncio counterpart of ChangeFeedService, used by the ASGI app with the async repositories."""
+
+    def __init__(self, service_repo, vendor_repo, settle_seconds: Optional[float] = None):
+        self.repos = {"services": service_repo, "vendors": vendor_repo}
+        self.settle_seconds = CHANGES_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+
+    async def changes(self, position: Position, types: List[str], limit: int = 100) -> Tuple[List[Dict[str, Any]], Position, bool]:
+        until = (datetime.now(UTC) - timedelta(seconds=self.settle_seconds)).isoformat()
+        batches = {kind: await self.repos[kind].get_changes(position.get(kind), until, limit + 1) for kind in types}
+        return merge_changes(batches, position, limit)
@@ -0,0 +1,10 @@
+from typing import Dict, List, Optional, Tuple
+from src.application.search_service import SearchService, hydrate_hits
+
+class AsyncSearchService(SearchService):
+    """asyncio counterpart of SearchService, used by the ASGI app with the async service repository."""
+
+    async def search(self, query: str, lang: Optional[str] = None, page: int = 1, page_size: int = 20) -> Tuple[List[Dict], int]:
+        """Performs a search operation using the search indexer. Returns the page of hits and the total hit count."""
+        hits, total = self.search_indexer.search_services(query, lang, page, page_size)
+        return hydrate_hits(hits, await self.service_repo.get_services_by_ids([sid for sid, _ in hits])), total
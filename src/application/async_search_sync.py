@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from typing import Optional
+
+from src.application.search_sync import SEARCH_SYNC_BATCH, SearchIndexSync
+
+
+class AsyncSearchIndexSync(SearchIndexSync):
+    """asyncio counterpart of SearchIndexSync, used by the ASGI app: the passes run as a task on the serving loop."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._task: Optional[asyncio.Task] = None
+
+    async def sync(self) -> int:
+        if self._after is None:
+            self.reset()
+            return 0
+        until, count = self._until(), 0
+        while True:
+            docs = await self.service_repo.get_changes(self._after, until, SEARCH_SYNC_BATCH)
+            self._apply(docs)
+            count += len(docs)
+            if len(docs) < SEARCH_SYNC_BATCH:
+                break
+        while self.vendor_repo is not None:
+            docs = await self.vendor_repo.get_changes(self._vendors_after, until, SEARCH_SYNC_BATCH)
+            self._apply_vendors(docs)
+            if len(docs) < SEARCH_SYNC_BATCH:
+                break
+        return count
+
+    def start(self) -> "AsyncSearchIndexSync":
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logging.error("Search index sync failed, retrying in %.0fs: %s", self.interval, e)
@@ -0,0 +1,83 @@
+from typing import Dict, Any, AsyncIterator, List, Optional
+import uuid # Import uuid for generating unique IDs
+from src.application.fields import with_required
+from src.application.vendor_service import _strip_documents, summary_view
+
+class AsyncVendorService:
+    """asyncio counterpart of VendorService, used by the ASGI app with the async repositories."""
+
+    def __init__(self, vendor_repo):
+        self.vendor_repo = vendor_repo
+
+    async def list_vendors(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None, with_summary: bool = False) -> List[Dict]:
+        """Lists all active vendors; with_summary attaches each vendor's service statistics as "summary"."""
+        if with_summary:
+            fields = with_required(fields, "id")
+        vendors = await self.vendor_repo.get_all_vendors(filters, fields, lang)
+        if with_summary and vendors:
+            summaries = await self.vendor_repo.get_vendor_summaries([v.get("id") for v in vendors])
+            for vendor in vendors:
+                vendor["summary"] = summary_view(summaries.get(vendor.get("id")))
+        return vendors
+
+    async def explain_list_vendors(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns the query plan of a vendor list query instead of its results."""
+        return await self.vendor_repo.explain_all_vendors(filters)
+
+    def export_vendors(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """Lazily yields every vendor matching the filters, for streaming exports."""
+        return self.vendor_repo.export_vendors(filters, updated_since, batch_size)
+
+    async def get_vendor_details(self, vendor_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        """Retrieves details for a single vendor."""
+        return await self.vendor_repo.get_vendor_by_id(vendor_id, fields, lang)
+
+    async def vendor_version(self, vendor_id: str) -> Optional[List[str]]:
+        """Write stamps for a vendor's conditional GETs; None when it does not exist."""
+        vendor = await self.vendor_repo.get_vendor_by_id(vendor_id, ["updated_at"])
+        return [str(vendor.get("updated_at") or "")] if vendor else None
+
+    async def vendors_version(self, with_summary: bool = False) -> List[str]:
+        """Write stamps for vendor list responses: the latest write to any vendor (and summary when attached), deletes included."""
+        stamps = [await self.vendor_repo.last_modified() or ""]
+        if with_summary:
+            stamps.append(await self.vendor_repo.summaries_last_modified() or "")
+        return stamps
+
+    async def get_vendor_summary(self, vendor_id: str) -> Optional[Dict]:
+        """A vendor's rating with its active service statistics; None when the vendor does not exist."""
+        vendor = await self.vendor_repo.get_vendor_by_id(vendor_id, ["rating"])
+        if not vendor:
+            return None
+        return {"vendor_id": vendor_id, "rating": vendor.get("rating"), **summary_view(await self.vendor_repo.get_vendor_summary(vendor_id))}
+
+    async def vendor_summary_version(self, vendor_id: str) -> Optional[List[str]]:
+        """Write stamps of a vendor summary response (the vendor and its summary); None when the vendor does not exist."""
+        stamps = await self.vendor_version(vendor_id)
+        if stamps is None:
+            return None
+        summary = await self.vendor_repo.get_vendor_summary(vendor_id)
+        return stamps + [str((summary or {}).get("updated_at") or "")]
+
+    async def create_vendor(self, vendor_data: Dict[str, Any]) -> Dict:
+        """Creates a new vendor, generating an ID if not provided."""
+        if 'id' not in vendor_data or not vendor_data['id']:
+            vendor_data['id'] = str(uuid.uuid4()) # Generate UUID
+        return await self.vendor_repo.create_vendor(vendor_data)
+
+    async def update_vendor(self, vendor_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
+        """Updates an existing vendor."""
+        return await self.vendor_repo.update_vendor(vendor_id, update_data)
+
+    async def delete_vendor(self, vendor_id: str) -> None:
+        """Soft-deletes a vendor."""
+        await self.vendor_repo.soft_delete_vendor(vendor_id)
+
+    async def bulk_create_vendors(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        return _strip_documents(await self.vendor_repo.bulk_create_vendors(items))
+
+    async def bulk_update_vendors(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        return _strip_documents(await self.vendor_repo.bulk_update_vendors(items))
+
+    async def bulk_delete_vendors(self, vendor_ids: List[str]) -> List[Dict]:
+        return await self.vendor_repo.bulk_soft_delete_vendors(vendor_ids)
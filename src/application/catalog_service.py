@@ -1,64 +1,252 @@
-from typing import Dict, Any, List, Optional
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import uuid # Import uuid for generating unique IDs
 import logging
+from src.application.fields import get_path, with_required
+from src.application.service_graph import GRAPH_FIELDS, ServiceGraph
+
 
 class CatalogService:
-    def __init__(self, service_repo, vendor_repo):
+    def __init__(self, service_repo, vendor_repo, search_indexer=None):
         self.service_repo = service_repo
         self.vendor_repo = vendor_repo
+        self.search_indexer = search_indexer
+
+    def rebuild_search_index(self) -> int:
+        """Rebuilds the search index from all active services in the repository."""
+        if self.search_indexer is None:
+            return 0
+        return self.search_indexer.rebuild(self.service_repo.iter_services())
+
+    def refresh_derived_fields(self, service_ids: Optional[List[str]] = None, all_services: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs the derived-field refresh pass (see ServiceRepository.refresh_derived_fields) and reindexes
+        the services it changed, so search results carry their new prices. Returns the changed values by id.
+        """
+        changed = self.service_repo.refresh_derived_fields(service_ids, all_services)
+        if self.search_indexer is not None and changed:
+            self.search_indexer.index_services(self.service_repo.get_services_by_ids(list(changed)).values())
+        return changed
+
+    def expand_vendors(self, services: List[Dict]) -> List[Dict]:
+        """Attaches 'vendorDetails' to each service, resolving all vendors of the page in one query."""
+        vendors = self.vendor_repo.get_vendors_by_ids([s.get("vendor_id") for s in services])
+        for service in services:
+            service["vendorDetails"] = vendors.get(service.get("vendor_id"))
+        return services
 
-    def list_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None) -> List[Dict]:
+    def list_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
         try:
-            logging.info("Listing services with filters: %s, skip: %d, limit: %d, sort: %s", filters, skip, limit, sort)
-            return self.service_repo.get_all_services(filters, skip, limit, sort)
+            logging.debug("Listing services with filters: %s, skip: %d, limit: %d, sort: %s", filters, skip, limit, sort)
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services = self.service_repo.get_all_services(filters, skip, limit, sort, fields, lang)
+            if expand_vendor and services:
+                self.expand_vendors(services)
+            return services
         except Exception as e:
             logging.error("Error listing services: %s", e)
             return []
 
-    def get_service_details(self, service_id: str) -> Optional[Dict]:
+    def list_services_page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = 1, after: Optional[tuple] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Tuple[List[Dict], Optional[tuple]]:
+        """
+        Returns one keyset page of services and the (sort value, id) position the next page
+        starts after, or None when this is the last page.
+        """
+        try:
+            logging.debug("Listing services page with filters: %s, limit: %d, sort: %s %d", filters, limit, sort_field, direction)
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services = self.service_repo.get_services_after(filters, limit + 1, sort_field, direction, after, fields, lang)
+            next_after = None
+            if len(services) > limit:
+                services = services[:limit]
+                next_after = (get_path(services[-1], sort_field), services[-1]["id"])
+            if expand_vendor and services:
+                self.expand_vendors(services)
+            return services, next_after
+        except Exception as e:
+            logging.error("Error listing services page: %s", e)
+            return [], None
+
+    def list_services_with_facets(self, filters: Optional[Dict[str, Any]], facets: List[str], skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None, total: bool = True) -> Tuple[List[Dict], Optional[int], Dict[str, List[Dict]]]:
+        """
+        Returns (services, total, facet counts) for the filters, computed in a single aggregation.
+        limit=0 returns only the total and the counts (e.g. next to a keyset page); total=False skips the count.
+        """
+        try:
+            logging.debug("Listing services with facets %s, filters: %s", facets, filters)
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            services, total_count, counts = self.service_repo.get_services_with_facets(filters, facets, skip, limit, sort, fields, lang, total)
+            if expand_vendor and services:
+                self.expand_vendors(services)
+            return services, total_count, counts
+        except Exception as e:
+            logging.error("Error listing services with facets: %s", e)
+            return [], None, {}
+
+    def explain_list_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, keyset: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        Returns the query plan of a list query instead of its results.
+        keyset = (sort_field, direction, after) explains the cursor-paginated variant.
+        """
+        if keyset is not None:
+            sort_field, direction, after = keyset
+            return self.service_repo.explain_services_after(filters, limit + 1, sort_field, direction, after)
+        return self.service_repo.explain_all_services(filters, skip, limit, sort)
+
+    def count_services(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact") -> Optional[int]:
+        """Counts services matching the filters; mode is "exact" or "estimate"."""
+        try:
+            return self.service_repo.count_services(filters, mode)
+        except Exception as e:
+            logging.error("Error counting services: %s", e)
+            return None
+
+    def get_service_details(self, service_id: str, expand_vendor: bool = True, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
         try:
-            logging.info("Fetching service details for ID: %s", service_id)
-            service = self.service_repo.get_service_by_id(service_id)
+            logging.debug("Fetching service details for ID: %s", service_id)
+            if expand_vendor:
+                fields = with_required(fields, "vendor_id")
+            if expand_vendor and self.service_repo.cache is None:
+                # Uncached: fetch service and vendor in a single $lookup round trip
+                service = self.service_repo.get_service_with_vendor(service_id, fields, lang)
+            else:
+                # Cached: hot services and vendors are usually served without touching MongoDB
+                service = self.service_repo.get_service_by_id(service_id, fields, lang)
+                if service and expand_vendor:
+                    service["vendorDetails"] = self.vendor_repo.get_vendor_by_id(service.get("vendor_id"))
             if not service:
                 logging.warning("Service not found: %s", service_id)
                 return None
-            vendor = self.vendor_repo.get_vendor_by_id(service["vendor_id"])
-            service["vendorDetails"] = vendor
             return service
         except Exception as e:
             logging.error("Error fetching service details: %s", e)
             return None
 
+    def service_version(self, service_id: str, expand_vendor: bool = False) -> Optional[List[str]]:
+        """
+        Write stamps that change whenever the rendered service does: its updated_at, plus its vendor's
+        when expanded. Read through the caches; None when the service does not exist.
+        """
+        service = self.service_repo.get_service_by_id(service_id, ["updated_at", "vendor_id"])
+        if not service:
+            return None
+        stamps = [str(service.get("updated_at") or "")]
+        if expand_vendor:
+            vendor = self.vendor_repo.get_vendor_by_id(service.get("vendor_id"), ["updated_at"]) if service.get("vendor_id") else None
+            stamps.append(str((vendor or {}).get("updated_at") or ""))
+        return stamps
+
+    def catalog_version(self, expand_vendor: bool = False) -> List[str]:
+        """Write stamps for list responses: the latest write to services (and vendors when expanded), deletes included."""
+        stamps = [self.service_repo.last_modified() or ""]
+        if expand_vendor:
+            stamps.append(self.vendor_repo.last_modified() or "")
+        return stamps
+
     def filter_services(self, filters: Dict[str, Any]) -> List[Dict]:
         try:
-            logging.info("Filtering services with filters: %s", filters)
+            logging.debug("Filtering services with filters: %s", filters)
             return self.service_repo.filter_services(filters)
         except Exception as e:
             logging.error("Error filtering services: %s", e)
             return []
 
+    def list_available_services(self, location: str, at: datetime, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        """Services bookable in a location at an instant, according to their availability rules."""
+        try:
+            logging.debug("Listing services available in %s at %s", location, at)
+            return self.service_repo.get_available_services(location, at, filters, skip, limit, fields, lang)
+        except Exception as e:
+            logging.error("Error listing available services: %s", e)
+            return []
+
+    def get_service_graph(self, service_id: str, depth: int, relations: List[str], expand_vendor: bool = False, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        """
+        Resolves the bundle around a service (e.g. the components of a package) up to `depth` levels,
+        with one query per level. Returns None when the root service does not exist.
+        """
+        try:
+            logging.debug("Resolving service graph of %s, depth: %d, relations: %s", service_id, depth, relations)
+            fields = with_required(fields, *GRAPH_FIELDS, *(("vendor_id",) if expand_vendor else ()))
+            root = self.service_repo.get_service_by_id(service_id, fields, lang)
+            if not root:
+                return None
+            graph = ServiceGraph(root, depth, relations)
+            while not graph.done:
+                parent_ids, ids = graph.next_query()
+                graph.add_level(self.service_repo.get_graph_level(parent_ids, ids, fields, lang, graph.level_limit))
+            if expand_vendor:
+                self.expand_vendors(list(graph.nodes.values()))
+            return graph.to_dict()
+        except Exception as e:
+            logging.error("Error resolving service graph: %s", e)
+            return None
+
+    def export_services(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Lazily yields every service matching the filters, for streaming exports."""
+        logging.debug("Exporting services with filters: %s, updated_since: %s", filters, updated_since)
+        return self.service_repo.export_services(filters, updated_since, batch_size)
+
     def create_service(self, service_data: Dict[str, Any]) -> Dict:
         try:
-            logging.info("Creating service with data: %s", service_data)
+            logging.debug("Creating service with fields: %s", list(service_data))
             if 'id' not in service_data or not service_data['id']:
                 service_data['id'] = str(uuid.uuid4()) # Generate UUID
             # Optionally validate service_data here
-            return self.service_repo.create_service(service_data)
+            created = self.service_repo.create_service(service_data)
+            if created and self.search_indexer is not None:
+                self.search_indexer.index_service(created)
+            return created
         except Exception as e:
             logging.error("Error creating service: %s", e)
             return {}
 
     def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
         try:
-            logging.info("Updating service %s with data: %s", service_id, update_data)
-            return self.service_repo.update_service(service_id, update_data)
+            logging.debug("Updating service %s fields: %s", service_id, list(update_data))
+            updated = self.service_repo.update_service(service_id, update_data)
+            if updated and self.search_indexer is not None:
+                self.search_indexer.index_service(updated)
+            return updated
         except Exception as e:
             logging.error("Error updating service: %s", e)
             return None
 
     def delete_service(self, service_id: str) -> None:
         try:
-            logging.info("Soft-deleting service: %s", service_id)
+            logging.debug("Soft-deleting service: %s", service_id)
             self.service_repo.soft_delete_service(service_id)
+            if self.search_indexer is not None:
+                self.search_indexer.remove_service(service_id)
         except Exception as e:
             logging.error("Error soft-deleting service: %s", e)
+
+    def bulk_create_services(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        """Creates many services; returns per-item {"index", "id", "status", "error"?} results."""
+        logging.debug("Bulk-creating %d services", len(items))
+        results = self.service_repo.bulk_create_services(items)
+        return self._finish_bulk(results)
+
+    def bulk_update_services(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        """Updates many services; each item carries its 'id' plus the fields to set."""
+        logging.debug("Bulk-updating %d services", len(items))
+        results = self.service_repo.bulk_update_services(items)
+        return self._finish_bulk(results)
+
+    def bulk_delete_services(self, service_ids: List[str]) -> List[Dict]:
+        """Soft-deletes many services by id."""
+        logging.debug("Bulk soft-deleting %d services", len(service_ids))
+        results = self.service_repo.bulk_soft_delete_services(service_ids)
+        if self.search_indexer is not None:
+            self.search_indexer.remove_services(result["id"] for result in results if result["status"] == "deleted")
+        return results
+
+    def _finish_bulk(self, results: List[Dict]) -> List[Dict]:
+        """Indexes the written documents in one batch and strips them from the per-item results."""
+        documents = [result.pop("document", None) for result in results]
+        if self.search_indexer is not None:
+            self.search_indexer.index_services(document for document in documents if document is not None)
+        return results
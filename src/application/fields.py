@@ -0,0 +1,20 @@
+from typing import Any, Dict, List, Optional
+
+# Document and sparse-fieldset helpers shared by the catalog and vendor services (and their async variants).
+
+
+def get_path(doc: Dict[str, Any], path: str) -> Any:
+    """Reads a dotted field path (e.g. "name.en") from a document."""
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def with_required(fields: Optional[List[str]], *required: str) -> Optional[List[str]]:
+    """Adds fields needed internally (e.g. vendor_id to expand vendors) to a sparse fieldset."""
+    if not fields:
+        return fields
+    return list(fields) + [f for f in required if f not in fields]
@@ -1,9 +1,30 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def hydrate_hits(hits: List[Tuple[str, float]], docs: Dict[str, Dict]) -> List[Dict]:
+    """Search hits ((service id, score) pairs) as repository documents with a 'score', in rank order; ids no longer active are dropped."""
+    results = []
+    for service_id, score in hits:
+        doc = docs.get(service_id)
+        if doc is not None:
+            results.append({**doc, "score": score})
+    return results
+
 
 class SearchService:
-    def __init__(self, search_indexer):
+    def __init__(self, search_indexer, service_repo):
         self.search_indexer = search_indexer
+        self.service_repo = service_repo
+
+    def search(self, query: str, lang: Optional[str] = None, page: int = 1, page_size: int = 20) -> Tuple[List[Dict], int]:
+        """
+        Performs a search operation using the search indexer. Returns the page of hits, read from the
+        repository in one batch so they carry current data, and the total hit count.
+        """
+        hits, total = self.search_indexer.search_services(query, lang, page, page_size)
+        return hydrate_hits(hits, self.service_repo.get_services_by_ids([sid for sid, _ in hits])), total
+
+    def suggest(self, query: str, lang: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """Typeahead suggestions (service names, tags, categories) for a prefix, most popular first."""
+        return self.search_indexer.suggest(query, lang, limit)
 
-    def search(self, query: str) -> List[Dict]:
-        """Performs a search operation using the search indexer."""
-        return self.search_indexer.search_services(query)
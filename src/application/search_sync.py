@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.application.change_feed_service import CHANGES_SETTLE_SECONDS
+
+# How often each process pulls writes made by other processes into its search index and caches (0: never)
+SEARCH_SYNC_SECONDS = float(os.getenv("CATALOG_SEARCH_SYNC_SECONDS", "2"))
+# Changes read per change feed query
+SEARCH_SYNC_BATCH = 1000
+
+
+def invalidate_written(repo, docs: List[Dict[str, Any]]) -> None:
+    """Drops a repository's cached copies of the written documents and its cached last_modified."""
+    if repo.cache is not None:
+        for doc in docs:
+            repo.cache.invalidate(doc["id"])
+    if docs:
+        repo.version_cache.invalidate("last_modified")
+
+
+class SearchIndexSync:
+    """
+    Keeps this process's in-memory search index and repository caches current with writes made elsewhere (other
+    gunicorn workers, CLI commands, other hosts). Every write stamps updated_at, so each pass reads the services
+    change feed (see ChangeFeedService) from where the previous one stopped, reindexes what changed and drops
+    the cached copies; soft-deleted services leave the index. Given the vendor repository, the same pass reads the
+    vendors feed and drops stale vendor cache entries. Needs no change stream, so it works on a standalone
+    MongoDB server too (ChangeStreamInvalidator invalidates sooner where streams are available).
+    """
+
+    def __init__(self, search_indexer, service_repo, interval: Optional[float] = None, settle_seconds: Optional[float] = None,
+                 vendor_repo=None):
+        self.search_indexer = search_indexer
+        self.service_repo = service_repo
+        self.vendor_repo = vendor_repo
+        self.interval = SEARCH_SYNC_SECONDS if interval is None else interval
+        self.settle_seconds = CHANGES_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self._after: Optional[Tuple[str, str]] = None
+        self._vendors_after: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _until(self) -> str:
+        # Writes stamp updated_at before they commit: stay behind the clock so none is skipped
+        return (datetime.now(UTC) - timedelta(seconds=self.settle_seconds)).isoformat()
+
+    def reset(self) -> None:
+        """Starts the feeds at the present; call it right before a full rebuild of the index."""
+        self._after = self._vendors_after = (self._until(), "")
+
+    def _apply(self, docs: List[Dict[str, Any]]) -> None:
+        self.search_indexer.index_services(docs)
+        # Hits are hydrated through the repository cache, so drop the copies these writes made stale
+        invalidate_written(self.service_repo, docs)
+        if docs:
+            self._after = (docs[-1]["updated_at"], docs[-1]["id"])
+
+    def _apply_vendors(self, docs: List[Dict[str, Any]]) -> None:
+        invalidate_written(self.vendor_repo, docs)
+        if docs:
+            self._vendors_after = (docs[-1]["updated_at"], docs[-1]["id"])
+
+    def sync(self) -> int:
+        """Applies the writes made since the previous pass (or reset) and returns how many services it reindexed."""
+        with self._lock:
+            if self._after is None:
+                self.reset()
+                return 0
+            until, count = self._until(), 0
+            while True:
+                docs = self.service_repo.get_changes(self._after, until, SEARCH_SYNC_BATCH)
+                self._apply(docs)
+                count += len(docs)
+                if len(docs) < SEARCH_SYNC_BATCH:
+                    break
+            while self.vendor_repo is not None:
+                docs = self.vendor_repo.get_changes(self._vendors_after, until, SEARCH_SYNC_BATCH)
+                self._apply_vendors(docs)
+                if len(docs) < SEARCH_SYNC_BATCH:
+                    break
+            return count
+
+    def start(self) -> "SearchIndexSync":
+        """Runs sync() every `interval` seconds in a background thread (not at all when the interval is 0)."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="search-index-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logging.error("Search index sync failed, retrying in %.0fs: %s", self.interval, e)
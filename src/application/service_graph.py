@@ -0,0 +1,109 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Relations a graph walk can follow from a service:
+#   children: services listing it in their parent_service_ids (the components of a package/composite)
+#   parents:  the services in its own parent_service_ids
+#   related:  the services in its related_service_ids
+GRAPH_RELATIONS = ("children", "parents", "related")
+GRAPH_MAX_DEPTH = 10
+GRAPH_MAX_NODES = int(os.getenv("CATALOG_GRAPH_MAX_NODES", "500"))
+
+# Fields a walk needs on every node, whatever sparse fieldset was requested
+GRAPH_FIELDS = ("id", "parent_service_ids", "related_service_ids")
+
+
+class ServiceGraph:
+    """
+    Breadth-first walk of the service graph, one repository query per depth level.
+    Each service is expanded once, so cycles terminate; edges into already visited services are
+    still reported. The walk stops at `depth`, when a level adds nothing, or at `max_nodes` (truncated).
+    """
+
+    def __init__(self, root: Dict[str, Any], depth: int, relations: Iterable[str], max_nodes: int = GRAPH_MAX_NODES):
+        self.root_id = root["id"]
+        self.depth = depth
+        self.relations = set(relations)
+        self.max_nodes = max_nodes
+        self.nodes: Dict[str, Dict[str, Any]] = {self.root_id: root}
+        self.levels: Dict[str, int] = {self.root_id: 0}
+        self.edges: List[Tuple[str, str, str]] = []
+        self._edge_set: Set[Tuple[str, str, str]] = set()
+        self.frontier: List[Dict[str, Any]] = [root]
+        self.level = 0
+        self.truncated = False
+
+    @property
+    def done(self) -> bool:
+        return not self.frontier or self.level >= self.depth or self.truncated
+
+    @property
+    def level_limit(self) -> int:
+        """Enough rows for every visited service plus one more than the room left, so truncation is detected."""
+        return self.max_nodes + len(self.nodes)
+
+    def next_query(self) -> Tuple[List[str], List[str]]:
+        """Returns (ids whose children to fetch, ids to fetch) for the next level."""
+        parent_ids = [n["id"] for n in self.frontier] if "children" in self.relations else []
+        ids: Set[str] = set()
+        for node in self.frontier:
+            if "parents" in self.relations:
+                ids.update(node.get("parent_service_ids") or ())
+            if "related" in self.relations:
+                ids.update(node.get("related_service_ids") or ())
+        return parent_ids, sorted(ids)
+
+    def _edge(self, source: str, target: str, relation: str) -> None:
+        edge = (source, target, relation)
+        if edge not in self._edge_set:
+            self._edge_set.add(edge)
+            self.edges.append(edge)
+
+    def add_level(self, docs: List[Dict[str, Any]]) -> None:
+        """Records the services returned for next_query() and advances the frontier."""
+        self.level += 1
+        frontier_ids = {n["id"] for n in self.frontier}
+        pointed: Dict[str, List[Tuple[str, str]]] = {}
+        for node in self.frontier:
+            if "parents" in self.relations:
+                for target in node.get("parent_service_ids") or ():
+                    pointed.setdefault(target, []).append((node["id"], "parent"))
+            if "related" in self.relations:
+                for target in node.get("related_service_ids") or ():
+                    pointed.setdefault(target, []).append((node["id"], "related"))
+        next_frontier = []
+        for doc in docs:
+            doc_id = doc["id"]
+            if "children" in self.relations:
+                for parent in doc.get("parent_service_ids") or ():
+                    if parent in frontier_ids:
+                        self._edge(parent, doc_id, "child")
+            for source, relation in pointed.get(doc_id, ()):
+                self._edge(source, doc_id, relation)
+            if doc_id in self.nodes:
+                continue
+            if len(self.nodes) >= self.max_nodes:
+                self.truncated = True
+                continue
+            self.nodes[doc_id] = doc
+            self.levels[doc_id] = self.level
+            next_frontier.append(doc)
+        self.frontier = next_frontier
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "root": self.root_id,
+            "depth": self.level,
+            "truncated": self.truncated,
+            "nodes": [{"depth": self.levels[node_id], "service": node} for node_id, node in self.nodes.items()],
+            "edges": [{"from": s, "to": t, "type": r} for s, t, r in self.edges],
+        }
+
+
+def parse_relations(value: Optional[str]) -> List[str]:
+    """Parses ?include=children,related (default: children). Raises ValueError for unknown relations."""
+    relations = [r.strip() for r in (value or "children").split(",") if r.strip()]
+    unknown = [r for r in relations if r not in GRAPH_RELATIONS]
+    if unknown or not relations:
+        raise ValueError(f"include must be a comma-separated subset of {', '.join(GRAPH_RELATIONS)}")
+    return relations
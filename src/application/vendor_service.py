@@ -1,17 +1,67 @@
-from typing import Dict, Any, List,Optional
+from typing import Dict, Any, Iterator, List,Optional
 import uuid # Import uuid for generating unique IDs
+from src.application.fields import with_required
+
+# Fields of a stored vendor summary exposed by the API (see infrastructure/vendor_summaries.py)
+SUMMARY_COUNTERS = ("active_services", "on_sale_services")
+SUMMARY_BOUNDS = ("min_base_price", "max_base_price")
 
 class VendorService:
     def __init__(self, vendor_repo):
         self.vendor_repo = vendor_repo
 
-    def list_vendors(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
-        """Lists all active vendors."""
-        return self.vendor_repo.get_all_vendors(filters)
+    def list_vendors(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None, with_summary: bool = False) -> List[Dict]:
+        """Lists all active vendors; with_summary attaches each vendor's service statistics as "summary"."""
+        if with_summary:
+            fields = with_required(fields, "id")
+        vendors = self.vendor_repo.get_all_vendors(filters, fields, lang)
+        if with_summary and vendors:
+            summaries = self.vendor_repo.get_vendor_summaries([v.get("id") for v in vendors])
+            for vendor in vendors:
+                vendor["summary"] = summary_view(summaries.get(vendor.get("id")))
+        return vendors
+
+    def explain_list_vendors(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns the query plan of a vendor list query instead of its results."""
+        return self.vendor_repo.explain_all_vendors(filters)
+
+    def export_vendors(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Lazily yields every vendor matching the filters, for streaming exports."""
+        return self.vendor_repo.export_vendors(filters, updated_since, batch_size)
 
-    def get_vendor_details(self, vendor_id: str) -> Optional[Dict]:
+    def get_vendor_details(self, vendor_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
         """Retrieves details for a single vendor."""
-        return self.vendor_repo.get_vendor_by_id(vendor_id)
+        return self.vendor_repo.get_vendor_by_id(vendor_id, fields, lang)
+
+    def vendor_version(self, vendor_id: str) -> Optional[List[str]]:
+        """Write stamps for a vendor's conditional GETs; None when it does not exist."""
+        vendor = self.vendor_repo.get_vendor_by_id(vendor_id, ["updated_at"])
+        return [str(vendor.get("updated_at") or "")] if vendor else None
+
+    def vendors_version(self, with_summary: bool = False) -> List[str]:
+        """Write stamps for vendor list responses: the latest write to any vendor (and summary when attached), deletes included."""
+        stamps = [self.vendor_repo.last_modified() or ""]
+        if with_summary:
+            stamps.append(self.vendor_repo.summaries_last_modified() or "")
+        return stamps
+
+    def get_vendor_summary(self, vendor_id: str) -> Optional[Dict]:
+        """
+        A vendor's rating with its active service statistics (counts, category mix, base price range), read from
+        the materialized summary; None when the vendor does not exist.
+        """
+        vendor = self.vendor_repo.get_vendor_by_id(vendor_id, ["rating"])
+        if not vendor:
+            return None
+        return {"vendor_id": vendor_id, "rating": vendor.get("rating"), **summary_view(self.vendor_repo.get_vendor_summary(vendor_id))}
+
+    def vendor_summary_version(self, vendor_id: str) -> Optional[List[str]]:
+        """Write stamps of a vendor summary response (the vendor and its summary); None when the vendor does not exist."""
+        stamps = self.vendor_version(vendor_id)
+        if stamps is None:
+            return None
+        summary = self.vendor_repo.get_vendor_summary(vendor_id)
+        return stamps + [str((summary or {}).get("updated_at") or "")]
 
     def create_vendor(self, vendor_data: Dict[str, Any]) -> Dict:
         """Creates a new vendor, generating an ID if not provided."""
@@ -27,3 +77,34 @@ class VendorService:
     def delete_vendor(self, vendor_id: str) -> None:
         """Soft-deletes a vendor."""
         self.vendor_repo.soft_delete_vendor(vendor_id)
+
+    def bulk_create_vendors(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        """Creates many vendors; returns per-item {"index", "id", "status", "error"?} results."""
+        return _strip_documents(self.vendor_repo.bulk_create_vendors(items))
+
+    def bulk_update_vendors(self, items: List[Dict[str, Any]]) -> List[Dict]:
+        """Updates many vendors; each item carries its 'id' plus the fields to set."""
+        return _strip_documents(self.vendor_repo.bulk_update_vendors(items))
+
+    def bulk_delete_vendors(self, vendor_ids: List[str]) -> List[Dict]:
+        """Soft-deletes many vendors by id."""
+        return self.vendor_repo.bulk_soft_delete_vendors(vendor_ids)
+
+def summary_view(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The API shape of a stored vendor summary: counters, categories still in use and the base price range
+    (None when unknown). Vendors whose services were never written have no document and get zeros.
+    """
+    doc = doc or {}
+    return {
+        **{c: doc.get(c, 0) for c in SUMMARY_COUNTERS},
+        "categories": {k: v for k, v in sorted((doc.get("categories") or {}).items()) if v > 0},
+        **{b: doc.get(b) for b in SUMMARY_BOUNDS},
+        "updated_at": doc.get("updated_at"),
+    }
+
+def _strip_documents(results: List[Dict]) -> List[Dict]:
+    """Drops the written documents from bulk results; clients only need per-item status."""
+    for result in results:
+        result.pop("document", None)
+    return results
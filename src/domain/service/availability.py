@@ -0,0 +1,95 @@
+import logging
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
+
+# Service fields the flattened availability index is derived from
+AVAILABILITY_INPUT_FIELDS = ("availability_rules", "available_locations")
+
+# Bounds standing in for a missing valid_from / valid_to; ISO timestamps in UTC compare as strings
+OPEN_START = "0000-01-01T00:00:00+00:00"
+OPEN_END = "9999-12-31T23:59:59+00:00"
+# Location entry of services without available_locations, which are bookable everywhere
+ANY_LOCATION = "*"
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+def _iso(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(UTC).isoformat()
+    return None
+
+def normalize_location(location: str) -> str:
+    return location.strip().lower()
+
+def _window(rule: Dict[str, Any]) -> Dict[str, Any]:
+    window: Dict[str, Any] = {"from": _iso(rule.get("valid_from")) or OPEN_START, "to": _iso(rule.get("valid_to")) or OPEN_END}
+    conditions = rule.get("conditions") or {}
+    if conditions.get("days"):
+        window["days"] = sorted({str(d).strip().lower()[:3] for d in conditions["days"]})
+    if conditions.get("months"):
+        window["months"] = sorted({int(m) for m in conditions["months"]})
+    return window
+
+def validate_availability_rules(rules: Any) -> None:
+    """Raises ValueError describing the first availability rule with a malformed window, days or months condition."""
+    if rules is None:
+        return
+    if not isinstance(rules, list):
+        raise ValueError("availability_rules must be an array")
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"availability_rules[{i}] is not an object")
+        for key in ("valid_from", "valid_to"):
+            value = rule.get(key)
+            if value is None:
+                continue
+            try:
+                if not isinstance(value, (str, datetime)):
+                    raise ValueError
+                _iso(value)
+            except ValueError:
+                raise ValueError(f"availability_rules[{i}].{key} is not a valid ISO timestamp: {value!r}") from None
+        conditions = rule.get("conditions")
+        if conditions is None:
+            continue
+        if not isinstance(conditions, dict):
+            raise ValueError(f"availability_rules[{i}].conditions is not an object")
+        days, months = conditions.get("days"), conditions.get("months")
+        if days is not None and (not isinstance(days, list) or any(str(d).strip().lower()[:3] not in WEEKDAYS for d in days)):
+            raise ValueError(f"availability_rules[{i}].conditions.days must be an array of weekdays (mon..sun)")
+        if months is not None and (not isinstance(months, list) or not all(_month(m) for m in months)):
+            raise ValueError(f"availability_rules[{i}].conditions.months must be an array of months (1-12)")
+
+def _month(value: Any) -> bool:
+    try:
+        return not isinstance(value, bool) and 1 <= int(value) <= 12
+    except (TypeError, ValueError):
+        return False
+
+def compute_availability(service: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Flattens availability_rules x available_locations into indexable entries:
+    - availability_index: one {"loc", "from", "to", "days"?, "months"?} per location and open window
+      (a service without is_available rules is open all the time; one without locations is open everywhere);
+    - availability_blackouts: the {"from", "to", "days"?, "months"?} windows of is_available=False rules.
+    Only the "days" (mon..sun) and "months" (1-12) conditions are understood; other conditions do not restrict.
+    Malformed rules (stored before validate_availability_rules existed) are skipped and logged.
+    """
+    open_windows, blackouts = [], []
+    for rule in service.get("availability_rules") or ():
+        try:
+            window = _window(rule)
+        except (AttributeError, TypeError, ValueError) as e:
+            logging.warning("Skipping malformed availability rule of service %s: %s", service.get("id"), e)
+            continue
+        (open_windows if rule.get("is_available", True) else blackouts).append(window)
+    if not open_windows:
+        open_windows = [{"from": OPEN_START, "to": OPEN_END}]
+    locations = sorted({normalize_location(loc) for loc in service.get("available_locations") or () if str(loc).strip()})
+    return {
+        "availability_index": [{"loc": loc, **window} for loc in locations or (ANY_LOCATION,) for window in open_windows],
+        "availability_blackouts": blackouts,
+    }
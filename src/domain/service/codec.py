@@ -0,0 +1,114 @@
+import dataclasses
+import typing
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from .service import Service
+from .vendor import Vendor
+
+# Decoders and encoders are generated once per dataclass at import time: each is a single
+# function with one expression per field, so hydrating a document costs no reflection,
+# no **kwargs dict and no mutation of the source document.
+
+_MISSING = dataclasses.MISSING
+
+
+def _parse_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _format_datetime(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _unwrap(tp: Any) -> Any:
+    """Optional[X] -> X."""
+    if typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return tp
+
+
+def _field_kind(tp: Any) -> tuple:
+    """Classifies a field type as ("dataclass", cls), ("list", cls), ("datetime", None) or ("plain", None)."""
+    tp = _unwrap(tp)
+    if dataclasses.is_dataclass(tp):
+        return "dataclass", tp
+    if typing.get_origin(tp) is list:
+        (item,) = typing.get_args(tp) or (Any,)
+        if dataclasses.is_dataclass(item):
+            return "list", item
+    if tp is datetime:
+        return "datetime", None
+    return "plain", None
+
+
+def _compile(cls: type, source: str, namespace: Dict[str, Any], name: str) -> Callable:
+    exec(compile(source, f"<codec {cls.__name__}>", "exec"), namespace)
+    return namespace[name]
+
+
+def build_decoder(cls: type) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Generates doc -> cls. Unknown keys (e.g. _id, vendorDetails) are ignored, missing optional fields
+    take their defaults (null lists and factory fields too) and a missing required field raises KeyError.
+    """
+    hints = typing.get_type_hints(cls)
+    namespace: Dict[str, Any] = {"cls": cls, "new": object.__new__, "parse_dt": _parse_datetime}
+    lines = []
+    for i, f in enumerate(dataclasses.fields(cls)):
+        kind, nested = _field_kind(hints[f.name])
+        if kind in ("dataclass", "list"):
+            namespace[f"dec_{i}"] = build_decoder(nested)
+
+        def convert(expr: str) -> str:
+            if kind == "dataclass":
+                return f"(dec_{i}(v) if isinstance(v := {expr}, dict) else v)"
+            if kind == "list":
+                return f"[dec_{i}(x) if isinstance(x, dict) else x for x in ({expr} or ())]"
+            if kind == "datetime":
+                return f"parse_dt({expr})"
+            return expr
+
+        if f.default is not _MISSING:
+            namespace[f"default_{i}"] = f.default
+            value = convert(f"get({f.name!r}, default_{i})")
+        elif f.default_factory is not _MISSING and kind == "list":
+            value = convert(f"get({f.name!r})")
+        elif f.default_factory is not _MISSING:
+            namespace[f"factory_{i}"] = f.default_factory
+            value = f"(factory_{i}() if (v := get({f.name!r})) is None else {convert('v')})"
+        else:
+            value = convert(f"doc[{f.name!r}]")
+        lines.append(f"    obj.{f.name} = {value}")
+    # Slots are filled directly: __init__ would only re-check arguments the generated code already resolved
+    source = "def decode(doc):\n    get = doc.get\n    obj = new(cls)\n" + "\n".join(lines) + "\n    return obj\n"
+    return _compile(cls, source, namespace, "decode")
+
+
+def build_encoder(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    """Generates cls -> plain dict (nested value objects as dicts, datetimes as ISO strings)."""
+    hints = typing.get_type_hints(cls)
+    namespace: Dict[str, Any] = {"format_dt": _format_datetime}
+    items = []
+    for i, f in enumerate(dataclasses.fields(cls)):
+        kind, nested = _field_kind(hints[f.name])
+        value = f"obj.{f.name}"
+        if kind == "dataclass":
+            namespace[f"enc_{i}"] = build_encoder(nested)
+            value = f"(None if (v := {value}) is None else enc_{i}(v))"
+        elif kind == "list":
+            namespace[f"enc_{i}"] = build_encoder(nested)
+            value = f"[enc_{i}(x) for x in {value}]"
+        elif kind == "datetime":
+            value = f"format_dt({value})"
+        items.append(f"        {f.name!r}: {value},")
+    source = "def encode(obj):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    return _compile(cls, source, namespace, "encode")
+
+
+decode_service = build_decoder(Service)
+encode_service = build_encoder(Service)
+decode_vendor = build_decoder(Vendor)
+encode_vendor = build_encoder(Vendor)
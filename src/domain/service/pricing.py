@@ -0,0 +1,85 @@
+import logging
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
+# Service fields the materialized prices are derived from; writes touching any of them recompute the prices
+PRICE_INPUT_FIELDS = ("base_price", "is_on_sale", "sale_price", "pricing_tiers", "pricing_rules")
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=UTC)
+    return None
+
+def validate_pricing_rules(rules: Any) -> None:
+    """Raises ValueError describing the first pricing rule whose shape or valid_from/valid_to is malformed."""
+    if rules is None:
+        return
+    if not isinstance(rules, list):
+        raise ValueError("pricing_rules must be an array")
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"pricing_rules[{i}] is not an object")
+        for key in ("valid_from", "valid_to"):
+            value = rule.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, (str, datetime)):
+                raise ValueError(f"pricing_rules[{i}].{key} must be an ISO timestamp")
+            try:
+                _as_datetime(value)
+            except ValueError:
+                raise ValueError(f"pricing_rules[{i}].{key} is not a valid ISO timestamp: {value!r}") from None
+
+def _price(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def compute_prices(service: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """
+    Derives the materialized price fields of a service document at `now`:
+    - effective_price: the lowest price a customer can pay for one unit right now, i.e. the sale price
+      (when on sale) or base price, a single-unit pricing tier, or a pricing rule whose window is open;
+    - min_tier_price: the lowest price across all pricing tiers (volume pricing), or None;
+    - price_refresh_at: when the next rule window opens or closes (ISO timestamp), or None.
+    Rules with a malformed window (stored before validate_pricing_rules existed) are skipped and logged.
+    """
+    candidates = []
+    list_price = _price(service.get("sale_price")) if service.get("is_on_sale") else None
+    if list_price is None:
+        list_price = _price(service.get("base_price"))
+    if list_price is not None:
+        candidates.append(list_price)
+
+    tier_prices = []
+    for tier in service.get("pricing_tiers") or ():
+        price = _price(tier.get("price"))
+        if price is None:
+            continue
+        tier_prices.append(price)
+        if (tier.get("min_quantity") or 1) <= 1:
+            candidates.append(price)
+
+    refresh_at: Optional[datetime] = None
+    for rule in service.get("pricing_rules") or ():
+        try:
+            start, end = _as_datetime(rule.get("valid_from")), _as_datetime(rule.get("valid_to"))
+        except (AttributeError, TypeError, ValueError) as e:
+            logging.warning("Skipping malformed pricing rule of service %s: %s", service.get("id"), e)
+            continue
+        if start is not None and start > now:
+            refresh_at = start if refresh_at is None else min(refresh_at, start)
+            continue
+        if end is not None and end <= now:
+            continue
+        if end is not None:
+            refresh_at = end if refresh_at is None else min(refresh_at, end)
+        price = _price(rule.get("price"))
+        if price is not None:
+            candidates.append(price)
+
+    return {
+        "effective_price": min(candidates) if candidates else None,
+        "min_tier_price": min(tier_prices) if tier_prices else None,
+        "price_refresh_at": refresh_at.astimezone(UTC).isoformat() if refresh_at else None,
+    }
@@ -3,7 +3,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from .value_objects import PricingTier, ServiceAttribute, MediaReference, PricingRule, AvailabilityRule
 
-@dataclass
+@dataclass(slots=True)
 class Service:
     id: str  # System should generate if not provided (e.g., UUID)
     name: Dict[str, str]
@@ -20,6 +20,9 @@ class Service:
     availability_rules: List[AvailabilityRule] = field(default_factory=list)
     is_on_sale: bool = False
     sale_price: Optional[float] = None
+    effective_price: Optional[float] = None  # Materialized from the fields above (see pricing.py); system managed
+    min_tier_price: Optional[float] = None  # Lowest pricing tier price; system managed
+    price_refresh_at: Optional[datetime] = None  # Next pricing rule window change; system managed
     tags: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     attributes: List[ServiceAttribute] = field(default_factory=list)
@@ -28,31 +31,13 @@ class Service:
     created_at: datetime = field(default_factory=datetime.utcnow)  # System sets on creation
     updated_at: datetime = field(default_factory=datetime.utcnow)  # System sets on creation/update
     available_locations: List[str] = field(default_factory=list)
+    availability_index: List[Dict[str, Any]] = field(default_factory=list)  # Flattened locations x rule windows (see availability.py); system managed
+    availability_blackouts: List[Dict[str, Any]] = field(default_factory=list)  # Windows of is_available=False rules; system managed
     images: List[MediaReference] = field(default_factory=list)
     videos: List[MediaReference] = field(default_factory=list)
     external_refs: Dict[str, Any] = field(default_factory=dict)  # For downstream/external system IDs
 
     def to_dict(self):
-        """Converts the Service dataclass instance to a dictionary, handling nested dataclasses."""
-        try:
-            data = {k: v for k, v in self.__dict__.items() if not k.startswith('_')} # Exclude internal fields
-            
-            # Convert nested dataclass lists to dicts
-            data['pricing_tiers'] = [tier.__dict__ for tier in self.pricing_tiers]
-            data['attributes'] = [attr.__dict__ for attr in self.attributes]
-            data['images'] = [img.__dict__ for img in self.images]
-            data['videos'] = [vid.__dict__ for vid in self.videos]
-            data['pricing_rules'] = [rule.__dict__ for rule in self.pricing_rules]
-            data['availability_rules'] = [rule.__dict__ for rule in self.availability_rules]
-
-            # Convert datetime objects to ISO format string for JSON
-            if isinstance(data['created_at'], datetime):
-                data['created_at'] = data['created_at'].isoformat()
-            if isinstance(data['updated_at'], datetime):
-                data['updated_at'] = data['updated_at'].isoformat()
-            
-            return data
-        except Exception as e:
-            import logging
-            logging.error("Error serializing Service to dict: %s", e)
-            return {}
+        """Converts the Service to a plain dictionary (nested value objects as dicts, datetimes as ISO strings)."""
+        from .codec import encode_service # Imported lazily: the codec module is generated from this class
+        return encode_service(self)
@@ -2,37 +2,37 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class PricingTier:
     min_quantity: int
     price: int
     currency: str
 
-@dataclass
+@dataclass(slots=True)
 class ServiceAttribute:
     name: str
     value: Any
     localized: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class MediaReference:
     url: str
     type: str
     alt_text: Optional[Dict[str, str]] = None  # Localized text, e.g. {"en": "Haircut"}
 
-@dataclass
+@dataclass(slots=True)
 class Contact:
     email: str
     phone: Optional[str] = None
     address: Optional[Dict[str, str]] = None # Simplified address for now
 
-@dataclass
+@dataclass(slots=True)
 class Rating:
     average: float
     count: int
     breakdown: Optional[Dict[str, int]] = None
 
-@dataclass
+@dataclass(slots=True)
 class PricingRule:
     rule_type: str
     conditions: Dict[str, Any] = field(default_factory=dict)
@@ -41,7 +41,7 @@ class PricingRule:
     valid_from: Optional[datetime] = None
     valid_to: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class AvailabilityRule:
     conditions: Dict[str, Any] = field(default_factory=dict)
     is_available: bool = True
@@ -3,7 +3,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from .value_objects import MediaReference, Contact, Rating
 
-@dataclass
+@dataclass(slots=True)
 class Vendor:
     id: str
     name: str
@@ -22,28 +22,6 @@ class Vendor:
     payment_terms: str = ""
 
     def to_dict(self):
-        """Converts the Vendor dataclass instance to a dictionary, handling nested dataclasses."""
-        try:
-            data = {k: v for k, v in self.__dict__.items() if not k.startswith('_')} # Exclude internal fields
-
-            # Convert nested dataclasses to dicts
-            if isinstance(self.contact, Contact):
-                data['contact'] = self.contact.__dict__
-            if isinstance(self.rating, Rating):
-                data['rating'] = self.rating.__dict__
-            if isinstance(self.logo, MediaReference):
-                data['logo'] = self.logo.__dict__
-            if isinstance(self.cover_image, MediaReference):
-                data['cover_image'] = self.cover_image.__dict__
-
-            # Convert datetime objects to ISO format string for JSON
-            if isinstance(data['created_at'], datetime):
-                data['created_at'] = data['created_at'].isoformat()
-            if isinstance(data['updated_at'], datetime):
-                data['updated_at'] = data['updated_at'].isoformat()
-            
-            return data
-        except Exception as e:
-            import logging
-            logging.error("Error serializing Vendor to dict: %s", e)
-            return {}
+        """Converts the Vendor to a plain dictionary (nested value objects as dicts, datetimes as ISO strings)."""
+        from .codec import encode_vendor # Imported lazily: the codec module is generated from this class
+        return encode_vendor(self)
@@ -0,0 +1,390 @@
+import json
+import logging
+import os
+from datetime import datetime, UTC
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, errors
+
+from src.infrastructure.bulk_writes import BULK_CHUNK_SIZE, bulk_insert_async, bulk_update_async, bulk_soft_delete_async
+from src.infrastructure.cache import TTLCache, cache_from_env
+from src.infrastructure.indexes import summarize_explain
+from src.infrastructure.mongo_connection import get_async_database
+from src.infrastructure.query_utils import CHANGES_SORT, apply_projection, build_projection, changes_query, fill_system_fields, keyset_condition, keyset_sort
+from src.infrastructure.service_repository import (
+    DERIVED_INPUT_FIELDS, DERIVED_REFRESH_PROJECTION, DERIVED_UPDATE_ATTEMPTS, DERIVED_UPDATE_PROJECTION, INTERNAL_SERVICE_FIELDS,
+    LOCALIZED_SERVICE_FIELDS, SERVICE_FIELDS, SERVICE_OUTPUT_PROJECTION, availability_query, build_service_query, derived_refresh_ops,
+    derived_refresh_query, derived_update, facet_cache_key, facet_counts, facet_stage, graph_level_query, page_stages, public_service,
+    service_with_vendor_pipeline, strip_derived_fields, unwrap_vendor_details, with_derived_fields, with_derived_updates,
+)
+from src.infrastructure.vendor_summaries import (
+    SUMMARY_COLLECTION, SUMMARY_INPUT_FIELDS, SUMMARY_INPUT_PROJECTION, bounds_pipeline, bounds_update_ops, build_summaries,
+    bulk_delete_pairs, bulk_update_pairs, rebuild_ops, rebuild_pipeline, stale_bounds, summary_changes, summary_update_ops, updated_image,
+)
+
+
+class AsyncServiceRepository:
+    """
+    asyncio counterpart of ServiceRepository backed by motor.
+    Same queries, caching and return values; every I/O method is a coroutine.
+    """
+
+    def __init__(self, mongo_url=None, db_name=None, db=None):
+        db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
+        self.db = db if db is not None else get_async_database(db_name, mongo_url)
+        self.client = self.db.client
+        self.collection = self.db.services
+        self.summaries = self.db[SUMMARY_COLLECTION]
+        self.cache = cache_from_env("services")
+        # Latest updated_at of the collection (list validators); local writes drop it, other processes' show up within the TTL
+        self.version_cache = TTLCache(maxsize=1, ttl=float(os.getenv("CATALOG_VERSION_CACHE_TTL", "1")), name="service_versions")
+        self.count_cache = TTLCache(maxsize=1024, ttl=float(os.getenv("CATALOG_COUNT_CACHE_TTL", "10")), name="service_counts")
+        self.facet_cache = TTLCache(maxsize=512, ttl=float(os.getenv("CATALOG_FACET_CACHE_TTL", "30")), name="service_facets")
+        logging.info("AsyncServiceRepository initialized with DB: %s", self.db.name)
+
+    def _projection(self, fields: Optional[List[str]] = None, lang: Optional[str] = None, extra: tuple = ()) -> Dict[str, int]:
+        return build_projection(fields, lang, LOCALIZED_SERVICE_FIELDS, SERVICE_FIELDS, extra, INTERNAL_SERVICE_FIELDS)
+
+    def _list_cursor(self, filters: Optional[Dict[str, Any]], skip: int, limit: int, sort: Optional[List[tuple]], projection: Optional[Dict[str, int]] = None):
+        cursor = self.collection.find(build_service_query(filters), projection or SERVICE_OUTPUT_PROJECTION).skip(skip).limit(limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
+    def _keyset_cursor(self, filters: Optional[Dict[str, Any]], limit: int, sort_field: str, direction: int, after: Optional[tuple], projection: Optional[Dict[str, int]] = None):
+        query = build_service_query(filters)
+        if after is not None:
+            query = {"$and": [query, keyset_condition(sort_field, direction, after[0], after[1])]}
+        return self.collection.find(query, projection or SERVICE_OUTPUT_PROJECTION).sort(keyset_sort(sort_field, direction)).limit(limit)
+
+    def _invalidate(self, service_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(service_id)
+        self.version_cache.invalidate("last_modified")
+
+    async def last_modified(self) -> Optional[str]:
+        cached = self.version_cache.get("last_modified")
+        if cached is not None:
+            return cached or None
+        try:
+            doc = await self.collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest service update: %s", e)
+            return None
+        value = str(doc["updated_at"]) if doc and doc.get("updated_at") else ""
+        self.version_cache.set("last_modified", value)
+        return value or None
+
+    async def get_all_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        try:
+            return await self._list_cursor(filters, skip, limit, sort, self._projection(fields, lang)).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error fetching all services: %s", e)
+            return []
+
+    async def get_services_after(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = ASCENDING, after: Optional[tuple] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        try:
+            return await self._keyset_cursor(filters, limit, sort_field, direction, after, self._projection(fields, lang, (sort_field,))).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error fetching services page: %s", e)
+            return []
+
+    async def explain_all_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None) -> Dict[str, Any]:
+        return summarize_explain(await self._list_cursor(filters, skip, limit, sort).explain())
+
+    async def explain_services_after(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = ASCENDING, after: Optional[tuple] = None) -> Dict[str, Any]:
+        return summarize_explain(await self._keyset_cursor(filters, limit, sort_field, direction, after).explain())
+
+    async def count_services(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact") -> Optional[int]:
+        query = build_service_query(filters)
+        estimate = mode == "estimate" and query == {"is_deleted": False}
+        key = (estimate, json.dumps(query, sort_keys=True, default=str))
+        total = self.count_cache.get(key)
+        if total is not None:
+            return total
+        try:
+            total = await (self.collection.estimated_document_count() if estimate else self.collection.count_documents(query))
+        except errors.PyMongoError as e:
+            logging.error("Error counting services: %s", e)
+            return None
+        self.count_cache.set(key, total)
+        return total
+
+    async def get_services_with_facets(self, filters: Optional[Dict[str, Any]], facets: List[str], skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None, total: bool = True) -> Tuple[List[Dict], Optional[int], Dict[str, List[Dict]]]:
+        query = build_service_query(filters)
+        key = facet_cache_key(query, facets)
+        cached = self.facet_cache.get(key)
+        if cached is not None and (cached[0] is not None or not total):
+            cached_total, counts = cached
+            return (await self.get_all_services(filters, skip, limit, sort, fields, lang) if limit else []), (cached_total if total else None), counts
+        page = page_stages(skip, limit, sort, self._projection(fields, lang)) if limit else None
+        try:
+            results = await self.collection.aggregate([{"$match": query}, facet_stage(facets, page, total)]).to_list(length=1)
+        except errors.PyMongoError as e:
+            logging.error("Error computing service facets: %s", e)
+            return [], None, {}
+        result = results[0] if results else {}
+        total_count, counts = facet_counts(result, facets)
+        self.facet_cache.set(key, (total_count, counts))
+        if total_count is not None:
+            self.count_cache.set((False, key[0]), total_count)
+        return result.get("page", []), total_count, counts
+
+    async def iter_services(self, batch_size: int = 1000) -> AsyncIterator[Dict]:
+        try:
+            async for doc in self.collection.find({"is_deleted": False}, SERVICE_OUTPUT_PROJECTION, batch_size=batch_size):
+                yield doc
+        except errors.PyMongoError as e:
+            logging.error("Error iterating services: %s", e)
+
+    async def export_services(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Dict]:
+        query = build_service_query(filters, passthrough=False)
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        try:
+            async for doc in self.collection.find(query, SERVICE_OUTPUT_PROJECTION, batch_size=batch_size):
+                yield doc
+        except errors.PyMongoError as e:
+            logging.error("Error exporting services: %s", e)
+
+    async def get_changes(self, after: Optional[tuple], until: str, limit: int) -> List[Dict]:
+        try:
+            return await self.collection.find(changes_query(after, until), SERVICE_OUTPUT_PROJECTION).sort(CHANGES_SORT).limit(limit).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error reading service changes: %s", e)
+            return []
+
+    async def get_service_by_id(self, service_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        projection = self._projection(fields, lang)
+        if self.cache is not None:
+            cached = self.cache.get(service_id)
+            if cached is not None:
+                return apply_projection(cached, projection)
+        try:
+            doc = await self.collection.find_one({"id": service_id, "is_deleted": False}, projection if self.cache is None else {"_id": 0})
+        except errors.PyMongoError as e:
+            logging.error("Error fetching service by id %s: %s", service_id, e)
+            return None
+        if doc is not None and self.cache is not None:
+            self.cache.set(service_id, doc)
+            return apply_projection(doc, projection)
+        return doc
+
+    async def get_services_by_ids(self, service_ids: List[str]) -> Dict[str, Dict]:
+        ids = {sid for sid in service_ids if sid}
+        found: Dict[str, Dict] = {}
+        if self.cache is not None:
+            for sid in ids:
+                cached = self.cache.get(sid)
+                if cached is not None:
+                    found[sid] = public_service(cached)
+        missing = list(ids - found.keys())
+        if missing:
+            try:
+                async for doc in self.collection.find({"id": {"$in": missing}, "is_deleted": False}, {"_id": 0}):
+                    if self.cache is not None:
+                        self.cache.set(doc["id"], doc)
+                    found[doc["id"]] = public_service(doc)
+            except errors.PyMongoError as e:
+                logging.error("Error fetching services by ids: %s", e)
+        return found
+
+    async def get_service_with_vendor(self, service_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        try:
+            docs = await self.collection.aggregate(service_with_vendor_pipeline(service_id, self._projection(fields, lang))).to_list(length=1)
+        except errors.PyMongoError as e:
+            logging.error("Error fetching service with vendor %s: %s", service_id, e)
+            return None
+        return unwrap_vendor_details(docs[0]) if docs else None
+
+    async def filter_services(self, filters: Dict[str, Any]) -> List[Dict]:
+        try:
+            return await self.collection.find(build_service_query(filters, passthrough=False), SERVICE_OUTPUT_PROJECTION).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error filtering services: %s", e)
+            return []
+
+    async def get_available_services(self, location: str, at: datetime, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        query = {**build_service_query(filters, passthrough=False), **availability_query(location, at)}
+        try:
+            return await self.collection.find(query, self._projection(fields, lang)).sort("id", ASCENDING).skip(skip).limit(limit).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error fetching available services: %s", e)
+            return []
+
+    async def get_graph_level(self, parent_ids: List[str], ids: List[str], fields: Optional[List[str]] = None, lang: Optional[str] = None, limit: int = 0) -> List[Dict]:
+        query = graph_level_query(parent_ids, ids)
+        if query is None:
+            return []
+        try:
+            return await self.collection.find(query, self._projection(fields, lang)).sort("id", ASCENDING).limit(limit).to_list(length=None)
+        except errors.PyMongoError as e:
+            logging.error("Error fetching service graph level: %s", e)
+            return []
+
+    async def create_service(self, service_data: Dict[str, Any]) -> Dict:
+        now = datetime.now(UTC)
+        with_derived_fields(fill_system_fields(service_data, now.isoformat()), now)
+        try:
+            await self.collection.insert_one(service_data)
+            service_data.pop("_id", None) # insert_one adds the ObjectId to the dict; responses never carry it
+            self._invalidate(service_data['id'])
+            await self._apply_summary_changes([(None, service_data)])
+            logging.info("Service created: %s", service_data['id'])
+            return public_service(service_data)
+        except errors.PyMongoError as e:
+            logging.error("Error creating service: %s - Data: %s", e, service_data)
+            return {}
+
+    async def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
+        strip_derived_fields(update_data)
+        now = datetime.now(UTC)
+        update_data['updated_at'] = now.isoformat()
+        try:
+            before = await self._write_update(service_id, update_data, now)
+            self._invalidate(service_id)
+            if before is None:
+                logging.warning("Service not found for update: %s", service_id)
+                return None
+            logging.info("Service updated: %s", service_id)
+            if any(k in update_data for k in SUMMARY_INPUT_FIELDS):
+                await self._apply_summary_changes([(before, updated_image(before, update_data))])
+            return await self.get_service_by_id(service_id)
+        except errors.PyMongoError as e:
+            logging.error("Error updating service %s: %s", service_id, e)
+            return None
+
+    async def _write_update(self, service_id: str, update_data: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
+        if not any(k in update_data for k in DERIVED_INPUT_FIELDS):
+            return await self.collection.find_one_and_update({"id": service_id}, {"$set": update_data}, projection=SUMMARY_INPUT_PROJECTION,
+                                                             return_document=ReturnDocument.BEFORE)
+        for attempt in range(DERIVED_UPDATE_ATTEMPTS):
+            current = await self.collection.find_one({"id": service_id}, DERIVED_UPDATE_PROJECTION)
+            if current is None:
+                return None
+            query = {"id": service_id}
+            if attempt < DERIVED_UPDATE_ATTEMPTS - 1:
+                query["updated_at"] = current.get("updated_at")
+            before = await self.collection.find_one_and_update(query, {"$set": derived_update(current, update_data, now)},
+                                                               projection=SUMMARY_INPUT_PROJECTION, return_document=ReturnDocument.BEFORE)
+            if before is not None:
+                return before
+        return None
+
+    async def soft_delete_service(self, service_id: str) -> None:
+        try:
+            before = await self.collection.find_one_and_update({"id": service_id}, {"$set": {"is_deleted": True, "updated_at": datetime.now(UTC).isoformat()}},
+                                                               projection=SUMMARY_INPUT_PROJECTION, return_document=ReturnDocument.BEFORE)
+            self._invalidate(service_id)
+            if before is None:
+                logging.warning("Service not found for soft delete: %s", service_id)
+            else:
+                await self._apply_summary_changes([(before, None)])
+                logging.info("Service soft-deleted: %s", service_id)
+        except errors.PyMongoError as e:
+            logging.error("Error soft-deleting service %s: %s", service_id, e)
+
+    async def bulk_create_services(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        now = datetime.now(UTC)
+        docs = [with_derived_fields(fill_system_fields(item, now.isoformat()), now) for item in items]
+        results = await bulk_insert_async(self.collection, docs, chunk_size, self._invalidate)
+        await self._apply_summary_changes([(None, r["document"]) for r in results if r["status"] == "created"])
+        return results
+
+    async def bulk_update_services(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        now = datetime.now(UTC)
+        items = [strip_derived_fields(item) for item in items]
+        current = await self._derived_inputs([item["id"] for item in items if any(k in item for k in DERIVED_INPUT_FIELDS)])
+        items = with_derived_updates(items, current, now)
+        before = await self._summary_inputs([item["id"] for item in items if any(k in item for k in SUMMARY_INPUT_FIELDS)])
+        results = await bulk_update_async(self.collection, items, now.isoformat(), chunk_size, self._invalidate)
+        await self._apply_summary_changes(bulk_update_pairs(before, items, results))
+        return results
+
+    async def bulk_soft_delete_services(self, service_ids: List[str], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        before = await self._summary_inputs(service_ids)
+        results = await bulk_soft_delete_async(self.collection, service_ids, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
+        await self._apply_summary_changes(bulk_delete_pairs(before, results))
+        return results
+
+    async def _derived_inputs(self, service_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not service_ids:
+            return {}
+        try:
+            return {doc["id"]: doc async for doc in self.collection.find({"id": {"$in": service_ids}, "is_deleted": False}, DERIVED_UPDATE_PROJECTION)}
+        except errors.PyMongoError as e:
+            logging.error("Error reading services before a bulk write: %s", e)
+            return {}
+
+    async def _summary_inputs(self, service_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not service_ids:
+            return {}
+        try:
+            return {doc["id"]: doc async for doc in self.collection.find({"id": {"$in": service_ids}}, SUMMARY_INPUT_PROJECTION)}
+        except errors.PyMongoError as e:
+            logging.error("Error reading services before a bulk write: %s", e)
+            return {}
+
+    async def _apply_summary_changes(self, pairs: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """asyncio counterpart of ServiceRepository._apply_summary_changes."""
+        changes = summary_changes(pairs)
+        if not changes:
+            return
+        try:
+            ops, rebuild = summary_update_ops(changes, datetime.now(UTC).isoformat())
+            if ops:
+                await self.summaries.bulk_write(ops, ordered=False)
+            removed = [vendor_id for vendor_id, change in changes.items() if change["removed"] and vendor_id not in rebuild]
+            stale = stale_bounds(changes, await self.summaries.find({"vendor_id": {"$in": removed}}, {"_id": 0}).to_list(length=None)) if removed else []
+            if stale:
+                rows = await self.collection.aggregate(bounds_pipeline(stale)).to_list(length=None)
+                await self.summaries.bulk_write(bounds_update_ops(stale, rows), ordered=False)
+            if rebuild:
+                await self.rebuild_vendor_summaries(sorted(rebuild))
+        except errors.PyMongoError as e:
+            logging.error("Error updating vendor summaries of %s: %s", sorted(changes), e)
+
+    async def rebuild_vendor_summaries(self, vendor_ids: Optional[List[str]] = None) -> int:
+        """asyncio counterpart of ServiceRepository.rebuild_vendor_summaries."""
+        now = datetime.now(UTC).isoformat()
+        try:
+            rows = await self.collection.aggregate(rebuild_pipeline(vendor_ids), allowDiskUse=True).to_list(length=None)
+            summaries = build_summaries(rows, now)
+            known = vendor_ids if vendor_ids is not None else [doc["vendor_id"] async for doc in self.summaries.find({}, {"_id": 0, "vendor_id": 1})]
+            ops = rebuild_ops(summaries, known, now)
+            for start in range(0, len(ops), BULK_CHUNK_SIZE):
+                await self.summaries.bulk_write(ops[start:start + BULK_CHUNK_SIZE], ordered=False)
+        except errors.PyMongoError as e:
+            logging.error("Error rebuilding vendor summaries: %s", e)
+            return 0
+        if vendor_ids is None:
+            logging.info("Rebuilt the summaries of %d vendors", len(ops))
+        return len(ops)
+
+    async def _write_derived_fields(self, docs: List[Dict[str, Any]], now: datetime) -> Dict[str, Dict[str, Any]]:
+        ops, changed = derived_refresh_ops(docs, now)
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+            for service_id in changed:
+                self._invalidate(service_id)
+        return changed
+
+    async def refresh_derived_fields(self, service_ids: Optional[List[str]] = None, all_services: bool = False) -> Dict[str, Dict[str, Any]]:
+        """asyncio counterpart of ServiceRepository.refresh_derived_fields."""
+        now = datetime.now(UTC)
+        query = derived_refresh_query(service_ids, None if all_services else now.isoformat())
+        changed: Dict[str, Dict[str, Any]] = {}
+        batch: List[Dict[str, Any]] = []
+        try:
+            async for doc in self.collection.find(query, DERIVED_REFRESH_PROJECTION, batch_size=BULK_CHUNK_SIZE):
+                batch.append(doc)
+                if len(batch) == BULK_CHUNK_SIZE:
+                    changed.update(await self._write_derived_fields(batch, now))
+                    batch = []
+            if batch:
+                changed.update(await self._write_derived_fields(batch, now))
+        except errors.PyMongoError as e:
+            logging.error("Error refreshing derived service fields: %s", e)
+        if service_ids is None:
+            logging.info("Refreshed derived fields of %d services", len(changed))
+        return changed
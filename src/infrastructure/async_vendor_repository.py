@@ -0,0 +1,150 @@
+import logging
+import os
+from datetime import datetime, UTC
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pymongo import DESCENDING, errors
+
+from src.infrastructure.bulk_writes import bulk_insert_async, bulk_update_async, bulk_soft_delete_async
+from src.infrastructure.cache import TTLCache, cache_from_env
+from src.infrastructure.indexes import summarize_explain
+from src.infrastructure.mongo_connection import get_async_database
+from src.infrastructure.query_utils import CHANGES_SORT, changes_query, fill_system_fields, build_projection, apply_projection
+from src.infrastructure.vendor_repository import LOCALIZED_VENDOR_FIELDS, VENDOR_FIELDS
+from src.infrastructure.vendor_summaries import SUMMARY_COLLECTION
+
+
+class AsyncVendorRepository:
+    """
+    asyncio counterpart of VendorRepository backed by motor.
+    Same queries, caching and return values; every I/O method is a coroutine.
+    """
+
+    def __init__(self, mongo_url=None, db_name=None, db=None):
+        db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
+        self.db = db if db is not None else get_async_database(db_name, mongo_url)
+        self.client = self.db.client
+        self.collection = self.db.vendors
+        self.summaries = self.db[SUMMARY_COLLECTION]
+        self.cache = cache_from_env("vendors")
+        # Latest updated_at of the collection (list validators); local writes drop it, other processes' show up within the TTL
+        self.version_cache = TTLCache(maxsize=1, ttl=float(os.getenv("CATALOG_VERSION_CACHE_TTL", "1")), name="vendor_versions")
+        logging.info("AsyncVendorRepository initialized with DB: %s", self.db.name)
+
+    def _invalidate(self, vendor_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(vendor_id)
+        self.version_cache.invalidate("last_modified")
+
+    async def last_modified(self) -> Optional[str]:
+        cached = self.version_cache.get("last_modified")
+        if cached is not None:
+            return cached or None
+        try:
+            doc = await self.collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest vendor update: %s", e)
+            return None
+        value = str(doc["updated_at"]) if doc and doc.get("updated_at") else ""
+        self.version_cache.set("last_modified", value)
+        return value or None
+
+    def _projection(self, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Dict[str, int]:
+        return build_projection(fields, lang, LOCALIZED_VENDOR_FIELDS, VENDOR_FIELDS)
+
+    async def get_all_vendors(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        query = dict(filters or {})
+        query["is_deleted"] = False
+        return await self.collection.find(query, self._projection(fields, lang)).to_list(length=None)
+
+    async def explain_all_vendors(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        query = dict(filters or {})
+        query["is_deleted"] = False
+        return summarize_explain(await self.collection.find(query, {"_id": 0}).explain())
+
+    async def export_vendors(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Dict]:
+        query = dict(filters or {})
+        query["is_deleted"] = False
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        async for doc in self.collection.find(query, {"_id": 0}, batch_size=batch_size):
+            yield doc
+
+    async def get_changes(self, after: Optional[tuple], until: str, limit: int) -> List[Dict]:
+        return await self.collection.find(changes_query(after, until), {"_id": 0}).sort(CHANGES_SORT).limit(limit).to_list(length=None)
+
+    async def get_vendor_by_id(self, vendor_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        projection = self._projection(fields, lang)
+        if self.cache is not None:
+            cached = self.cache.get(vendor_id)
+            if cached is not None:
+                return apply_projection(cached, projection)
+        doc = await self.collection.find_one({"id": vendor_id, "is_deleted": False}, projection if self.cache is None else {"_id": 0})
+        if doc is not None and self.cache is not None:
+            self.cache.set(vendor_id, doc)
+            return apply_projection(doc, projection)
+        return doc
+
+    async def get_vendors_by_ids(self, vendor_ids: List[str]) -> Dict[str, Dict]:
+        ids = {vid for vid in vendor_ids if vid}
+        found: Dict[str, Dict] = {}
+        if self.cache is not None:
+            for vid in ids:
+                cached = self.cache.get(vid)
+                if cached is not None:
+                    found[vid] = dict(cached)
+        missing = list(ids - found.keys())
+        if missing:
+            async for doc in self.collection.find({"id": {"$in": missing}, "is_deleted": False}, {"_id": 0}):
+                if self.cache is not None:
+                    self.cache.set(doc["id"], doc)
+                found[doc["id"]] = dict(doc)
+        return found
+
+    async def get_vendor_summary(self, vendor_id: str) -> Optional[Dict]:
+        return await self.summaries.find_one({"vendor_id": vendor_id}, {"_id": 0})
+
+    async def get_vendor_summaries(self, vendor_ids: List[str]) -> Dict[str, Dict]:
+        ids = [vid for vid in vendor_ids if vid]
+        if not ids:
+            return {}
+        return {doc["vendor_id"]: doc async for doc in self.summaries.find({"vendor_id": {"$in": ids}}, {"_id": 0})}
+
+    async def summaries_last_modified(self) -> Optional[str]:
+        try:
+            doc = await self.summaries.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest vendor summary update: %s", e)
+            return None
+        return str(doc["updated_at"]) if doc and doc.get("updated_at") else None
+
+    async def create_vendor(self, vendor_data: Dict[str, Any]) -> Dict:
+        fill_system_fields(vendor_data, datetime.now(UTC).isoformat())
+        await self.collection.insert_one(vendor_data)
+        vendor_data.pop("_id", None) # insert_one adds the ObjectId to the dict; responses never carry it
+        self._invalidate(vendor_data['id'])
+        logging.info("Vendor created: %s", vendor_data['id'])
+        return vendor_data
+
+    async def update_vendor(self, vendor_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
+        update_data['updated_at'] = datetime.now(UTC).isoformat()
+        await self.collection.update_one({"id": vendor_id}, {"$set": update_data})
+        self._invalidate(vendor_id)
+        logging.info("Vendor updated: %s", vendor_id)
+        return await self.get_vendor_by_id(vendor_id)
+
+    async def soft_delete_vendor(self, vendor_id: str) -> None:
+        await self.collection.update_one({"id": vendor_id}, {"$set": {"is_deleted": True, "updated_at": datetime.now(UTC).isoformat()}})
+        self._invalidate(vendor_id)
+        logging.info("Vendor soft-deleted: %s", vendor_id)
+
+    async def bulk_create_vendors(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        now = datetime.now(UTC).isoformat()
+        docs = [fill_system_fields(item, now) for item in items]
+        return await bulk_insert_async(self.collection, docs, chunk_size, self._invalidate)
+
+    async def bulk_update_vendors(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await bulk_update_async(self.collection, items, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
+
+    async def bulk_soft_delete_vendors(self, vendor_ids: List[str], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await bulk_soft_delete_async(self.collection, vendor_ids, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
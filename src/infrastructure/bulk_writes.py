@@ -0,0 +1,202 @@
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pymongo import UpdateOne, errors
+
+# Documents per insert_many/bulk_write call in the bulk endpoints
+BULK_CHUNK_SIZE = int(os.getenv("CATALOG_BULK_CHUNK_SIZE", "500"))
+
+# Per-item results share this shape: {"index", "id", "status", "error"?, "document"?}
+# The async variants issue the same calls through a motor collection.
+
+
+def _write_errors(e: errors.BulkWriteError) -> Dict[int, str]:
+    """Maps chunk-relative operation indexes to their error message."""
+    return {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+
+
+def _insert_results(chunk: List[Dict[str, Any]], start: int, failed: Dict[int, str],
+                    invalidate: Optional[Callable[[str], None]]) -> List[Dict[str, Any]]:
+    results = []
+    for i, doc in enumerate(chunk):
+        doc.pop("_id", None)  # added by insert_many
+        if invalidate:
+            invalidate(doc["id"])
+        if i in failed:
+            results.append({"index": start + i, "id": doc["id"], "status": "error", "error": failed[i]})
+        else:
+            results.append({"index": start + i, "id": doc["id"], "status": "created", "document": doc})
+    return results
+
+
+def _update_ops(chunk: List[Dict[str, Any]], updated_at: str) -> List[UpdateOne]:
+    ops = []
+    for item in chunk:
+        update_data = {k: v for k, v in item.items() if k != "id"}
+        update_data["updated_at"] = updated_at
+        ops.append(UpdateOne({"id": item["id"]}, {"$set": update_data}))
+    return ops
+
+
+def _update_results(ids: List[str], start: int, failed: Dict[int, str], fresh: Dict[str, Dict[str, Any]],
+                    invalidate: Optional[Callable[[str], None]]) -> List[Dict[str, Any]]:
+    results = []
+    for i, doc_id in enumerate(ids):
+        if invalidate:
+            invalidate(doc_id)
+        if i in failed:
+            results.append({"index": start + i, "id": doc_id, "status": "error", "error": failed[i]})
+        elif doc_id in fresh:
+            results.append({"index": start + i, "id": doc_id, "status": "updated", "document": fresh[doc_id]})
+        else:
+            results.append({"index": start + i, "id": doc_id, "status": "not_found"})
+    return results
+
+
+def _delete_results(chunk: List[str], start: int, active: Set[str], error: Optional[str],
+                    invalidate: Optional[Callable[[str], None]]) -> List[Dict[str, Any]]:
+    results = []
+    for i, doc_id in enumerate(chunk):
+        if invalidate:
+            invalidate(doc_id)
+        if error:
+            results.append({"index": start + i, "id": doc_id, "status": "error", "error": error})
+        else:
+            results.append({"index": start + i, "id": doc_id, "status": "deleted" if doc_id in active else "not_found"})
+    return results
+
+
+def bulk_insert(collection, docs: List[Dict[str, Any]], chunk_size: Optional[int] = None,
+                invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Inserts documents (which must already carry an 'id') with unordered insert_many calls.
+    Returns status "created" (with the inserted "document") or "error" per document, in input order.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(docs), chunk_size):
+        chunk = docs[start:start + chunk_size]
+        failed: Dict[int, str] = {}
+        try:
+            collection.insert_many(chunk, ordered=False)
+        except errors.BulkWriteError as e:
+            failed = _write_errors(e)
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk insert on %s: %s", collection.name, e)
+            failed = {i: str(e) for i in range(len(chunk))}
+        results.extend(_insert_results(chunk, start, failed, invalidate))
+    return results
+
+
+def bulk_update(collection, items: List[Dict[str, Any]], updated_at: str, chunk_size: Optional[int] = None,
+                invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Applies partial updates ({"id": ..., <fields>}) with unordered bulk_write calls, then re-reads the
+    chunk in one $in query. Returns status "updated" (with the fresh "document"), "not_found" or "error".
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        failed: Dict[int, str] = {}
+        try:
+            collection.bulk_write(_update_ops(chunk, updated_at), ordered=False)
+        except errors.BulkWriteError as e:
+            failed = _write_errors(e)
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk update on %s: %s", collection.name, e)
+            failed = {i: str(e) for i in range(len(chunk))}
+        ids = [item["id"] for item in chunk]
+        try:
+            fresh = {doc["id"]: doc for doc in collection.find({"id": {"$in": ids}, "is_deleted": False}, {"_id": 0})}
+        except errors.PyMongoError as e:
+            logging.error("Error reading bulk-updated documents on %s: %s", collection.name, e)
+            fresh = {}
+        results.extend(_update_results(ids, start, failed, fresh, invalidate))
+    return results
+
+
+def bulk_soft_delete(collection, ids: List[str], updated_at: str, chunk_size: Optional[int] = None,
+                     invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Soft-deletes documents by id with one update_many per chunk, stamping updated_at.
+    Returns status "deleted", "not_found" (unknown or already deleted) or "error" per id.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        error = None
+        try:
+            active = {doc["id"] for doc in collection.find({"id": {"$in": chunk}, "is_deleted": False}, {"id": 1})}
+            if active:
+                collection.update_many({"id": {"$in": list(active)}}, {"$set": {"is_deleted": True, "updated_at": updated_at}})
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk soft delete on %s: %s", collection.name, e)
+            active, error = set(), str(e)
+        results.extend(_delete_results(chunk, start, active, error, invalidate))
+    return results
+
+
+async def bulk_insert_async(collection, docs: List[Dict[str, Any]], chunk_size: Optional[int] = None,
+                            invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """asyncio counterpart of bulk_insert for motor collections."""
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(docs), chunk_size):
+        chunk = docs[start:start + chunk_size]
+        failed: Dict[int, str] = {}
+        try:
+            await collection.insert_many(chunk, ordered=False)
+        except errors.BulkWriteError as e:
+            failed = _write_errors(e)
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk insert on %s: %s", collection.name, e)
+            failed = {i: str(e) for i in range(len(chunk))}
+        results.extend(_insert_results(chunk, start, failed, invalidate))
+    return results
+
+
+async def bulk_update_async(collection, items: List[Dict[str, Any]], updated_at: str, chunk_size: Optional[int] = None,
+                            invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """asyncio counterpart of bulk_update for motor collections."""
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        failed: Dict[int, str] = {}
+        try:
+            await collection.bulk_write(_update_ops(chunk, updated_at), ordered=False)
+        except errors.BulkWriteError as e:
+            failed = _write_errors(e)
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk update on %s: %s", collection.name, e)
+            failed = {i: str(e) for i in range(len(chunk))}
+        ids = [item["id"] for item in chunk]
+        try:
+            fresh = {doc["id"]: doc async for doc in collection.find({"id": {"$in": ids}, "is_deleted": False}, {"_id": 0})}
+        except errors.PyMongoError as e:
+            logging.error("Error reading bulk-updated documents on %s: %s", collection.name, e)
+            fresh = {}
+        results.extend(_update_results(ids, start, failed, fresh, invalidate))
+    return results
+
+
+async def bulk_soft_delete_async(collection, ids: List[str], updated_at: str, chunk_size: Optional[int] = None,
+                                 invalidate: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+    """asyncio counterpart of bulk_soft_delete for motor collections."""
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        error = None
+        try:
+            active = {doc["id"] async for doc in collection.find({"id": {"$in": chunk}, "is_deleted": False}, {"id": 1})}
+            if active:
+                await collection.update_many({"id": {"$in": list(active)}}, {"$set": {"is_deleted": True, "updated_at": updated_at}})
+        except errors.PyMongoError as e:
+            logging.error("Error in bulk soft delete on %s: %s", collection.name, e)
+            active, error = set(), str(e)
+        results.extend(_delete_results(chunk, start, active, error, invalidate))
+    return results
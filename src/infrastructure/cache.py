@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from pymongo import errors
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe bounded cache with least-recently-used eviction and a per-entry time to live.
+    Keeps hit, miss and eviction counters for monitoring.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def cache_from_env(name: str, prefix: str = "CATALOG_CACHE") -> Optional[TTLCache]:
+    """
+    Builds a cache sized by <prefix>_SIZE entries with <prefix>_TTL seconds to live.
+    Returns None (caching disabled) when the size is 0.
+    """
+    size = int(os.getenv(f"{prefix}_SIZE", "10000"))
+    if size <= 0:
+        return None
+    return TTLCache(maxsize=size, ttl=float(os.getenv(f"{prefix}_TTL", "60")), name=name)
+
+
+class ChangeStreamInvalidator:
+    """
+    Watches a collection's change stream in a background thread and invalidates cache entries
+    (keyed by the document 'id' field) written by other processes.
+    Requires a replica set or sharded cluster; on a standalone server it logs a warning and stops.
+    """
+
+    def __init__(self, collection, cache: TTLCache):
+        self.collection = collection
+        self.cache = cache
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._resume_token = None
+
+    def start(self) -> "ChangeStreamInvalidator":
+        self._thread = threading.Thread(target=self._run, name=f"{self.cache.name}-invalidator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        # Only the business id is needed to invalidate, so project everything else away
+        pipeline = [{"$project": {"operationType": 1, "documentKey": 1, "fullDocument.id": 1}}]
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                with self.collection.watch(pipeline, full_document="updateLookup",
+                                           resume_after=self._resume_token, max_await_time_ms=1000) as stream:
+                    backoff = 1.0
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        self._resume_token = stream.resume_token
+                        doc_id = (change.get("fullDocument") or {}).get("id")
+                        if doc_id:
+                            self.cache.invalidate(doc_id)
+                        else:
+                            # Deletes and dropped documents carry no business id
+                            self.cache.clear()
+            except errors.OperationFailure as e:
+                logging.warning("Change stream unavailable for %s, cache invalidation stays local: %s", self.cache.name, e)
+                return
+            except errors.PyMongoError as e:
+                logging.error("Change stream for %s interrupted, retrying in %.0fs: %s", self.cache.name, backoff, e)
+                # Events may have been missed while disconnected
+                self.cache.clear()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
@@ -0,0 +1,120 @@
+import argparse
+import json
+import logging
+from typing import Any, Dict, List
+
+from bson import json_util
+from pymongo import ASCENDING, IndexModel, errors
+
+# Most queries only ever touch active documents, so secondary indexes skip soft-deleted ones
+ACTIVE = {"is_deleted": False}
+
+# Declarative index registry: collection name -> indexes that must exist on it
+INDEXES: Dict[str, List[IndexModel]] = {
+    "services": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Price filters and sorts range-scan the materialized effective_price
+        IndexModel([("category", ASCENDING), ("effective_price", ASCENDING), ("id", ASCENDING)],
+                   name="category_effective_price_active", partialFilterExpression=ACTIVE),
+        IndexModel([("effective_price", ASCENDING), ("id", ASCENDING)],
+                   name="effective_price_id_active", partialFilterExpression=ACTIVE),
+        # GET /services/available: location equality plus window start range over the flattened availability entries
+        IndexModel([("availability_index.loc", ASCENDING), ("availability_index.from", ASCENDING)],
+                   name="availability_loc_from_active", partialFilterExpression=ACTIVE),
+        # GET /services/<id>/graph: the components of each level's services
+        IndexModel([("parent_service_ids", ASCENDING)], name="parent_service_ids_active", partialFilterExpression=ACTIVE),
+        # Only services with a pending pricing rule window change are indexed for the scheduled repricing pass
+        IndexModel([("price_refresh_at", ASCENDING)],
+                   name="price_refresh_at_pending", partialFilterExpression={"price_refresh_at": {"$type": "string"}}),
+        IndexModel([("vendor_id", ASCENDING), ("id", ASCENDING)],
+                   name="vendor_id_active", partialFilterExpression=ACTIVE),
+        IndexModel([("tags", ASCENDING)], name="tags_active", partialFilterExpression=ACTIVE),
+        IndexModel([("category", ASCENDING), ("id", ASCENDING)],
+                   name="category_id_active", partialFilterExpression=ACTIVE),
+        IndexModel([("base_price", ASCENDING), ("id", ASCENDING)],
+                   name="base_price_id_active", partialFilterExpression=ACTIVE),
+        # GET /changes range scans and the latest write for list validators; covers soft-deleted documents too
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    "vendors": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("id", ASCENDING)],
+                   name="status_id_active", partialFilterExpression=ACTIVE),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    # Materialized per-vendor statistics (vendor_summaries.py): one document per vendor, upserted by service writes
+    "vendor_summaries": [
+        IndexModel([("vendor_id", ASCENDING)], name="vendor_id_unique", unique=True),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+}
+
+
+def apply_indexes(db) -> Dict[str, List[str]]:
+    """
+    Creates every registered index that does not exist yet. Safe to run repeatedly:
+    existing identical indexes are left untouched, conflicting definitions are logged and skipped.
+    Returns the index names ensured per collection.
+    """
+    ensured: Dict[str, List[str]] = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        ensured[collection_name] = []
+        for model in models:
+            name = model.document["name"]
+            try:
+                collection.create_indexes([model])
+                ensured[collection_name].append(name)
+            except errors.OperationFailure as e:
+                logging.error("Could not create index %s on %s: %s", name, collection_name, e)
+        existing = set(collection.index_information())
+        unmanaged = existing - set(ensured[collection_name]) - {"_id_"}
+        if unmanaged:
+            logging.warning("Unmanaged indexes on %s: %s", collection_name, sorted(unmanaged))
+        logging.info("Indexes ensured on %s: %s", collection_name, ensured[collection_name])
+    return ensured
+
+
+def _collect_stages(plan: Any, stages: List[Dict[str, Any]]) -> None:
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stage = {"stage": plan["stage"]}
+            if "indexName" in plan:
+                stage["indexName"] = plan["indexName"]
+            stages.append(stage)
+        for value in plan.values():
+            _collect_stages(value, stages)
+    elif isinstance(plan, list):
+        for item in plan:
+            _collect_stages(item, stages)
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Condenses explain() output into the winning plan stages, the indexes used and execution counters."""
+    planner = explain.get("queryPlanner", {})
+    stages: List[Dict[str, Any]] = []
+    _collect_stages(planner.get("winningPlan", {}), stages)
+    stats = explain.get("executionStats", {})
+    return {
+        "namespace": planner.get("namespace"),
+        "collscan": any(s["stage"] == "COLLSCAN" for s in stages),
+        "indexes_used": sorted({s["indexName"] for s in stages if "indexName" in s}),
+        "winning_plan_stages": stages,
+        "n_returned": stats.get("nReturned"),
+        "total_keys_examined": stats.get("totalKeysExamined"),
+        "total_docs_examined": stats.get("totalDocsExamined"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+        "raw": json.loads(json_util.dumps(explain)),
+    }
+
+
+if __name__ == "__main__":
+    from src.infrastructure.logging_config import configure_logging
+    from src.infrastructure.mongo_connection import get_database
+
+    parser = argparse.ArgumentParser(description="Apply the catalog index registry to MongoDB.")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--db-name", default=None)
+    args = parser.parse_args()
+    configure_logging()
+    apply_indexes(get_database(args.db_name, args.mongo_url))
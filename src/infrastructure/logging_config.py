@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import numbers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Keys whose values never reach the logs (matched case-insensitively on dict keys)
+REDACT_KEYS = {k.strip().lower() for k in os.getenv(
+    "CATALOG_LOG_REDACT_KEYS",
+    "password,token,secret,authorization,api_key,apikey,cookie,email,phone,tax_id",
+).split(",") if k.strip()}
+REDACTED = "[REDACTED]"
+
+# Bounds applied to every logged argument, so a record costs the same whatever the payload size
+MAX_STRING = int(os.getenv("CATALOG_LOG_MAX_STRING", "256"))
+MAX_ITEMS = int(os.getenv("CATALOG_LOG_MAX_ITEMS", "20"))
+MAX_DEPTH = int(os.getenv("CATALOG_LOG_MAX_DEPTH", "3"))
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_lock = threading.Lock()
+
+
+def redact(value: Any, depth: int = 0) -> Any:
+    """
+    Returns a bounded copy of a log argument: sensitive keys masked, long strings truncated and
+    containers cut to MAX_ITEMS entries and MAX_DEPTH levels.
+    """
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING else f"{value[:MAX_STRING]}...(+{len(value) - MAX_STRING} chars)"
+    if isinstance(value, numbers.Number) or value is None:
+        return value
+    if isinstance(value, dict):
+        if depth >= MAX_DEPTH:
+            return f"{{...{len(value)} keys}}"
+        out = {}
+        for i, (k, v) in enumerate(value.items()):
+            if i >= MAX_ITEMS:
+                out["..."] = f"+{len(value) - MAX_ITEMS} keys"
+                break
+            out[k] = REDACTED if str(k).lower() in REDACT_KEYS else redact(v, depth + 1)
+        return out
+    if isinstance(value, (list, tuple, set)):
+        if depth >= MAX_DEPTH:
+            return f"[...{len(value)} items]"
+        items = [redact(v, depth + 1) for _, v in zip(range(MAX_ITEMS), value)]
+        if len(value) > MAX_ITEMS:
+            items.append(f"...+{len(value) - MAX_ITEMS} items")
+        return items
+    return redact(str(value), depth)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue drained by a background writer thread.
+    The calling thread only snapshots the (bounded) arguments; formatting and I/O happen on the writer.
+    When the queue is full the record is dropped and counted instead of blocking the request.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.args = tuple(redact(a) for a in record.args) if isinstance(record.args, tuple) else redact(record.args)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, exception and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = redact(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> None:
+    """
+    The single logging configuration point of the application (call once at startup).
+    Root records go through a NonBlockingQueueHandler to a background writer on stderr.
+    CATALOG_LOG_LEVEL (INFO), CATALOG_LOG_FORMAT (text|json) and CATALOG_LOG_QUEUE_SIZE (10000) tune it.
+    Calling it again replaces the previous configuration.
+    """
+    global _listener, _queue_handler
+    level = (level or os.getenv("CATALOG_LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("CATALOG_LOG_FORMAT", "text")).lower()
+    with _lock:
+        shutdown_logging()
+        writer = logging.StreamHandler(stream or sys.stderr)
+        writer.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        log_queue: "queue.Queue" = queue.Queue(maxsize=int(os.getenv("CATALOG_LOG_QUEUE_SIZE", "10000")))
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the writer thread (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
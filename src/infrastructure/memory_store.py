@@ -0,0 +1,1201 @@
+"""
+In-process implementation of the part of the pymongo API the repositories use: find/find_one with
+filters, projections, sort, skip and limit; counts; inserts, updates and bulk writes; the aggregation
+stages of the catalog pipelines ($match, $project, $sort, $skip, $limit, $count, $unwind, $group,
+$bucket, $facet, $lookup); and create_indexes. Used by the "memory" storage backend (storage.py).
+
+Indexes registered through create_indexes (the declarative registry in indexes.py) are kept as hash
+indexes on their leading field: equality and $in conditions (also inside $and/$or) read candidates from
+them, unique indexes reject duplicates, and explain() reports IXSCAN or COLLSCAN accordingly.
+Stored documents are never mutated in place and every read returns copies, so callers may modify them.
+"""
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument, errors
+from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+_TYPE_NAMES = {"null": 1, "number": 2, "double": 2, "int": 2, "long": 2, "decimal": 2, "string": 3,
+               "object": 4, "array": 5, "objectId": 7, "bool": 8, "date": 9}
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _rank(value: Any) -> int:
+    """MongoDB's cross-type comparison order (missing and null first)."""
+    if value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 6
+
+
+def _sort_value(value: Any) -> tuple:
+    rank = _rank(value)
+    if rank in (4, 5, 6):
+        return rank, repr(value)
+    return rank, value if value is not None else 0
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable, type-aware key of a value (True and 1 stay distinct)."""
+    if isinstance(value, dict):
+        return 4, tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return 5, tuple(_freeze(v) for v in value)
+    return _rank(value), value
+
+
+def _resolve(value: Any, parts: List[str]) -> List[Any]:
+    """Values at a dotted path, descending into arrays of embedded documents like MongoDB; [] when missing."""
+    if not parts:
+        return [value]
+    if isinstance(value, dict):
+        return _resolve(value[parts[0]], parts[1:]) if parts[0] in value else []
+    if isinstance(value, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return _resolve(value[index], parts[1:]) if index < len(value) else []
+        return [v for item in value if isinstance(item, dict) for v in _resolve(item, parts)]
+    return []
+
+
+def _expand(values: List[Any]) -> List[Any]:
+    """Path values plus the elements of array values: what equality and range conditions compare against."""
+    out = []
+    for value in values:
+        out.append(value)
+        if isinstance(value, list):
+            out.extend(value)
+    return out
+
+
+def _equal(a: Any, b: Any) -> bool:
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False
+    return a == b
+
+
+def _eq_matches(values: List[Any], target: Any) -> bool:
+    if isinstance(target, re.Pattern):
+        return any(isinstance(v, str) and target.search(v) for v in _expand(values))
+    if target is None and not values:
+        return True
+    return any(_equal(v, target) for v in _expand(values))
+
+
+def _compare(value: Any, target: Any, op: str) -> bool:
+    if _rank(value) != _rank(target) or _rank(value) in (4, 5):
+        return False
+    if op == "$gt":
+        return value > target
+    if op == "$gte":
+        return value >= target
+    if op == "$lt":
+        return value < target
+    return value <= target
+
+
+def _is_operator_doc(cond: Any) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def _operator_matches(values: List[Any], op: str, arg: Any, cond: Dict[str, Any]) -> bool:
+    if op == "$eq":
+        return _eq_matches(values, arg)
+    if op == "$ne":
+        return not _eq_matches(values, arg)
+    if op == "$in":
+        return any(_eq_matches(values, target) for target in arg)
+    if op == "$nin":
+        return not any(_eq_matches(values, target) for target in arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return any(_compare(v, arg, op) for v in _expand(values))
+    if op == "$exists":
+        return bool(values) == bool(arg)
+    if op == "$type":
+        wanted = {_TYPE_NAMES.get(t, t) for t in (arg if isinstance(arg, list) else [arg])}
+        return any(_rank(v) in wanted for v in _expand(values))
+    if op == "$elemMatch":
+        for value in values:
+            if not isinstance(value, list):
+                continue
+            for element in value:
+                if _is_operator_doc(arg):
+                    if all(_operator_matches([element], o, a, arg) for o, a in arg.items()):
+                        return True
+                elif isinstance(element, dict) and _matches(element, arg):
+                    return True
+        return False
+    if op == "$not":
+        if isinstance(arg, re.Pattern):
+            return not _eq_matches(values, arg)
+        return not all(_operator_matches(values, o, a, arg) for o, a in arg.items())
+    if op == "$all":
+        return all(_eq_matches(values, target) for target in arg)
+    if op == "$size":
+        return any(isinstance(v, list) and len(v) == arg for v in values)
+    if op == "$regex":
+        pattern = arg if isinstance(arg, re.Pattern) else re.compile(arg, _regex_flags(cond.get("$options", "")))
+        return _eq_matches(values, pattern)
+    if op == "$options":
+        return True
+    raise errors.OperationFailure(f"unknown operator: {op}")
+
+
+def _regex_flags(options: str) -> int:
+    flags = 0
+    for option, flag in (("i", re.IGNORECASE), ("m", re.MULTILINE), ("s", re.DOTALL), ("x", re.VERBOSE)):
+        if option in options:
+            flags |= flag
+    return flags
+
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+def _compile_field(key: str, cond: Any) -> Predicate:
+    parts = key.split(".")
+    if _is_operator_doc(cond):
+        ops = list(cond.items())
+        if len(parts) == 1:
+            return lambda doc: all(_operator_matches([doc[key]] if key in doc else [], op, arg, cond) for op, arg in ops)
+        return lambda doc: all(_operator_matches(_resolve(doc, parts), op, arg, cond) for op, arg in ops)
+    if len(parts) == 1 and cond is not None and not isinstance(cond, (dict, list, re.Pattern)):
+        # Equality with a scalar on a top-level field, the shape of most catalog filters
+        def scalar_eq(doc: Dict[str, Any]) -> bool:
+            value = doc.get(key, _MISSING)
+            if isinstance(value, list):
+                return any(_equal(v, cond) for v in value)
+            return value is not _MISSING and _equal(value, cond)
+        return scalar_eq
+    return lambda doc: _eq_matches(_resolve(doc, parts), cond)
+
+
+def _compile(query: Dict[str, Any]) -> Predicate:
+    """Turns a MongoDB query document into a predicate, so per-document evaluation skips the dispatch on its shape."""
+    predicates: List[Predicate] = []
+    for key, cond in query.items():
+        if key in ("$and", "$or", "$nor"):
+            subs = [_compile(q) for q in cond]
+            if key == "$and":
+                predicates.append(lambda doc, subs=subs: all(p(doc) for p in subs))
+            elif key == "$or":
+                predicates.append(lambda doc, subs=subs: any(p(doc) for p in subs))
+            else:
+                predicates.append(lambda doc, subs=subs: not any(p(doc) for p in subs))
+        elif key.startswith("$"):
+            raise errors.OperationFailure(f"unknown top level operator: {key}")
+        else:
+            predicates.append(_compile_field(key, cond))
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda doc: all(p(doc) for p in predicates)
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluates a MongoDB query document against a document."""
+    return _compile(query)(doc)
+
+
+def _include(src: Dict[str, Any], dst: Dict[str, Any], parts: List[str]) -> None:
+    key = parts[0]
+    if key not in src:
+        return
+    value = src[key]
+    if len(parts) == 1:
+        dst[key] = _copy(value)
+    elif isinstance(value, dict):
+        _include(value, dst.setdefault(key, {}), parts[1:])
+    elif isinstance(value, list):
+        items = [v for v in value if isinstance(v, dict)]
+        targets = dst.setdefault(key, [{} for _ in items])
+        for item, target in zip(items, targets):
+            _include(item, target, parts[1:])
+
+
+def _exclude(doc: Dict[str, Any], parts: List[str]) -> None:
+    if len(parts) == 1:
+        doc.pop(parts[0], None)
+        return
+    value = doc.get(parts[0])
+    if isinstance(value, dict):
+        _exclude(value, parts[1:])
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                _exclude(item, parts[1:])
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Any]) -> Dict[str, Any]:
+    """Applies an inclusion or exclusion projection, returning a copy."""
+    if not projection:
+        return _copy(doc)
+    spec = {f: 1 for f in projection} if isinstance(projection, (list, tuple)) else dict(projection)
+    include_id = spec.pop("_id", 1)
+    for flag in spec.values():
+        if not isinstance(flag, (bool, int)):
+            raise errors.OperationFailure("The in-memory backend only supports 0/1 projections")
+    if any(spec.values()):
+        out: Dict[str, Any] = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+        for path, flag in spec.items():
+            if flag:
+                _include(doc, out, path.split("."))
+        return out
+    out = _copy(doc)
+    if not include_id:
+        out.pop("_id", None)
+    for path in spec:
+        _exclude(out, path.split("."))
+    return out
+
+
+def _normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [tuple(item) if not isinstance(item, str) else (item, 1) for item in key_or_list]
+
+
+def _sort_key(field: str, descending: bool) -> Callable[[Dict[str, Any]], tuple]:
+    parts = field.split(".")
+
+    def path_key(doc: Dict[str, Any]) -> tuple:
+        values = _resolve(doc, parts)
+        if not values:
+            return (1, 0)
+        # Arrays sort by their smallest (ascending) or largest (descending) element; empty ones before null
+        keys = [(0, 0) if v == [] else _sort_value(v) for value in values for v in (value or [[]] if isinstance(value, list) else [value])]
+        return max(keys) if descending else min(keys)
+
+    if len(parts) > 1:
+        return path_key
+
+    def field_key(doc: Dict[str, Any]) -> tuple:
+        value = doc.get(field, _MISSING)
+        if value is _MISSING:
+            return (1, 0)
+        return path_key(doc) if isinstance(value, list) else _sort_value(value)
+    return field_key
+
+
+def _sort_docs(docs: List[Dict[str, Any]], sort: List[Tuple[str, int]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Sorts docs (stable, like MongoDB's sort on a tie-broken key); with `limit`, returns only the first ones."""
+    directions = {direction for _, direction in sort}
+    if len(directions) == 1:
+        descending = directions.pop() < 0
+        keys = [_sort_key(field, descending) for field, _ in sort]
+        key = keys[0] if len(keys) == 1 else (lambda doc: tuple(k(doc) for k in keys))
+        if limit and limit < len(docs):
+            return (heapq.nlargest if descending else heapq.nsmallest)(limit, docs, key=key)
+        docs.sort(key=key, reverse=descending)
+        return docs
+    for field, direction in reversed(sort):
+        docs.sort(key=_sort_key(field, direction < 0), reverse=direction < 0)
+    return docs[:limit] if limit else docs
+
+
+def _get_value(doc: Any, path: str) -> Any:
+    """Value of a "$field" path in an aggregation expression (None when missing)."""
+    values = _resolve(doc, path.split("."))
+    if not values:
+        return None
+    if len(values) == 1 and "." not in path:
+        return values[0]
+    return values[0] if len(values) == 1 else values
+
+
+def _eval(doc: Dict[str, Any], expr: Any) -> Any:
+    if isinstance(expr, str) and expr.startswith("$") and not expr.startswith("$$"):
+        return _get_value(doc, expr[1:])
+    if isinstance(expr, dict):
+        if _is_operator_doc(expr):
+            raise errors.OperationFailure(f"The in-memory backend does not support the expression {next(iter(expr))}")
+        return {k: _eval(doc, v) for k, v in expr.items()}
+    if isinstance(expr, list):
+        return [_eval(doc, v) for v in expr]
+    return expr
+
+
+def _accumulate(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, accumulator in spec.items():
+        (op, expr), = accumulator.items()
+        values = [_eval(doc, expr) for doc in docs]
+        if op == "$sum":
+            out[name] = sum(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+        elif op == "$avg":
+            numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            out[name] = sum(numbers) / len(numbers) if numbers else None
+        elif op in ("$min", "$max"):
+            present = [v for v in values if v is not None]
+            pick = min if op == "$min" else max
+            out[name] = pick(present, key=_sort_value) if present else None
+        elif op == "$first":
+            out[name] = values[0] if values else None
+        elif op == "$last":
+            out[name] = values[-1] if values else None
+        elif op == "$push":
+            out[name] = values
+        elif op == "$addToSet":
+            out[name] = list({_freeze(v): v for v in values}.values())
+        elif op == "$count":
+            out[name] = len(docs)
+        else:
+            raise errors.OperationFailure(f"The in-memory backend does not support the accumulator {op}")
+    return out
+
+
+def _group(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    spec = dict(spec)
+    id_expr = spec.pop("_id")
+    groups: Dict[Any, Tuple[Any, List[Dict[str, Any]]]] = {}
+    for doc in docs:
+        key = _eval(doc, id_expr)
+        groups.setdefault(_freeze(key), (key, []))[1].append(doc)
+    return [{"_id": key, **_accumulate(members, spec)} for key, members in groups.values()]
+
+
+def _bucket(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    boundaries = spec["boundaries"]
+    output = spec.get("output") or {"count": {"$sum": 1}}
+    buckets: Dict[int, List[Dict[str, Any]]] = {}
+    default: List[Dict[str, Any]] = []
+    for doc in docs:
+        value = _eval(doc, spec["groupBy"])
+        for i, (lower, upper) in enumerate(zip(boundaries, boundaries[1:])):
+            if _rank(value) == _rank(lower) and lower <= value < upper:
+                buckets.setdefault(i, []).append(doc)
+                break
+        else:
+            if "default" not in spec:
+                raise errors.OperationFailure("$bucket could not find a matching branch for an input, and no default was specified.")
+            default.append(doc)
+    rows = [{"_id": boundaries[i], **_accumulate(buckets[i], output)} for i in sorted(buckets)]
+    if default:
+        rows.append({"_id": spec["default"], **_accumulate(default, output)})
+    return rows
+
+
+def _unwind(docs: List[Dict[str, Any]], spec: Any) -> List[Dict[str, Any]]:
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"][1:]
+    preserve = spec.get("preserveNullAndEmptyArrays", False)
+    out = []
+    for doc in docs:
+        value = _get_value(doc, path)
+        if isinstance(value, list) and value:
+            for element in value:
+                out.append(_with_path(doc, path.split("."), element))
+        elif isinstance(value, list) or value is None:
+            if preserve:
+                out.append(doc)
+        else:
+            out.append(doc)
+    return out
+
+
+def _with_path(doc: Dict[str, Any], parts: List[str], value: Any) -> Dict[str, Any]:
+    """Shallow copy of doc with the dotted path set to value."""
+    out = dict(doc)
+    if len(parts) == 1:
+        out[parts[0]] = value
+    else:
+        out[parts[0]] = _with_path(out.get(parts[0]) if isinstance(out.get(parts[0]), dict) else {}, parts[1:], value)
+    return out
+
+
+def _set_path(doc: Dict[str, Any], parts: List[str], value: Any) -> None:
+    for part in parts[:-1]:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            child = doc[part] = {}
+        doc = child
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: Dict[str, Any], parts: List[str]) -> None:
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+    """Applies update operators to doc in place."""
+    if not _is_operator_doc(update):
+        raise ValueError("update only works with $ operators")
+    for op, fields in update.items():
+        for path, arg in fields.items():
+            parts = path.split(".")
+            values = _resolve(doc, parts)
+            current = values[0] if values else None
+            if op == "$set":
+                _set_path(doc, parts, _copy(arg))
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, parts, _copy(arg))
+            elif op == "$unset":
+                _unset_path(doc, parts)
+            elif op == "$inc":
+                _set_path(doc, parts, (current or 0) + arg)
+            elif op == "$min":
+                if not values or _sort_value(arg) < _sort_value(current):
+                    _set_path(doc, parts, _copy(arg))
+            elif op == "$max":
+                if not values or _sort_value(arg) > _sort_value(current):
+                    _set_path(doc, parts, _copy(arg))
+            elif op in ("$push", "$addToSet"):
+                items = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                array = list(current) if isinstance(current, list) else []
+                for item in items:
+                    if op == "$push" or not any(_equal(existing, item) for existing in array):
+                        array.append(_copy(item))
+                _set_path(doc, parts, array)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    if _is_operator_doc(arg):
+                        kept = [v for v in current if not all(_operator_matches([v], o, a, arg) for o, a in arg.items())]
+                    elif isinstance(arg, dict):
+                        kept = [v for v in current if not (isinstance(v, dict) and _matches(v, arg))]
+                    else:
+                        kept = [v for v in current if not _equal(v, arg)]
+                    _set_path(doc, parts, kept)
+            else:
+                raise errors.OperationFailure(f"The in-memory backend does not support the update operator {op}")
+
+
+def _upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    """The equality conditions of an upsert's filter, which become fields of the inserted document."""
+    doc: Dict[str, Any] = {}
+    for key, cond in query.items():
+        if key == "$and":
+            for sub in cond:
+                doc.update(_upsert_seed(sub))
+        elif not key.startswith("$"):
+            if not _is_operator_doc(cond):
+                _set_path(doc, key.split("."), _copy(cond))
+            elif "$eq" in cond:
+                _set_path(doc, key.split("."), _copy(cond["$eq"]))
+    return doc
+
+
+class _Index:
+    """
+    Maps the values of an index's leading field (array elements individually) to document slots, and keeps
+    the slots in the order of all its key fields for sorted scans (rebuilt on the first sorted read after a write).
+    """
+
+    def __init__(self, name: str, keys: List[Tuple[str, Any]], unique: bool, sparse: bool):
+        self.name = name
+        self.keys = keys
+        self.field = keys[0][0]
+        self.parts = self.field.split(".")
+        self.unique = unique
+        self.sparse = sparse
+        self.entries: Dict[Any, Set[int]] = {}
+        self._order: Optional[List[int]] = None
+        self._multikey = False
+
+    def keys_of(self, doc: Dict[str, Any]) -> Set[Any]:
+        values = _resolve(doc, self.parts)
+        if not values:
+            return set() if self.sparse else {_freeze(None)}
+        return {_freeze(v) for value in values for v in (value if isinstance(value, list) else [value])}
+
+    def add(self, slot: int, doc: Dict[str, Any]) -> None:
+        self._order = None
+        for key in self.keys_of(doc):
+            self.entries.setdefault(key, set()).add(slot)
+
+    def remove(self, slot: int, doc: Dict[str, Any]) -> None:
+        self._order = None
+        for key in self.keys_of(doc):
+            slots = self.entries.get(key)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self.entries[key]
+
+    def conflict(self, doc: Dict[str, Any], slot: Optional[int] = None) -> Optional[Any]:
+        """The key a unique index already holds for another document, if any."""
+        if not self.unique:
+            return None
+        for key in self.keys_of(doc):
+            if self.entries.get(key, set()) - {slot}:
+                return key[1]
+        return None
+
+    def serves_sort(self, sort: List[Tuple[str, int]]) -> Optional[bool]:
+        """Whether a scan in index order yields `sort` (None: it cannot; True: walked backwards)."""
+        if self.sparse or len(sort) > len(self.keys) or len({d for _, d in sort}) != 1:
+            return None
+        if any(field != key for (field, _), (key, _) in zip(sort, self.keys)):
+            return None
+        return sort[0][1] < 0
+
+    def ordered(self, docs: Dict[int, Dict[str, Any]]) -> Optional[List[int]]:
+        """Slots in ascending order of the key fields; None when a key field holds arrays (multikey order differs per direction)."""
+        if self._order is None:
+            getters = [_sort_key(field, False) for field, _ in self.keys]
+            rows = []
+            self._multikey = False
+            for slot, doc in docs.items():
+                if any(isinstance(v, list) for field, _ in self.keys for v in _resolve(doc, field.split("."))):
+                    self._multikey = True
+                    break
+                rows.append((tuple(get(doc) for get in getters), slot))
+            rows.sort()
+            self._order = [] if self._multikey else [slot for _, slot in rows]
+        return None if self._multikey else self._order
+
+    def lookup(self, values: Iterable[Any]) -> Set[int]:
+        slots: Set[int] = set()
+        for value in values:
+            slots |= self.entries.get(_freeze(value), set())
+            if value is None:
+                slots |= self.entries.get(_freeze(None), set())
+        return slots
+
+
+class MemoryCursor:
+    """A find() cursor: sort/skip/limit are applied when it is first iterated, like pymongo's."""
+
+    def __init__(self, collection: "MemoryCollection", query: Optional[Dict[str, Any]], projection: Any,
+                 sort: Any = None, skip: int = 0, limit: int = 0):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _normalize_sort(sort)
+        self._skip = skip
+        self._limit = limit
+        self._results: Optional[Iterator[Dict[str, Any]]] = None
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "MemoryCursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "MemoryCursor":
+        return self
+
+    def _execute(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        # Only the first skip + limit matches are needed when documents arrive in order
+        stop = self._skip + abs(self._limit) if self._limit else None
+        selected = self._collection._select_ordered(self._query, self._sort, stop) if self._sort else None
+        if selected is not None:
+            docs, stats = selected
+        else:
+            docs, stats = self._collection._select(self._query, None if self._sort else stop)
+            if self._sort:
+                docs = _sort_docs(docs, self._sort, stop)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:abs(self._limit)]
+        return docs, stats
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._results is None:
+            docs, _ = self._execute()
+            self._results = (_project(doc, self._projection) for doc in docs)
+        return next(self._results)
+
+    def close(self) -> None:
+        self._results = iter(())
+
+    def explain(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        docs, stats = self._execute()
+        plan: Dict[str, Any] = {"stage": "IXSCAN", "indexName": stats["index"]} if stats["index"] else {"stage": "COLLSCAN"}
+        if stats["index"]:
+            plan = {"stage": "FETCH", "inputStage": plan}
+        if self._sort and not stats.get("sorted"):
+            plan = {"stage": "SORT", "inputStage": plan}
+        if self._skip:
+            plan = {"stage": "SKIP", "inputStage": plan}
+        if self._limit:
+            plan = {"stage": "LIMIT", "inputStage": plan}
+        return {
+            "queryPlanner": {"namespace": self._collection.full_name, "winningPlan": plan},
+            "executionStats": {"nReturned": len(docs), "totalKeysExamined": stats["keys"],
+                               "totalDocsExamined": stats["docs"],
+                               "executionTimeMillis": round((time.perf_counter() - started) * 1000)},
+        }
+
+
+class MemoryCollection:
+    """A collection held in process memory; see the module docstring for the supported API."""
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._indexes: Dict[str, _Index] = {}
+        self._slots = itertools.count()
+        self._lock = threading.RLock()
+
+    # Queries
+
+    def _candidates(self, query: Dict[str, Any]) -> Optional[Tuple[Set[int], List[str]]]:
+        """Slots that may match, read from the hash indexes (None: a collection scan is needed)."""
+        best: Optional[Tuple[Set[int], List[str]]] = None
+        for key, cond in query.items():
+            found: Optional[Tuple[Set[int], List[str]]] = None
+            if key == "$and":
+                for sub in cond:
+                    option = self._candidates(sub)
+                    if option is not None and (found is None or len(option[0]) < len(found[0])):
+                        found = option
+            elif key == "$or":
+                options = [self._candidates(sub) for sub in cond]
+                if options and all(o is not None for o in options):
+                    found = (set().union(*(o[0] for o in options)), sorted({n for o in options for n in o[1]}))
+            elif not key.startswith("$"):
+                index = next((i for i in self._indexes.values() if i.field == key and not i.sparse), None)
+                if index is None:
+                    continue
+                if not _is_operator_doc(cond):
+                    values = [cond]
+                elif "$eq" in cond:
+                    values = [cond["$eq"]]
+                elif "$in" in cond:
+                    values = list(cond["$in"])
+                else:
+                    continue
+                if any(isinstance(v, (dict, list, re.Pattern)) for v in values):
+                    continue
+                found = (index.lookup(values), [index.name])
+            if found is not None and (best is None or len(found[0]) < len(best[0])):
+                best = found
+        return best
+
+    def _matching_slots(self, query: Dict[str, Any], stop: Optional[int] = None) -> Tuple[List[int], Dict[str, Any]]:
+        """Slots of the matching documents in natural order; with `stop`, the scan ends after that many matches."""
+        match = _compile(query)
+        with self._lock:
+            candidates = self._candidates(query)
+            if candidates is None:
+                scanned = list(self._docs.items())
+                index = None
+            else:
+                scanned = [(slot, self._docs[slot]) for slot in sorted(candidates[0])]
+                index = ",".join(candidates[1])
+        matched, examined = [], 0
+        for slot, doc in scanned:
+            examined += 1
+            if match(doc):
+                matched.append(slot)
+                if len(matched) == stop:
+                    break
+        return matched, {"index": index, "keys": examined if index else 0, "docs": examined}
+
+    def _select(self, query: Dict[str, Any], stop: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Matching stored documents in natural order (not copies: callers project them); see _matching_slots."""
+        with self._lock:
+            slots, stats = self._matching_slots(query, stop)
+            return [self._docs[slot] for slot in slots], stats
+
+    def _select_ordered(self, query: Dict[str, Any], sort: List[Tuple[str, int]], stop: Optional[int]) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Matching documents in `sort` order from a scan of an index that provides it, ending after `stop`
+        matches. None when no index serves the sort, or an equality lookup narrows the query enough that
+        sorting its candidates is cheaper.
+        """
+        match = _compile(query)
+        with self._lock:
+            candidates = self._candidates(query)
+            if candidates is not None and len(candidates[0]) * 4 < len(self._docs):
+                return None
+            for index in self._indexes.values():
+                backwards = index.serves_sort(sort)
+                order = index.ordered(self._docs) if backwards is not None else None
+                if order is not None:
+                    break
+            else:
+                return None
+            slots = reversed(order) if backwards else order
+            restrict = candidates[0] if candidates is not None else None
+            matched, examined = [], 0
+            for slot in slots:
+                examined += 1
+                if restrict is not None and slot not in restrict:
+                    continue
+                doc = self._docs[slot]
+                if match(doc):
+                    matched.append(doc)
+                    if len(matched) == stop:
+                        break
+        return matched, {"index": index.name, "keys": examined, "docs": examined, "sorted": True}
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None, sort: Any = None,
+             skip: int = 0, limit: int = 0, batch_size: int = 0, **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(self, filter, projection, sort, skip, limit)
+
+    def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None, sort: Any = None, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        return next(self.find(filter, projection, sort=sort, limit=1), None)
+
+    def count_documents(self, filter: Dict[str, Any], skip: int = 0, limit: int = 0, **kwargs: Any) -> int:
+        count = max(len(self._select(filter)[0]) - skip, 0)
+        return min(count, limit) if limit else count
+
+    def estimated_document_count(self, **kwargs: Any) -> int:
+        return len(self._docs)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        pipeline = list(pipeline)
+        if pipeline and "$match" in pipeline[0]:
+            docs, _ = self._select(pipeline.pop(0)["$match"])
+        else:
+            with self._lock:
+                docs = list(self._docs.values())
+        return iter([_copy(doc) for doc in self._run_pipeline(docs, pipeline)])
+
+    def _run_pipeline(self, docs: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            if name == "$match":
+                match = _compile(spec)
+                docs = [doc for doc in docs if match(doc)]
+            elif name == "$project":
+                docs = [_project(doc, spec) for doc in docs]
+            elif name == "$sort":
+                docs = _sort_docs(list(docs), _normalize_sort(spec))
+            elif name == "$skip":
+                docs = docs[spec:]
+            elif name == "$limit":
+                docs = docs[:spec]
+            elif name == "$count":
+                docs = [{spec: len(docs)}] if docs else []
+            elif name == "$unwind":
+                docs = _unwind(docs, spec)
+            elif name == "$group":
+                docs = _group(docs, spec)
+            elif name == "$sortByCount":
+                docs = _sort_docs(_group(docs, {"_id": spec, "count": {"$sum": 1}}), [("count", -1)])
+            elif name == "$bucket":
+                docs = _bucket(docs, spec)
+            elif name in ("$addFields", "$set"):
+                docs = [{**doc, **{k: _eval(doc, v) for k, v in spec.items()}} for doc in docs]
+            elif name == "$replaceRoot":
+                docs = [_eval(doc, spec["newRoot"]) for doc in docs]
+            elif name == "$facet":
+                docs = [{key: self._run_pipeline(docs, sub) for key, sub in spec.items()}]
+            elif name == "$lookup":
+                foreign = self.database[spec["from"]]
+                joined = []
+                for doc in docs:
+                    local = _expand(_resolve(doc, spec["localField"].split("."))) or [None]
+                    local = [v for v in local if not isinstance(v, list)] or [None]
+                    matches, _ = foreign._select({spec["foreignField"]: {"$in": local}})
+                    joined.append({**doc, spec["as"]: matches})
+                docs = joined
+            else:
+                raise errors.OperationFailure(f"The in-memory backend does not support the {name} stage")
+        return docs
+
+    # Writes
+
+    def _check_unique(self, doc: Dict[str, Any], slot: Optional[int] = None) -> None:
+        for index in self._indexes.values():
+            value = index.conflict(doc, slot)
+            if value is not None:
+                raise errors.DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name} dup key: {{ {index.field}: {value!r} }}",
+                    11000)
+
+    def _insert(self, document: Dict[str, Any]) -> Any:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        doc = _copy(document)
+        with self._lock:
+            self._check_unique(doc)
+            if any(_equal(existing.get("_id"), doc["_id"]) for existing in self._docs.values()) and not isinstance(doc["_id"], ObjectId):
+                raise errors.DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: _id_", 11000)
+            slot = next(self._slots)
+            self._docs[slot] = doc
+            for index in self._indexes.values():
+                index.add(slot, doc)
+        return doc["_id"]
+
+    def _replace_slot(self, slot: int, new: Dict[str, Any]) -> None:
+        old = self._docs[slot]
+        self._check_unique(new, slot)
+        for index in self._indexes.values():
+            index.remove(slot, old)
+            index.add(slot, new)
+        self._docs[slot] = new
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool, multi: bool) -> Dict[str, Any]:
+        with self._lock:
+            slots, _ = self._matching_slots(query, None if multi else 1)
+            modified = sum(self._update_slot(slot, update) for slot in slots)
+            if slots or not upsert:
+                return {"n": len(slots), "nModified": modified}
+            return {"n": 1, "nModified": 0, "upserted": self._upsert(query, update)}
+
+    def _update_slot(self, slot: int, update: Dict[str, Any]) -> bool:
+        doc = self._docs[slot]
+        new = _copy(doc)
+        _apply_update(new, update, inserting=False)
+        if new == doc:
+            return False
+        self._replace_slot(slot, new)
+        return True
+
+    def _upsert(self, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
+        doc = _upsert_seed(query)
+        _apply_update(doc, update, inserting=True)
+        return self._insert(doc)
+
+    def insert_one(self, document: Dict[str, Any], **kwargs: Any) -> InsertOneResult:
+        return InsertOneResult(self._insert(document), True)
+
+    def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs: Any) -> InsertManyResult:
+        inserted, write_errors = [], []
+        for i, document in enumerate(documents):
+            try:
+                inserted.append(self._insert(document))
+            except errors.DuplicateKeyError as e:
+                write_errors.append({"index": i, "code": 11000, "errmsg": str(e), "op": document})
+                if ordered:
+                    break
+        if write_errors:
+            raise errors.BulkWriteError({"writeErrors": write_errors, "writeConcernErrors": [], "nInserted": len(inserted),
+                                         "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return InsertManyResult(inserted, True)
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=False), True)
+
+    def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=True), True)
+
+    def replace_one(self, filter: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        with self._lock:
+            slots, _ = self._matching_slots(filter, 1)
+            if not slots:
+                if not upsert:
+                    return UpdateResult({"n": 0, "nModified": 0}, True)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": self._insert({**_upsert_seed(filter), **replacement})}, True)
+            new = {**_copy(replacement), "_id": self._docs[slots[0]].get("_id")}
+            self._replace_slot(slots[0], new)
+            return UpdateResult({"n": 1, "nModified": 1}, True)
+
+    def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], projection: Any = None, sort: Any = None,
+                            upsert: bool = False, return_document: bool = ReturnDocument.BEFORE, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            slots, _ = self._matching_slots(filter)
+            if sort and slots:
+                ranked = _sort_docs([self._docs[slot] for slot in slots], _normalize_sort(sort), 1)
+                slots = [slot for slot in slots if self._docs[slot] is ranked[0]]
+            if not slots:
+                if not upsert:
+                    return None
+                inserted = self._upsert(filter, update)
+                if return_document != ReturnDocument.AFTER:
+                    return None
+                return self.find_one({"_id": inserted}, projection)
+            before = self._docs[slots[0]]
+            self._update_slot(slots[0], update)
+            return _project(self._docs[slots[0]] if return_document == ReturnDocument.AFTER else before, projection)
+
+    def _delete(self, query: Dict[str, Any], multi: bool) -> int:
+        with self._lock:
+            slots, _ = self._matching_slots(query, None if multi else 1)
+            for slot in slots:
+                doc = self._docs.pop(slot)
+                for index in self._indexes.values():
+                    index.remove(slot, doc)
+            return len(slots)
+
+    def delete_one(self, filter: Dict[str, Any], **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter, multi=False)}, True)
+
+    def delete_many(self, filter: Dict[str, Any], **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter, multi=True)}, True)
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs: Any) -> BulkWriteResult:
+        result = {"writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0, "nMatched": 0,
+                  "nModified": 0, "nRemoved": 0, "upserted": []}
+        for i, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany)):
+                    raw = self._update(request._filter, request._doc, request._upsert, multi=isinstance(request, UpdateMany))
+                    if "upserted" in raw:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": i, "_id": raw["upserted"]})
+                    else:
+                        result["nMatched"] += raw["n"]
+                        result["nModified"] += raw["nModified"]
+                elif isinstance(request, ReplaceOne):
+                    raw = self.replace_one(request._filter, request._doc, request._upsert).raw_result
+                    result["nMatched"] += raw["n"] if "upserted" not in raw else 0
+                    result["nModified"] += raw["nModified"]
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    result["nRemoved"] += self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                else:
+                    raise TypeError(f"{request!r} is not a valid request")
+            except errors.DuplicateKeyError as e:
+                result["writeErrors"].append({"index": i, "code": 11000, "errmsg": str(e), "op": getattr(request, "_doc", None)})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise errors.BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    # Indexes
+
+    def create_indexes(self, indexes: List[Any], **kwargs: Any) -> List[str]:
+        names = []
+        for model in indexes:
+            document = model.document
+            names.append(self._create_index(document["name"], list(document["key"].items()),
+                                            document.get("unique", False), document.get("sparse", False)))
+        return names
+
+    def create_index(self, keys: Any, name: Optional[str] = None, unique: bool = False, sparse: bool = False, **kwargs: Any) -> str:
+        keys = _normalize_sort(keys)
+        return self._create_index(name or "_".join(f"{k}_{d}" for k, d in keys), keys, unique, sparse)
+
+    def _create_index(self, name: str, keys: List[Tuple[str, Any]], unique: bool, sparse: bool) -> str:
+        with self._lock:
+            existing = self._indexes.get(name)
+            if existing is not None:
+                if existing.keys != keys or existing.unique != unique:
+                    raise errors.OperationFailure(f"An existing index has the same name as the requested index: {name}", 86)
+                return name
+            index = _Index(name, keys, unique, sparse)
+            for slot, doc in self._docs.items():
+                if index.conflict(doc) is not None:
+                    raise errors.DuplicateKeyError(f"E11000 duplicate key error building index {name} on {self.full_name}", 11000)
+                index.add(slot, doc)
+            self._indexes[name] = index
+            return name
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            info[name] = {"key": list(index.keys), **({"unique": True} if index.unique else {})}
+        return info
+
+    def drop_index(self, name: str) -> None:
+        with self._lock:
+            if self._indexes.pop(name, None) is None:
+                raise errors.OperationFailure(f"index not found with name [{name}]", 27)
+
+    def drop(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._indexes.clear()
+
+    def watch(self, *args: Any, **kwargs: Any):
+        raise errors.OperationFailure("Change streams are not supported by the in-memory backend", 40573)
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.setdefault(name, MemoryCollection(self, name))
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs: Any) -> MemoryCollection:
+        return self[name]
+
+    def list_collection_names(self, **kwargs: Any) -> List[str]:
+        return sorted(name for name, c in self._collections.items() if c._docs or c._indexes)
+
+    def drop_collection(self, name: str, **kwargs: Any) -> None:
+        # Emptied in place: like pymongo's, collection handles taken before the drop keep working
+        collection = self._collections.get(name)
+        if collection is not None:
+            collection.drop()
+
+    def command(self, command: Any, **kwargs: Any) -> Dict[str, Any]:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise errors.OperationFailure(f"The in-memory backend does not support the {name} command")
+
+
+class MemoryClient:
+    """Stand-in for MongoClient: databases are created on first access and live as long as the client."""
+
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            with self._lock:
+                database = self._databases.setdefault(name, MemoryDatabase(self, name))
+        return database
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_database(self, name: Optional[str] = None, **kwargs: Any) -> MemoryDatabase:
+        return self[name or os.getenv("MONGO_DB_NAME", "service_catalog")]
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncMemoryCursor:
+    """motor-style wrapper of a MemoryCursor (or of aggregate() results): async iteration and to_list()."""
+
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "AsyncMemoryCursor":
+        self._cursor.sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "AsyncMemoryCursor":
+        self._cursor.skip(skip)
+        return self
+
+    def limit(self, limit: int) -> "AsyncMemoryCursor":
+        self._cursor.limit(limit)
+        return self
+
+    def batch_size(self, batch_size: int) -> "AsyncMemoryCursor":
+        return self
+
+    def __aiter__(self) -> "AsyncMemoryCursor":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self._cursor) if length is None else list(itertools.islice(self._cursor, length))
+
+    async def explain(self) -> Dict[str, Any]:
+        return self._cursor.explain()
+
+
+def _awaitable(name: str) -> Callable:
+    async def method(self, *args: Any, **kwargs: Any) -> Any:
+        return getattr(self._collection, name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+class AsyncMemoryCollection:
+    """motor-style view of a MemoryCollection: the same data, with coroutine methods."""
+
+    def __init__(self, collection: MemoryCollection):
+        self._collection = collection
+        self.name = collection.name
+        self.full_name = collection.full_name
+
+    def find(self, *args: Any, **kwargs: Any) -> AsyncMemoryCursor:
+        return AsyncMemoryCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> AsyncMemoryCursor:
+        return AsyncMemoryCursor(self._collection.aggregate(pipeline, **kwargs))
+
+    def watch(self, *args: Any, **kwargs: Any):
+        return self._collection.watch(*args, **kwargs)
+
+    find_one = _awaitable("find_one")
+    count_documents = _awaitable("count_documents")
+    estimated_document_count = _awaitable("estimated_document_count")
+    insert_one = _awaitable("insert_one")
+    insert_many = _awaitable("insert_many")
+    update_one = _awaitable("update_one")
+    update_many = _awaitable("update_many")
+    find_one_and_update = _awaitable("find_one_and_update")
+    replace_one = _awaitable("replace_one")
+    delete_one = _awaitable("delete_one")
+    delete_many = _awaitable("delete_many")
+    bulk_write = _awaitable("bulk_write")
+    create_indexes = _awaitable("create_indexes")
+    create_index = _awaitable("create_index")
+    index_information = _awaitable("index_information")
+
+
+class AsyncMemoryDatabase:
+    """motor-style view of a MemoryDatabase, sharing its collections with the synchronous view."""
+
+    def __init__(self, database: MemoryDatabase):
+        self._database = database
+        self.client = database.client
+        self.name = database.name
+
+    def __getitem__(self, name: str) -> AsyncMemoryCollection:
+        return AsyncMemoryCollection(self._database[name])
+
+    def __getattr__(self, name: str) -> AsyncMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command: Any, **kwargs: Any) -> Dict[str, Any]:
+        return self._database.command(command, **kwargs)
@@ -0,0 +1,258 @@
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, monitoring
+
+from src.infrastructure.metrics import CommandStatsListener
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # motor is only needed by the asyncio repositories / ASGI app
+    AsyncIOMotorClient = None
+
+load_dotenv()
+
+# Upper bounds (in milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Wire compressors and the optional module each one needs
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.warning("Ignoring invalid integer for %s: %s", name, value)
+        return default
+
+
+def _available_compressors(requested: str, warn: bool = True) -> List[str]:
+    """Keeps the requested compressors whose Python module is installed, in order of preference."""
+    compressors = []
+    for name in (c.strip().lower() for c in requested.split(",")):
+        if not name:
+            continue
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            logging.warning("Unknown MongoDB compressor ignored: %s", name)
+        elif importlib.util.find_spec(module) is None:
+            if warn:
+                logging.warning("MongoDB compressor %s requested but '%s' is not installed", name, module)
+        else:
+            compressors.append(name)
+    return compressors
+
+
+def client_options_from_env() -> Dict[str, Any]:
+    """Builds MongoClient keyword options from MONGO_* environment variables."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", None),
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", None),
+        "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS", None),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 20000),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    }
+    # By default use zstd/snappy when their modules happen to be installed; warn only if explicitly requested
+    requested = os.getenv("MONGO_COMPRESSORS")
+    compressors = _available_compressors(requested or "zstd,snappy", warn=requested is not None)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return {k: v for k, v in options.items() if v is not None}
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool checkout wait statistics for sizing pools under load."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkout_timeouts = 0
+            self.checked_out = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pools_cleared = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            buckets["inf"] = self.wait_buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checked_out": self.checked_out,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "pools_cleared": self.pools_cleared,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": buckets,
+            }
+
+    def _record_wait(self, duration: Optional[float]) -> None:
+        wait_ms = (duration or 0.0) * 1000
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self._record_wait(event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+class MongoConnectionManager:
+    """
+    Owns one MongoClient (and therefore one connection pool) per MongoDB URL.
+    All repositories draw their databases from here instead of creating their own clients.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self._options = options
+        self._clients: Dict[str, MongoClient] = {}
+        self._async_clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.pool_stats = PoolStatsListener()
+        self.command_stats = CommandStatsListener()
+
+    def get_client(self, mongo_url: Optional[str] = None) -> MongoClient:
+        mongo_url = mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017/")
+        client = self._clients.get(mongo_url)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(mongo_url)
+            if client is None:
+                options = self._options if self._options is not None else client_options_from_env()
+                # connect=False: no sockets or monitor threads until the first operation, so building an app
+                # (or forking workers after building it) never waits on MongoDB
+                client = MongoClient(mongo_url, event_listeners=[self.pool_stats, self.command_stats], **{"connect": False, **options})
+                self._clients[mongo_url] = client
+                logging.info("MongoClient created with options: %s", options)
+            return client
+
+    def register_client(self, client: Any, mongo_url: Optional[str] = None) -> None:
+        """
+        Makes the manager hand out an existing client for the URL instead of creating one,
+        e.g. a client configured by hand in a test.
+        """
+        mongo_url = mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017/")
+        with self._lock:
+            self._clients[mongo_url] = client
+
+    def get_database(self, db_name: Optional[str] = None, mongo_url: Optional[str] = None):
+        db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
+        return self.get_client(mongo_url)[db_name]
+
+    def get_async_client(self, mongo_url: Optional[str] = None):
+        """
+        Returns the motor client for the URL, with the same pool options and statistics as the sync one.
+        Must be called from within the event loop that will use it.
+        """
+        if AsyncIOMotorClient is None:
+            raise RuntimeError("The asyncio repositories require motor: pip install motor")
+        mongo_url = mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017/")
+        with self._lock:
+            client = self._async_clients.get(mongo_url)
+            if client is None:
+                options = self._options if self._options is not None else client_options_from_env()
+                client = AsyncIOMotorClient(mongo_url, event_listeners=[self.pool_stats, self.command_stats], **options)
+                self._async_clients[mongo_url] = client
+                logging.info("AsyncIOMotorClient created with options: %s", options)
+            return client
+
+    def get_async_database(self, db_name: Optional[str] = None, mongo_url: Optional[str] = None):
+        db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
+        return self.get_async_client(mongo_url)[db_name]
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        stats = self.pool_stats.snapshot()
+        stats["clients"] = len(self._clients) + len(self._async_clients)
+        return stats
+
+    def close_all(self) -> None:
+        with self._lock:
+            for client in list(self._clients.values()) + list(self._async_clients.values()):
+                client.close()
+            self._clients.clear()
+            self._async_clients.clear()
+
+
+_manager = MongoConnectionManager()
+
+
+def get_connection_manager() -> MongoConnectionManager:
+    """Returns the process-wide connection manager."""
+    return _manager
+
+
+def get_database(db_name: Optional[str] = None, mongo_url: Optional[str] = None):
+    """Shortcut for get_connection_manager().get_database()."""
+    return _manager.get_database(db_name, mongo_url)
+
+
+def get_async_database(db_name: Optional[str] = None, mongo_url: Optional[str] = None):
+    """Shortcut for get_connection_manager().get_async_database()."""
+    return _manager.get_async_database(db_name, mongo_url)
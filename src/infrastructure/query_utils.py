@@ -0,0 +1,107 @@
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING
+
+# Query, projection and document helpers shared by the service and vendor repositories (and their async variants).
+
+
+def keyset_condition(sort_field: str, direction: int, after_value: Any, after_id: str) -> Dict[str, Any]:
+    """Builds the condition selecting documents positioned after (after_value, after_id) in (sort_field, id) order."""
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if sort_field == "id":
+        return {"id": {op: after_id}}
+    tie = {sort_field: after_value, "id": {op: after_id}}
+    if after_value is None:
+        # Missing values sort first ascending and last descending
+        if direction == ASCENDING:
+            return {"$or": [{sort_field: {"$ne": None}}, tie]}
+        return tie
+    conditions = [{sort_field: {op: after_value}}, tie]
+    if direction != ASCENDING:
+        conditions.append({sort_field: None})
+    return {"$or": conditions}
+
+
+def keyset_sort(sort_field: str, direction: int) -> List[tuple]:
+    """Sort specification for keyset pagination: the sort field with id as tie-breaker."""
+    return [("id", direction)] if sort_field == "id" else [(sort_field, direction), ("id", direction)]
+
+
+def changes_query(after: Optional[tuple], until: str) -> Dict[str, Any]:
+    """
+    Documents written after the (updated_at, id) position `after` and no later than `until`, soft-deleted ones
+    included (the change feed reports them as tombstones). Sort with CHANGES_SORT to range-scan updated_at_id.
+    """
+    query: Dict[str, Any] = {"updated_at": {"$lte": until}}
+    if after is not None:
+        query = {"$and": [query, keyset_condition("updated_at", ASCENDING, after[0], after[1])]}
+    return query
+
+
+CHANGES_SORT = keyset_sort("updated_at", ASCENDING)
+
+
+def fill_system_fields(data: Dict[str, Any], now: str) -> Dict[str, Any]:
+    """Sets the system-managed fields a new document needs, keeping any provided values."""
+    if 'id' not in data or not data['id']:
+        data['id'] = str(uuid.uuid4())
+    if 'created_at' not in data:
+        data['created_at'] = now
+    if 'updated_at' not in data:
+        data['updated_at'] = now
+    if 'is_deleted' not in data:
+        data['is_deleted'] = False
+    if 'status' not in data:
+        data['status'] = 'active'
+    return data
+
+
+def build_projection(fields: Optional[List[str]], lang: Optional[str], localized: Iterable[str], model_fields: Iterable[str], extra: Iterable[str] = (),
+                     hidden: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Turns ?fields= / ?lang= into a MongoDB inclusion projection, so unrequested data never leaves the database.
+    Localized fields are narrowed to the one locale (name -> name.fr); lang without fields keeps every model field.
+    'id' and the `extra` paths (e.g. a cursor sort field) are always included, and '_id' and the `hidden`
+    (internal) fields never; without fields or lang only those are excluded.
+    """
+    hidden = set(hidden)
+    if not fields and not lang:
+        return {"_id": 0, **{f: 0 for f in sorted(hidden)}}
+    paths = {p for p in fields or model_fields if p.split(".")[0] not in hidden} | {"id"}
+    if lang:
+        paths = {f"{p}.{lang}" if p in localized else p for p in paths}
+    paths.update(extra)
+    # MongoDB rejects a path together with one of its sub-paths; the parent already covers it
+    kept = sorted(p for p in paths if not any(p.startswith(q + ".") for q in paths))
+    projection = {p: 1 for p in kept}
+    projection["_id"] = 0
+    return projection
+
+
+def apply_projection(doc: Dict[str, Any], projection: Dict[str, int]) -> Dict[str, Any]:
+    """Applies a build_projection() projection to an in-memory document, e.g. one served from the cache."""
+    if not any(projection.values()):
+        return {k: v for k, v in doc.items() if projection.get(k, 1)}
+    out: Dict[str, Any] = {}
+    for path, include in projection.items():
+        if include:
+            _copy_path(doc, out, path.split("."))
+    return out
+
+
+def _copy_path(src: Dict[str, Any], dst: Dict[str, Any], parts: List[str]) -> None:
+    key = parts[0]
+    if key not in src:
+        return
+    value = src[key]
+    if len(parts) == 1:
+        dst[key] = value
+    elif isinstance(value, dict):
+        _copy_path(value, dst.setdefault(key, {}), parts[1:])
+    elif isinstance(value, list):
+        # Like MongoDB, a path through an array projects each embedded document
+        items = [v for v in value if isinstance(v, dict)]
+        targets = dst.setdefault(key, [{} for _ in items])
+        for item, target in zip(items, targets):
+            _copy_path(item, target, parts[1:])
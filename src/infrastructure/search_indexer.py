@@ -1,8 +1,569 @@
-from typing import List, Dict, Any  # Add this import
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-# This remains a stub for now. Later, you'd integrate with Elasticsearch or a similar search solution.
-class SearchIndexer:
-    def search_services(self, query: str) -> List[Dict[str, Any]]:
-        print(f"Searching for: {query} (using stub indexer)")
-        # In a real scenario, this would query Elasticsearch
+# Relative weight of each indexed field when computing a document's term frequency
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.0,
+    "category": 2.0,
+    "attributes": 1.0,
+    "description": 1.0,
+}
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Terms at least this long are matched with an edit distance of 1 when they are not in the vocabulary
+FUZZY_MIN_LENGTH = 4
+FUZZY_PENALTY = 0.5
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS: Dict[str, Set[str]] = {
+    "en": {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+           "of", "on", "or", "the", "to", "with"},
+    "fr": {"au", "aux", "de", "des", "du", "en", "et", "la", "le", "les", "un", "une", "pour", "sur"},
+    "de": {"der", "die", "das", "und", "ein", "eine", "mit", "von", "zu", "im", "in", "für"},
+    "es": {"el", "la", "los", "las", "de", "del", "y", "en", "un", "una", "con", "para", "por"},
+}
+
+
+def _is_unsegmented(char: str) -> bool:
+    """True for characters of scripts written without spaces (CJK, kana, Thai)."""
+    code = ord(char)
+    return (
+        0x3040 <= code <= 0x30FF      # Hiragana, Katakana
+        or 0x3400 <= code <= 0x4DBF   # CJK extension A
+        or 0x4E00 <= code <= 0x9FFF   # CJK unified ideographs
+        or 0xF900 <= code <= 0xFAFF   # CJK compatibility ideographs
+        or 0x0E00 <= code <= 0x0E7F   # Thai
+    )
+
+
+def _fold(text: str) -> str:
+    """Case-folds text and strips accents from Latin letters (other scripts keep their marks)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    out = []
+    last_base = ""
+    for char in decomposed:
+        if unicodedata.combining(char):
+            if last_base and ord(last_base) < 0x250:
+                continue
+        else:
+            last_base = char
+        out.append(char)
+    return unicodedata.normalize("NFC", "".join(out))
+
+
+def tokenize(text: str, lang: Optional[str] = None) -> List[str]:
+    """
+    Splits text into index terms.
+    Words are case/accent folded, stopwords of the given language are dropped and
+    runs of CJK/Thai characters are split into overlapping character bigrams.
+    """
+    if not text:
         return []
+    stopwords = STOPWORDS.get((lang or "").split("-")[0].lower(), set())
+    tokens = []
+    for word in _TOKEN_RE.findall(_fold(text)):
+        if any(_is_unsegmented(c) for c in word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif word not in stopwords:
+            tokens.append(word)
+    return tokens
+
+
+def _deletes(term: str) -> Set[str]:
+    """All variants of a term with exactly one character removed."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent transposition."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diffs = [i for i in range(la) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if la > lb:
+        a, b = b, a
+    # b is one character longer than a
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+def _localized_items(value: Any) -> Iterable[Tuple[Optional[str], str]]:
+    """Yields (lang, text) pairs for either a localized {lang: text} dict or a plain string."""
+    if isinstance(value, dict):
+        for lang, text in value.items():
+            if isinstance(text, str):
+                yield lang, text
+    elif isinstance(value, str):
+        yield None, value
+
+
+def _phrase_key(text: str) -> str:
+    """Folded words of a phrase joined by single spaces: the form suggestion prefixes are matched against."""
+    return " ".join(_TOKEN_RE.findall(_fold(text)))
+
+
+def popularity_weight(doc: Dict[str, Any]) -> float:
+    """Ranking weight of a service's suggestions: 1 plus the log of its metadata.popularity signal, if any."""
+    popularity = (doc.get("metadata") or {}).get("popularity")
+    if isinstance(popularity, (int, float)) and not isinstance(popularity, bool) and popularity > 0:
+        return 1.0 + math.log1p(popularity)
+    return 1.0
+
+
+# Suggestions also match from the start of each of the first words of a phrase ("lawn" finds "Summer Lawn")
+SUGGEST_MAX_WORD_STARTS = 8
+# A trie bucket holding more phrase suffixes than this is split into child nodes by the next character
+SUGGEST_BURST_SIZE = 64
+# Ranked entries cached per trie node, i.e. the largest limit a lookup can ask for
+SUGGEST_TOP_K = 50
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys", "top", "burst")
+
+    def __init__(self, burst: bool = False):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # (phrase suffix, entry id) pairs: all of the subtree in a bucket, those ending here once burst
+        self.keys: Set[Tuple[str, tuple]] = set()
+        self.top: Dict[Optional[str], List[tuple]] = {}    # lang -> best SUGGEST_TOP_K entry ids of the subtree
+        self.burst = burst
+
+
+class SuggestIndex:
+    """
+    Prefix index for typeahead over service names (every locale), tags and categories.
+    Phrase suffixes live in a burst trie: small buckets that split into child nodes as they grow. Every node
+    caches its best entries by popularity, so even broad prefixes are answered without scanning; writes
+    update those rankings in place and only drop them when a ranked entry loses weight.
+    Tag and category entries aggregate the popularity of every service carrying them.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._root = _TrieNode(burst=True)
+        self._entries: Dict[tuple, List[Any]] = {}                # entry id -> [text, langs, weight, services]
+        self._doc_entries: Dict[str, List[Tuple[tuple, float]]] = {}
+
+    @staticmethod
+    def _suffixes(key: str) -> List[str]:
+        words = key.split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), SUGGEST_MAX_WORD_STARTS))]
+
+    def _path(self, key: str) -> List[_TrieNode]:
+        """Nodes from the root down to the bucket or node that holds `key`, or as far as the trie goes."""
+        node = self._root
+        path = [node]
+        for char in key:
+            if not node.burst:
+                break
+            node = node.children.get(char)
+            if node is None:
+                break
+            path.append(node)
+        return path
+
+    def _insert(self, node: _TrieNode, depth: int, item: Tuple[str, tuple]) -> None:
+        key = item[0]
+        while node.burst and depth < len(key):
+            node = node.children.setdefault(key[depth], _TrieNode())
+            depth += 1
+        node.keys.add(item)
+        if not node.burst and len(node.keys) > SUGGEST_BURST_SIZE:
+            # The subtree's entries do not change, so its cached rankings stay valid
+            items, node.keys, node.burst = node.keys, set(), True
+            for moved in items:
+                self._insert(node, depth, moved)
+
+    def _rank_key(self, entry_id: tuple) -> tuple:
+        return -self._entries[entry_id][2], entry_id
+
+    def _touch(self, entry_id: tuple, increased: bool) -> None:
+        """
+        Updates the cached rankings on the entry's paths after its weight changed or it was added (increased)
+        or its weight dropped or it was removed (otherwise). Rankings it drops out of are recomputed lazily.
+        """
+        for suffix in self._suffixes(entry_id[1]):
+            for node in self._path(suffix):
+                for lang, top in list(node.top.items()):
+                    if not increased:
+                        if entry_id in top:
+                            del node.top[lang]
+                    elif entry_id in top:
+                        top.remove(entry_id)
+                        bisect.insort(top, entry_id, key=self._rank_key)
+                    elif self._matches(entry_id, lang) and (len(top) < SUGGEST_TOP_K or self._rank_key(entry_id) < self._rank_key(top[-1])):
+                        bisect.insort(top, entry_id, key=self._rank_key)
+                        del top[SUGGEST_TOP_K:]
+
+    def _nodes_of(self, entry_ids: Iterable[tuple]) -> Dict[int, Tuple[_TrieNode, Set[tuple]]]:
+        """The nodes on the paths of the entries' phrase suffixes, each once, with the entries passing through it."""
+        nodes: Dict[int, Tuple[_TrieNode, Set[tuple]]] = {}
+        for entry_id in entry_ids:
+            for suffix in self._suffixes(entry_id[1]):
+                for node in self._path(suffix):
+                    nodes.setdefault(id(node), (node, set()))[1].add(entry_id)
+        return nodes
+
+    def _rerank(self, lost: Set[tuple], gained: Set[tuple]) -> None:
+        """
+        _touch for the entries a batch of writes changed, once per node however many entries and services moved:
+        rankings holding an entry that lost weight or was removed are dropped; entries that gained weight or were
+        added are taken out of the rankings holding them, so those stay sorted, then inserted where they now rank.
+        """
+        for node, entry_ids in self._nodes_of(lost).values():
+            for lang, top in list(node.top.items()):
+                if not entry_ids.isdisjoint(top):
+                    del node.top[lang]
+        for node, entry_ids in self._nodes_of(entry_id for entry_id in gained if entry_id in self._entries).values():
+            for lang, top in node.top.items():
+                if not entry_ids.isdisjoint(top):
+                    top[:] = [ranked for ranked in top if ranked not in entry_ids]
+                for entry_id in entry_ids:
+                    if self._matches(entry_id, lang) and (len(top) < SUGGEST_TOP_K or self._rank_key(entry_id) < self._rank_key(top[-1])):
+                        bisect.insort(top, entry_id, key=self._rank_key)
+                        del top[SUGGEST_TOP_K:]
+
+    def _add_entry(self, entry_id: tuple, text: str, langs: Set[str], weight: float, gained: Optional[Set[tuple]] = None) -> None:
+        entry = self._entries.get(entry_id)
+        if entry is not None:
+            entry[2] += weight
+            entry[3] += 1
+        else:
+            self._entries[entry_id] = [text, langs, weight, 1]
+            for suffix in self._suffixes(entry_id[1]):
+                self._insert(self._root, 0, (suffix, entry_id))
+        if gained is None:
+            self._touch(entry_id, increased=True)
+        else:
+            gained.add(entry_id)
+
+    def _remove_entry(self, entry_id: tuple, weight: float, lost: Optional[Set[tuple]] = None) -> None:
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        if lost is None:
+            self._touch(entry_id, increased=False)
+        else:
+            lost.add(entry_id)
+        entry[2] -= weight
+        entry[3] -= 1
+        if entry[3] > 0:
+            return
+        del self._entries[entry_id]
+        for suffix in self._suffixes(entry_id[1]):
+            self._path(suffix)[-1].keys.discard((suffix, entry_id))
+
+    @staticmethod
+    def _candidates(service_id: str, doc: Dict[str, Any]) -> Dict[tuple, Tuple[str, Set[str]]]:
+        """Entry id -> (display text, locales) of a service; a name spelled alike in several locales is one entry."""
+        candidates: Dict[tuple, Tuple[str, Set[str]]] = {}
+        for lang, text in _localized_items(doc.get("name")):
+            key = _phrase_key(text)
+            if key:
+                candidates.setdefault(("service", key, service_id), (text, set()))[1].add(lang or "")
+        for tag in doc.get("tags") or []:
+            if isinstance(tag, str) and _phrase_key(tag):
+                candidates.setdefault(("tag", _phrase_key(tag)), (tag, set()))
+        if isinstance(doc.get("category"), str) and _phrase_key(doc["category"]):
+            candidates.setdefault(("category", _phrase_key(doc["category"])), (doc["category"], set()))
+        return candidates
+
+    def _index_locked(self, doc: Dict[str, Any], lost: Optional[Set[tuple]] = None, gained: Optional[Set[tuple]] = None) -> None:
+        """Applies a service's entry changes; rankings are touched right away, or left to _rerank when collecting lost/gained."""
+        service_id = doc["id"]
+        candidates = {} if doc.get("is_deleted", False) else self._candidates(service_id, doc)
+        weight = popularity_weight(doc)
+        old = dict(self._doc_entries.pop(service_id, ()))
+        kept = set()
+        for entry_id, old_weight in old.items():
+            entry = self._entries.get(entry_id)
+            new = candidates.get(entry_id)
+            if new is not None and old_weight == weight and (entry_id[0] != "service" or (entry[0], entry[1]) == new):
+                kept.add(entry_id)
+            else:
+                self._remove_entry(entry_id, old_weight, lost)
+        for entry_id, (text, langs) in candidates.items():
+            if entry_id not in kept:
+                self._add_entry(entry_id, text, langs, weight, gained)
+        if candidates:
+            self._doc_entries[service_id] = [(entry_id, weight) for entry_id in candidates]
+
+    def index_service(self, doc: Dict[str, Any]) -> None:
+        """Adds, replaces or (when deleted) removes a service; entries whose text and weight are unchanged are kept."""
+        with self._lock:
+            self._index_locked(doc)
+
+    def index_services(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """
+        index_service for many services at once: rankings are updated once per changed entry, so a tag or
+        category shared by the batch is re-ranked once rather than once per service.
+        """
+        lost: Set[tuple] = set()
+        gained: Set[tuple] = set()
+        with self._lock:
+            for doc in docs:
+                self._index_locked(doc, lost, gained)
+            self._rerank(lost, gained)
+
+    def remove_service(self, service_id: str) -> None:
+        with self._lock:
+            for entry_id, weight in self._doc_entries.pop(service_id, ()):
+                self._remove_entry(entry_id, weight)
+
+    def _matches(self, entry_id: tuple, lang: Optional[str]) -> bool:
+        return not lang or entry_id[0] != "service" or lang in self._entries[entry_id][1]
+
+    def _rank(self, entry_ids: Iterable[tuple], limit: int) -> List[tuple]:
+        return heapq.nsmallest(limit, entry_ids, key=self._rank_key)
+
+    def _top(self, node: _TrieNode, lang: Optional[str]) -> List[tuple]:
+        """The node's best entries: merged from its own keys and its children's (cached) best entries."""
+        top = node.top.get(lang)
+        if top is None:
+            candidates = {entry_id for _, entry_id in node.keys if self._matches(entry_id, lang)}
+            for child in node.children.values():
+                candidates.update(self._top(child, lang))
+            top = node.top[lang] = self._rank(candidates, SUGGEST_TOP_K)
+        return top
+
+    def warm(self) -> None:
+        """Ranks every node for lookups without a lang, so the first keystrokes after a rebuild are served from cache."""
+        with self._lock:
+            self._top(self._root, None)
+
+    def suggest(self, query: str, lang: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top `limit` (at most SUGGEST_TOP_K) service names, tags and categories having a word that starts
+        with the query, by popularity. With lang, service names are limited to that locale
+        (tags and categories always match).
+        """
+        prefix = _phrase_key(query)
+        if not prefix or limit <= 0:
+            return []
+        with self._lock:
+            path = self._path(prefix)
+            node, depth = path[-1], len(path) - 1
+            if depth == len(prefix):
+                top = self._top(node, lang)[:limit]
+            elif not node.burst:
+                top = self._rank({entry_id for key, entry_id in node.keys
+                                  if key.startswith(prefix) and self._matches(entry_id, lang)}, limit)
+            else:
+                return []
+            results = []
+            for entry_id in top:
+                text, langs, _, services = self._entries[entry_id]
+                if entry_id[0] == "service":
+                    results.append({"text": text, "type": "service", "id": entry_id[2], "langs": sorted(langs)})
+                else:
+                    results.append({"text": text, "type": entry_id[0], "services": services})
+            return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SearchIndexer:
+    """
+    In-process inverted index over the service catalog with BM25 ranking.
+    The index is rebuilt in bulk at startup and kept current by the catalog write paths and, for writes made by
+    other processes, by SearchIndexSync. It holds terms only: hits are service ids, hydrated from the repository.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None):
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, float]] = {}   # term -> {service_id: weighted tf}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}  # service_id -> {term: weighted tf}
+        self._doc_len: Dict[str, float] = {}
+        self._doc_langs: Dict[str, Set[str]] = {}
+        self._deletes: Dict[str, Set[str]] = {}            # one-character-deleted variant -> terms
+        self._total_len = 0.0
+        self.suggestions = SuggestIndex()
+
+    def _analyze(self, doc: Dict[str, Any]) -> Tuple[Dict[str, float], Set[str]]:
+        """Computes the weighted term frequencies and locales of a service document."""
+        terms: Dict[str, float] = {}
+        langs: Set[str] = set()
+
+        def add(text: str, lang: Optional[str], weight: float):
+            for token in tokenize(text, lang):
+                terms[token] = terms.get(token, 0.0) + weight
+
+        for field in ("name", "description"):
+            for lang, text in _localized_items(doc.get(field)):
+                if lang:
+                    langs.add(lang)
+                add(text, lang, self.field_weights[field])
+        for tag in doc.get("tags") or []:
+            if isinstance(tag, str):
+                add(tag, None, self.field_weights["tags"])
+        if isinstance(doc.get("category"), str):
+            add(doc["category"], None, self.field_weights["category"])
+        for attr in doc.get("attributes") or []:
+            if not isinstance(attr, dict):
+                continue
+            if isinstance(attr.get("name"), str):
+                add(attr["name"], None, self.field_weights["attributes"])
+            for lang, text in _localized_items(attr.get("value")):
+                add(text, lang, self.field_weights["attributes"])
+        return terms, langs
+
+    def _remove_locked(self, service_id: str) -> None:
+        terms = self._doc_terms.pop(service_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(service_id, None)
+            if not posting:
+                del self._postings[term]
+                for variant in _deletes(term):
+                    bucket = self._deletes.get(variant)
+                    if bucket is not None:
+                        bucket.discard(term)
+                        if not bucket:
+                            del self._deletes[variant]
+        self._total_len -= self._doc_len.pop(service_id, 0.0)
+        self._doc_langs.pop(service_id, None)
+
+    def _add_locked(self, service_id: str, analysis: Tuple[Dict[str, float], Set[str]]) -> None:
+        terms, langs = analysis
+        for term, weight in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                if len(term) >= FUZZY_MIN_LENGTH - 1:
+                    for variant in _deletes(term):
+                        self._deletes.setdefault(variant, set()).add(term)
+            posting[service_id] = weight
+        length = sum(terms.values())
+        self._doc_terms[service_id] = terms
+        self._doc_len[service_id] = length
+        self._doc_langs[service_id] = langs
+        self._total_len += length
+
+    def index_service(self, doc: Dict[str, Any]) -> None:
+        """Adds or replaces a service document in the index. Deleted services are removed."""
+        if not doc or not doc.get("id"):
+            return
+        with self._lock:
+            self._remove_locked(doc["id"])
+            if not doc.get("is_deleted", False):
+                self._add_locked(doc["id"], self._analyze(doc))
+        self.suggestions.index_service(doc)
+
+    def index_services(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """
+        index_service for a batch, e.g. the documents of a bulk write: they are analyzed before the lock is
+        taken and applied under one acquisition, and suggestion rankings are updated once for the batch.
+        """
+        docs = [doc for doc in docs if doc and doc.get("id")]
+        analyzed = [(doc["id"], None if doc.get("is_deleted", False) else self._analyze(doc)) for doc in docs]
+        with self._lock:
+            for service_id, analysis in analyzed:
+                self._remove_locked(service_id)
+                if analysis is not None:
+                    self._add_locked(service_id, analysis)
+        self.suggestions.index_services(docs)
+
+    def remove_service(self, service_id: str) -> None:
+        """Removes a service from the index."""
+        with self._lock:
+            self._remove_locked(service_id)
+        self.suggestions.remove_service(service_id)
+
+    def remove_services(self, service_ids: Iterable[str]) -> None:
+        """Removes many services from the index."""
+        self.index_services([{"id": service_id, "is_deleted": True} for service_id in service_ids])
+
+    def rebuild(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Replaces the whole index with the given documents and returns the number indexed."""
+        fresh = SearchIndexer(self.field_weights)
+        for doc in docs:
+            fresh.index_service(doc)
+        fresh.suggestions.warm()
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_len = fresh._doc_len
+            self._doc_langs = fresh._doc_langs
+            self._deletes = fresh._deletes
+            self._total_len = fresh._total_len
+            self.suggestions = fresh.suggestions
+        logging.info("Search index rebuilt with %d services", len(self._doc_terms))
+        return len(self._doc_terms)
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def suggest(self, query: str, lang: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Typeahead suggestions for a prefix (see SuggestIndex.suggest)."""
+        return self.suggestions.suggest(query, lang, limit)
+
+    def _expand_term(self, term: str) -> List[Tuple[str, float]]:
+        """Returns the vocabulary terms a query term matches, with their score multiplier."""
+        if term in self._postings:
+            return [(term, 1.0)]
+        if len(term) < FUZZY_MIN_LENGTH:
+            return []
+        candidates = set(self._deletes.get(term, ()))
+        for variant in _deletes(term):
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        return [(c, FUZZY_PENALTY) for c in candidates if _within_one_edit(term, c)]
+
+    def search_services(self, query: str, lang: Optional[str] = None, page: int = 1,
+                        page_size: int = 20) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Ranks services matching the query with BM25.
+        Unknown terms are matched against vocabulary terms one edit away.
+        If lang is given, only services localized in that language are returned.
+        Returns the requested page of (service id, score) pairs and the total number of hits.
+        """
+        page = max(page, 1)
+        page_size = max(page_size, 1)
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs:
+                return [], 0
+            avg_len = self._total_len / n_docs or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query, lang)):
+                for match, multiplier in self._expand_term(term):
+                    posting = self._postings[match]
+                    idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for service_id, tf in posting.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[service_id] / avg_len)
+                        score = multiplier * idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        scores[service_id] = scores.get(service_id, 0.0) + score
+            if lang:
+                scores = {sid: s for sid, s in scores.items() if lang in self._doc_langs[sid]}
+            top = heapq.nsmallest(page * page_size, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+            return [(service_id, round(score, 4)) for service_id, score in top[(page - 1) * page_size:]], len(scores)
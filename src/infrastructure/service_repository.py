@@ -1,161 +1,682 @@
+import dataclasses
 import os
-from pymongo import MongoClient, errors
-from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne, errors
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.domain.service.service import Service
-from src.domain.service.value_objects import PricingTier, ServiceAttribute, MediaReference, PricingRule, AvailabilityRule
+from src.domain.service.codec import decode_service, encode_service
+from src.domain.service.pricing import PRICE_INPUT_FIELDS, compute_prices
+from src.domain.service.availability import ANY_LOCATION, AVAILABILITY_INPUT_FIELDS, WEEKDAYS, compute_availability, normalize_location
 from bson.objectid import ObjectId
 from datetime import datetime, UTC
-import uuid
 from dotenv import load_dotenv
+import json
 import logging
+from src.infrastructure.mongo_connection import get_database
+from src.infrastructure.cache import TTLCache, cache_from_env
+from src.infrastructure.indexes import summarize_explain
+from src.infrastructure.query_utils import CHANGES_SORT, apply_projection, build_projection, changes_query, fill_system_fields, keyset_condition, keyset_sort
+from src.infrastructure.bulk_writes import BULK_CHUNK_SIZE, bulk_insert, bulk_update, bulk_soft_delete
+from src.infrastructure.vendor_summaries import (
+    SUMMARY_COLLECTION, SUMMARY_INPUT_FIELDS, SUMMARY_INPUT_PROJECTION, bounds_pipeline, bounds_update_ops, build_summaries,
+    bulk_delete_pairs, bulk_update_pairs, rebuild_ops, rebuild_pipeline, stale_bounds, summary_changes, summary_update_ops, updated_image,
+)
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+# Filter keys with dedicated query semantics; other list filters are matched by equality
+FILTER_KEYS = ("category", "vendor_id", "min_price", "max_price", "tags")
+
+# Top-level fields of the Service model, and those holding {lang: text} dicts narrowed by ?lang=
+SERVICE_FIELDS = tuple(f.name for f in dataclasses.fields(Service))
+LOCALIZED_SERVICE_FIELDS = ("name", "description")
+
+# Fields derived from other fields of the same document on every write (clients cannot set them):
+# materialized prices and the flattened availability index
+PRICE_FIELDS = ("effective_price", "min_tier_price", "price_refresh_at")
+AVAILABILITY_FIELDS = ("availability_index", "availability_blackouts")
+DERIVED_FIELDS = PRICE_FIELDS + AVAILABILITY_FIELDS
+DERIVED_INPUT_FIELDS = PRICE_INPUT_FIELDS + AVAILABILITY_INPUT_FIELDS
+DERIVED_REFRESH_PROJECTION = {"_id": 0, "id": 1, **{f: 1 for f in DERIVED_INPUT_FIELDS + DERIVED_FIELDS}}
+DERIVED_UPDATE_PROJECTION = {**DERIVED_REFRESH_PROJECTION, "updated_at": 1}
+# Attempts of an update recomputing the derived fields, guarded by the updated_at they were computed from; the last one is unguarded
+DERIVED_UPDATE_ATTEMPTS = 3
+# Derived fields only the repository reads (the availability query and the refresh pass): list, detail, search,
+# export and change feed responses never carry them. effective_price and min_tier_price are public.
+INTERNAL_SERVICE_FIELDS = ("price_refresh_at",) + AVAILABILITY_FIELDS
+SERVICE_OUTPUT_PROJECTION = {"_id": 0, **{f: 0 for f in INTERNAL_SERVICE_FIELDS}}
+
+# Facet counts of GET /services?facets=: the most frequent values per field, and effective_price ranges
+FACET_LIMIT = int(os.getenv("CATALOG_FACET_LIMIT", "20"))
+PRICE_FACET_BOUNDARIES = tuple(int(b) for b in os.getenv("CATALOG_PRICE_FACET_BOUNDARIES", "0,1000,5000,10000,50000,100000").split(","))
+# Upper bound of the last price range (services priced above it are counted in it too)
+_PRICE_FACET_CEILING = 10 ** 15
+def _count_by(field: str, limit: Optional[int] = FACET_LIMIT) -> List[Dict[str, Any]]:
+    """$sortByCount with a deterministic order among equal counts."""
+    stages = [{"$group": {"_id": "$" + field, "count": {"$sum": 1}}}, {"$sort": {"count": -1, "_id": 1}}]
+    return stages + ([{"$limit": limit}] if limit else [])
+
+FACET_PIPELINES = {
+    "category": _count_by("category"),
+    "tags": [{"$unwind": "$tags"}] + _count_by("tags"),
+    "vendor_id": _count_by("vendor_id"),
+    "is_on_sale": _count_by("is_on_sale", None),
+    "price": [{"$bucket": {"groupBy": "$effective_price", "boundaries": list(PRICE_FACET_BOUNDARIES) + [_PRICE_FACET_CEILING],
+                           "default": None, "output": {"count": {"$sum": 1}}}}],
+}
+
+def build_service_query(filters: Optional[Dict[str, Any]] = None, passthrough: bool = True) -> Dict[str, Any]:
+    """
+    Translates API filters into a MongoDB query on active services.
+    Understands category, vendor_id, min_price/max_price (on the materialized effective_price) and
+    tags (list or comma-separated); with passthrough, any other key is matched by equality.
+    """
+    filters = filters or {}
+    query: Dict[str, Any] = {}
+    if passthrough:
+        query.update({k: v for k, v in filters.items() if k not in FILTER_KEYS})
+    if "category" in filters:
+        query["category"] = filters["category"]
+    if "vendor_id" in filters:
+        query["vendor_id"] = filters["vendor_id"]
+    if "min_price" in filters or "max_price" in filters:
+        price_query = {}
+        if "min_price" in filters:
+            price_query["$gte"] = float(filters["min_price"])
+        if "max_price" in filters:
+            price_query["$lte"] = float(filters["max_price"])
+        query["effective_price"] = price_query
+    if "tags" in filters:
+        tags = filters["tags"]
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
+        query["tags"] = {"$in": tags}
+    query["is_deleted"] = False
+    return query
+
+def derived_fields(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Computes the derived fields (prices as of `now`, availability index) of a service document."""
+    return {**compute_prices(data, now), **compute_availability(data)}
+
+def with_derived_fields(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Sets the derived fields of a document about to be written."""
+    data.update(derived_fields(data, now))
+    return data
+
+def strip_derived_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drops client-provided values of the system-managed derived fields from an update."""
+    for key in DERIVED_FIELDS:
+        data.pop(key, None)
+    return data
+
+def derived_update(current: Dict[str, Any], update_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """The $set of an update touching derived inputs: update_data plus the derived fields of `current` with it applied."""
+    return {**update_data, **derived_fields({**current, **update_data}, now)}
+
+def with_derived_updates(items: List[Dict[str, Any]], current: Dict[str, Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Adds the derived fields to the bulk updates touching their inputs, computed over the current documents
+    (DERIVED_UPDATE_PROJECTION, by id) with the updates applied in order, so an id updated twice chains.
+    """
+    images, out = dict(current), []
+    for item in items:
+        if item["id"] in images and any(k in item for k in DERIVED_INPUT_FIELDS):
+            item = derived_update(images[item["id"]], item, now)
+            images[item["id"]] = {**images[item["id"]], **item}
+        out.append(item)
+    return out
+
+def derived_refresh_query(service_ids: Optional[Iterable[str]] = None, due_before: Optional[str] = None) -> Dict[str, Any]:
+    """Active services to recompute: the given ids, else those whose price_refresh_at is due, else all."""
+    query: Dict[str, Any] = {"is_deleted": False}
+    if service_ids is not None:
+        query["id"] = {"$in": list(service_ids)}
+    elif due_before is not None:
+        query["price_refresh_at"] = {"$type": "string", "$lte": due_before}  # matches the partial index
+    return query
+
+def derived_refresh_ops(docs: Iterable[Dict[str, Any]], now: datetime) -> Tuple[List[UpdateOne], Dict[str, Dict[str, Any]]]:
+    """Recomputes the derived fields of (DERIVED_REFRESH_PROJECTION) documents; returns the writes and new values of those that changed."""
+    ops, changed = [], {}
+    for doc in docs:
+        values = derived_fields(doc, now)
+        if any(doc.get(k) != v for k, v in values.items()):
+            changed[doc["id"]] = values
+            ops.append(UpdateOne({"id": doc["id"]}, {"$set": {**values, "updated_at": now.isoformat()}}))
+    return ops, changed
+
+def availability_query(location: str, at: datetime) -> Dict[str, Any]:
+    """
+    Query for services bookable in `location` at the instant `at`: an open window of the location (or of
+    every location) contains it and no blackout window does. Day/month conditions are evaluated in UTC.
+    """
+    at = at.astimezone(UTC)
+    window = {
+        "from": {"$lte": at.isoformat()},
+        "to": {"$gt": at.isoformat()},
+        "days": {"$in": [WEEKDAYS[at.weekday()], None]},
+        "months": {"$in": [at.month, None]},
+    }
+    return {
+        "availability_index": {"$elemMatch": {"loc": {"$in": [normalize_location(location), ANY_LOCATION]}, **window}},
+        "availability_blackouts": {"$not": {"$elemMatch": window}},
+        "status": "active",
+    }
+
+def facet_stage(facets: Iterable[str], page: Optional[List[Dict[str, Any]]] = None, total: bool = True) -> Dict[str, Any]:
+    """$facet stage computing the requested facet counts and, if asked, the total and (given its stages) a result page."""
+    stage: Dict[str, Any] = {"total": [{"$count": "n"}]} if total else {}
+    for name in facets:
+        stage["facet_" + name] = FACET_PIPELINES[name]
+    if page is not None:
+        stage["page"] = page
+    return {"$facet": stage}
+
+def page_stages(skip: int, limit: int, sort: Optional[List[tuple]], projection: Dict[str, int]) -> List[Dict[str, Any]]:
+    stages: List[Dict[str, Any]] = [{"$sort": dict(sort)}] if sort else []
+    return stages + [{"$skip": skip}, {"$limit": limit}, {"$project": projection}]
+
+def facet_counts(result: Dict[str, Any], facets: Iterable[str]) -> Tuple[Optional[int], Dict[str, List[Dict[str, Any]]]]:
+    """Reads the total (None when it was not computed) and the facet counts out of a facet_stage() result document."""
+    total = (result["total"][0]["n"] if result["total"] else 0) if "total" in result else None
+    counts: Dict[str, List[Dict[str, Any]]] = {}
+    for name in facets:
+        rows = result.get("facet_" + name) or []
+        if name == "price":
+            upper = dict(zip(PRICE_FACET_BOUNDARIES, PRICE_FACET_BOUNDARIES[1:]))
+            counts[name] = [{"min": r["_id"], "max": upper.get(r["_id"]), "count": r["count"]} for r in rows if r["_id"] is not None]
+        else:
+            counts[name] = [{"value": r["_id"], "count": r["count"]} for r in rows]
+    return total, counts
+
+def facet_cache_key(query: Dict[str, Any], facets: Iterable[str]) -> tuple:
+    return json.dumps(query, sort_keys=True, default=str), tuple(sorted(facets))
+
+def graph_level_query(parent_ids: List[str], ids: List[str]) -> Optional[Dict[str, Any]]:
+    """Active services that are children of `parent_ids` or whose id is in `ids` (one service graph level)."""
+    conditions = []
+    if parent_ids:
+        conditions.append({"parent_service_ids": {"$in": parent_ids}})
+    if ids:
+        conditions.append({"id": {"$in": ids}})
+    if not conditions:
+        return None
+    return {"is_deleted": False, **(conditions[0] if len(conditions) == 1 else {"$or": conditions})}
+
+def public_service(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of a service document without _id and the internal fields."""
+    return apply_projection(doc, SERVICE_OUTPUT_PROJECTION)
+
+def service_with_vendor_pipeline(service_id: str, projection: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """Aggregation fetching one active service (optionally projected) with its vendor joined as a 'vendorDetails' array."""
+    return [
+        {"$match": {"id": service_id, "is_deleted": False}},
+        {"$limit": 1},
+        {"$project": projection or SERVICE_OUTPUT_PROJECTION},
+        {"$lookup": {"from": "vendors", "localField": "vendor_id", "foreignField": "id", "as": "vendorDetails"}},
+        {"$project": {"vendorDetails._id": 0}},
+    ]
+
+def unwrap_vendor_details(service: Dict[str, Any]) -> Dict[str, Any]:
+    """Replaces the joined 'vendorDetails' array with the active vendor document (or None)."""
+    vendors = [v for v in service.get("vendorDetails", []) if not v.get("is_deleted", False)]
+    service["vendorDetails"] = vendors[0] if vendors else None
+    return service
 
 class ServiceRepository:
-    def __init__(self, mongo_url=None, db_name=None):
-        mongo_url = mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017/")
+    def __init__(self, mongo_url=None, db_name=None, db=None):
         db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
         try:
-            self.client = MongoClient(mongo_url)
-            self.db = self.client[db_name]
+            self.db = db if db is not None else get_database(db_name, mongo_url)
+            self.client = self.db.client
             self.collection = self.db.services
-            logging.info("ServiceRepository initialized with DB: %s", db_name)
+            self.summaries = self.db[SUMMARY_COLLECTION]
+            # Read-through cache for get_service_by_id (None when CATALOG_CACHE_SIZE=0)
+            self.cache = cache_from_env("services")
+            # Latest updated_at of the collection (list validators); local writes drop it, other processes' show up within the TTL
+            self.version_cache = TTLCache(maxsize=1, ttl=float(os.getenv("CATALOG_VERSION_CACHE_TTL", "1")), name="service_versions")
+            self.count_cache = TTLCache(maxsize=1024, ttl=float(os.getenv("CATALOG_COUNT_CACHE_TTL", "10")), name="service_counts")
+            self.facet_cache = TTLCache(maxsize=512, ttl=float(os.getenv("CATALOG_FACET_CACHE_TTL", "30")), name="service_facets")
+            logging.info("ServiceRepository initialized with DB: %s", self.db.name)
         except errors.PyMongoError as e:
             logging.error("Failed to connect to MongoDB: %s", e)
             raise
 
     def _doc_to_service(self, doc: Dict[str, Any]) -> Optional[Service]:
-        """Converts a MongoDB document (dict) to a Service dataclass instance."""
+        """Converts a MongoDB document (dict) to a Service instance without modifying the document."""
         if not doc:
             return None
         try:
-            # Convert nested dictionaries back to dataclass instances if they exist
-            doc['pricing_tiers'] = [PricingTier(**p) for p in doc.get('pricing_tiers', [])]
-            doc['attributes'] = [ServiceAttribute(**a) for a in doc.get('attributes', [])]
-            doc['images'] = [MediaReference(**i) for i in doc.get('images', [])]
-            doc['videos'] = [MediaReference(**v) for v in doc.get('videos', [])]
-            doc['pricing_rules'] = [PricingRule(**p) for p in doc.get('pricing_rules', [])]
-            doc['availability_rules'] = [AvailabilityRule(**a) for a in doc.get('availability_rules', [])]
-            
-            # MongoDB's _id is internal, we use the 'id' field of the Service dataclass
-            # Ensure 'id' field is used for dataclass instantiation
-            if '_id' in doc: # Remove or handle MongoDB's internal _id if it clashes with your 'id' field
-                del doc['_id'] # We rely on our 'id' field for uniqueness, not MongoDB's _id for logic
-
-            # Convert 'created_at' and 'updated_at' strings back to datetime objects if needed
-            if isinstance(doc.get('created_at'), str):
-                doc['created_at'] = datetime.fromisoformat(doc['created_at'])
-            if isinstance(doc.get('updated_at'), str):
-                doc['updated_at'] = datetime.fromisoformat(doc['updated_at'])
-
-            return Service(**doc)
-        except Exception as e:
+            return decode_service(doc)
+        except (KeyError, TypeError, ValueError) as e:
             logging.error("Error converting document to Service: %s - Document: %s", e, doc)
             return None
 
     def _service_to_doc(self, service: Service) -> Dict[str, Any]:
-        """Converts a Service dataclass instance to a dictionary suitable for MongoDB storage."""
-        try:
-            return service.to_dict() # Use the to_dict method defined in the dataclass
-        except Exception as e:
-            logging.error("Error converting Service to dict: %s - Service: %s", e, service)
-            return {}
+        """Converts a Service instance to a dictionary suitable for MongoDB storage."""
+        return encode_service(service)
 
-    def get_all_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None) -> List[Dict]:
-        query = filters or {}
-        query["is_deleted"] = False
+    def _build_query(self, filters: Optional[Dict[str, Any]] = None, passthrough: bool = True) -> Dict[str, Any]:
+        return build_service_query(filters, passthrough)
+
+    def _projection(self, fields: Optional[List[str]] = None, lang: Optional[str] = None, extra: tuple = ()) -> Dict[str, int]:
+        return build_projection(fields, lang, LOCALIZED_SERVICE_FIELDS, SERVICE_FIELDS, extra, INTERNAL_SERVICE_FIELDS)
+
+    def _list_cursor(self, filters: Optional[Dict[str, Any]], skip: int, limit: int, sort: Optional[List[tuple]], projection: Optional[Dict[str, int]] = None):
+        cursor = self.collection.find(self._build_query(filters), projection or SERVICE_OUTPUT_PROJECTION).skip(skip).limit(limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
+    def _keyset_cursor(self, filters: Optional[Dict[str, Any]], limit: int, sort_field: str, direction: int, after: Optional[tuple], projection: Optional[Dict[str, int]] = None):
+        query = self._build_query(filters)
+        if after is not None:
+            query = {"$and": [query, keyset_condition(sort_field, direction, after[0], after[1])]}
+        return self.collection.find(query, projection or SERVICE_OUTPUT_PROJECTION).sort(keyset_sort(sort_field, direction)).limit(limit)
+
+    def get_all_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
         try:
-            cursor = self.collection.find(query).skip(skip).limit(limit)
-            if sort:
-                cursor = cursor.sort(sort)
-            
             # Return as raw dictionaries for controller to convert using utils.py for JSON serialization
-            return list(cursor) 
+            return list(self._list_cursor(filters, skip, limit, sort, self._projection(fields, lang)))
         except errors.PyMongoError as e:
             logging.error("Error fetching all services: %s", e)
             return []
 
-    def get_service_by_id(self, service_id: str) -> Optional[Dict]:
-        """Returns raw MongoDB document for controller to convert."""
+    def get_services_after(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = ASCENDING, after: Optional[tuple] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        """
+        Keyset pagination: returns up to `limit` services ordered by (sort_field, id) that come
+        strictly after the `after` = (sort value, id) position, so every page is a single index seek.
+        """
+        try:
+            return list(self._keyset_cursor(filters, limit, sort_field, direction, after, self._projection(fields, lang, (sort_field,))))
+        except errors.PyMongoError as e:
+            logging.error("Error fetching services page: %s", e)
+            return []
+
+    def explain_all_services(self, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None) -> Dict[str, Any]:
+        """Returns the summarized query plan of the get_all_services query."""
+        return summarize_explain(self._list_cursor(filters, skip, limit, sort).explain())
+
+    def explain_services_after(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20, sort_field: str = "id", direction: int = ASCENDING, after: Optional[tuple] = None) -> Dict[str, Any]:
+        """Returns the summarized query plan of the get_services_after query."""
+        return summarize_explain(self._keyset_cursor(filters, limit, sort_field, direction, after).explain())
+
+    def count_services(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact") -> Optional[int]:
+        """
+        Counts active services matching the filters, cached briefly per filter signature.
+        mode "estimate" uses the collection metadata count when there are no filters
+        (it includes soft-deleted services); with filters it falls back to an exact count.
+        """
+        query = self._build_query(filters)
+        estimate = mode == "estimate" and query == {"is_deleted": False}
+        key = (estimate, json.dumps(query, sort_keys=True, default=str))
+        total = self.count_cache.get(key)
+        if total is not None:
+            return total
+        try:
+            total = self.collection.estimated_document_count() if estimate else self.collection.count_documents(query)
+        except errors.PyMongoError as e:
+            logging.error("Error counting services: %s", e)
+            return None
+        self.count_cache.set(key, total)
+        return total
+
+    def get_services_with_facets(self, filters: Optional[Dict[str, Any]], facets: List[str], skip: int = 0, limit: int = 20, sort: Optional[List[tuple]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None, total: bool = True) -> Tuple[List[Dict], Optional[int], Dict[str, List[Dict]]]:
+        """
+        Returns (page, total, facet counts) for the filters in one $facet aggregation. Facet counts and
+        totals are cached briefly per normalized query; on a hit only the page is read. limit=0 skips the page,
+        total=False the count stage (the total is then None).
+        """
+        query = self._build_query(filters)
+        key = facet_cache_key(query, facets)
+        cached = self.facet_cache.get(key)
+        if cached is not None and (cached[0] is not None or not total):
+            cached_total, counts = cached
+            return (self.get_all_services(filters, skip, limit, sort, fields, lang) if limit else []), (cached_total if total else None), counts
+        page = page_stages(skip, limit, sort, self._projection(fields, lang)) if limit else None
+        try:
+            result = next(self.collection.aggregate([{"$match": query}, facet_stage(facets, page, total)]), {})
+        except errors.PyMongoError as e:
+            logging.error("Error computing service facets: %s", e)
+            return [], None, {}
+        total_count, counts = facet_counts(result, facets)
+        self.facet_cache.set(key, (total_count, counts))
+        if total_count is not None:
+            self.count_cache.set((False, key[0]), total_count)
+        return result.get("page", []), total_count, counts
+
+    def iter_services(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Streams all active services, e.g. to rebuild in-memory indexes at startup."""
+        try:
+            yield from self.collection.find({"is_deleted": False}, SERVICE_OUTPUT_PROJECTION, batch_size=batch_size)
+        except errors.PyMongoError as e:
+            logging.error("Error iterating services: %s", e)
+
+    def export_services(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Streams services matching filter_services-style filters (optionally only those updated at or
+        after `updated_since`, an ISO timestamp) straight from the cursor, without the _id field.
+        """
+        query = self._build_query(filters, passthrough=False)
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        try:
+            yield from self.collection.find(query, SERVICE_OUTPUT_PROJECTION, batch_size=batch_size)
+        except errors.PyMongoError as e:
+            logging.error("Error exporting services: %s", e)
+
+    def get_changes(self, after: Optional[tuple], until: str, limit: int) -> List[Dict]:
+        """Services created, updated or soft-deleted after `after` (see changes_query), oldest first, without _id."""
+        try:
+            return list(self.collection.find(changes_query(after, until), SERVICE_OUTPUT_PROJECTION).sort(CHANGES_SORT).limit(limit))
+        except errors.PyMongoError as e:
+            logging.error("Error reading service changes: %s", e)
+            return []
+
+    def get_service_by_id(self, service_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        """
+        Returns raw MongoDB document for controller to convert. Served from the cache when possible;
+        with fields/lang, cached documents are projected in memory and uncached reads are projected by MongoDB.
+        """
+        projection = self._projection(fields, lang)
+        if self.cache is not None:
+            cached = self.cache.get(service_id)
+            if cached is not None:
+                return apply_projection(cached, projection) # A copy: callers may add keys (e.g. vendorDetails)
         try:
-            return self.collection.find_one({"id": service_id, "is_deleted": False})
+            # Only whole documents are cached, so project in MongoDB only when nothing will be cached
+            doc = self.collection.find_one({"id": service_id, "is_deleted": False}, projection if self.cache is None else {"_id": 0})
         except errors.PyMongoError as e:
             logging.error("Error fetching service by id %s: %s", service_id, e)
             return None
+        if doc is not None and self.cache is not None:
+            self.cache.set(service_id, doc)
+            return apply_projection(doc, projection)
+        return doc
+
+    def get_services_by_ids(self, service_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Resolves many active services at once: cached services are served from memory and the rest
+        are fetched in a single $in query. Returns raw documents (without _id) keyed by service id.
+        """
+        ids = {sid for sid in service_ids if sid}
+        found: Dict[str, Dict] = {}
+        if self.cache is not None:
+            for sid in ids:
+                cached = self.cache.get(sid)
+                if cached is not None:
+                    found[sid] = public_service(cached)
+        missing = list(ids - found.keys())
+        if missing:
+            try:
+                for doc in self.collection.find({"id": {"$in": missing}, "is_deleted": False}, {"_id": 0}):
+                    if self.cache is not None:
+                        self.cache.set(doc["id"], doc)
+                    found[doc["id"]] = public_service(doc)
+            except errors.PyMongoError as e:
+                logging.error("Error fetching services by ids: %s", e)
+        return found
+
+    def _invalidate(self, service_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(service_id)
+        self.version_cache.invalidate("last_modified")
+
+    def last_modified(self) -> Optional[str]:
+        """
+        Latest updated_at across all services, soft-deleted ones included (soft deletes stamp it too), so it
+        changes with every write; one index seek, cached briefly. None when it cannot be read.
+        """
+        cached = self.version_cache.get("last_modified")
+        if cached is not None:
+            return cached or None
+        try:
+            doc = self.collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest service update: %s", e)
+            return None
+        value = str(doc["updated_at"]) if doc and doc.get("updated_at") else ""
+        self.version_cache.set("last_modified", value)
+        return value or None
+
+    def get_service_with_vendor(self, service_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        """Returns the service with its vendor embedded as 'vendorDetails', in one $lookup round trip."""
+        try:
+            docs = list(self.collection.aggregate(service_with_vendor_pipeline(service_id, self._projection(fields, lang))))
+        except errors.PyMongoError as e:
+            logging.error("Error fetching service with vendor %s: %s", service_id, e)
+            return None
+        return unwrap_vendor_details(docs[0]) if docs else None
 
     def filter_services(self, filters: Dict[str, Any]) -> List[Dict]:
-        query = {"is_deleted": False}
-        
         # Advanced filtering logic
-        if "category" in filters:
-            query["category"] = filters["category"]
-        if "vendor_id" in filters:
-            query["vendor_id"] = filters["vendor_id"]
-        if "min_price" in filters or "max_price" in filters:
-            price_query = {}
-            if "min_price" in filters:
-                price_query["$gte"] = filters["min_price"]
-            if "max_price" in filters:
-                price_query["$lte"] = filters["max_price"]
-            query["base_price"] = price_query
-        if "tags" in filters:
-            query["tags"] = {"$in": filters["tags"]}
-        
+        query = self._build_query(filters, passthrough=False)
+
         # Return as raw dictionaries for controller to convert
         try:
-            return list(self.collection.find(query))
+            return list(self.collection.find(query, SERVICE_OUTPUT_PROJECTION))
         except errors.PyMongoError as e:
             logging.error("Error filtering services: %s", e)
             return []
 
+    def get_available_services(self, location: str, at: datetime, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
+        """
+        Active services bookable in `location` at `at`, ordered by id. Narrowed by the same filters as
+        filter_services; the location/window lookup is an index range scan over availability_index.
+        """
+        query = {**self._build_query(filters, passthrough=False), **availability_query(location, at)}
+        try:
+            return list(self.collection.find(query, self._projection(fields, lang)).sort("id", ASCENDING).skip(skip).limit(limit))
+        except errors.PyMongoError as e:
+            logging.error("Error fetching available services: %s", e)
+            return []
+
+    def get_graph_level(self, parent_ids: List[str], ids: List[str], fields: Optional[List[str]] = None, lang: Optional[str] = None, limit: int = 0) -> List[Dict]:
+        """One level of a service graph walk (see graph_level_query), ordered by id."""
+        query = graph_level_query(parent_ids, ids)
+        if query is None:
+            return []
+        try:
+            return list(self.collection.find(query, self._projection(fields, lang)).sort("id", ASCENDING).limit(limit))
+        except errors.PyMongoError as e:
+            logging.error("Error fetching service graph level: %s", e)
+            return []
+
+    def _fill_system_fields(self, service_data: Dict[str, Any], now: str) -> Dict[str, Any]:
+        return fill_system_fields(service_data, now)
+
     def create_service(self, service_data: Dict[str, Any]) -> Dict:
         # Ensure system-managed fields are set
-        now = datetime.now(UTC).isoformat()
-        if 'id' not in service_data or not service_data['id']:
-            service_data['id'] = str(uuid.uuid4())
-        if 'created_at' not in service_data:
-            service_data['created_at'] = now
-        if 'updated_at' not in service_data:
-            service_data['updated_at'] = now
-        if 'is_deleted' not in service_data:
-            service_data['is_deleted'] = False
-        if 'status' not in service_data:
-            service_data['status'] = 'active'
+        now = datetime.now(UTC)
+        with_derived_fields(self._fill_system_fields(service_data, now.isoformat()), now)
 
         # Assuming service_data already contains the 'id' and other fields needed for Service creation
         # You might want to validate service_data against your Service dataclass structure here
         try:
             self.collection.insert_one(service_data)
+            service_data.pop("_id", None) # insert_one adds the ObjectId to the dict; responses never carry it
+            self._invalidate(service_data['id'])
+            self._apply_summary_changes([(None, service_data)])
             logging.info("Service created: %s", service_data['id'])
-            return service_data # Return the inserted data as raw dict
+            return public_service(service_data) # Return the inserted data as raw dict
         except errors.PyMongoError as e:
             logging.error("Error creating service: %s - Data: %s", e, service_data)
             return {}
 
     def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
-        update_data['updated_at'] = datetime.now(UTC).isoformat()
+        strip_derived_fields(update_data)
+        now = datetime.now(UTC)
+        update_data['updated_at'] = now.isoformat()
         try:
-            result = self.collection.update_one({"id": service_id}, {"$set": update_data})
-            if result.matched_count == 0:
+            before = self._write_update(service_id, update_data, now)
+            self._invalidate(service_id)
+            if before is None:
                 logging.warning("Service not found for update: %s", service_id)
                 return None
             logging.info("Service updated: %s", service_id)
+            if any(k in update_data for k in SUMMARY_INPUT_FIELDS):
+                self._apply_summary_changes([(before, updated_image(before, update_data))])
             return self.get_service_by_id(service_id) # Returns raw dict
         except errors.PyMongoError as e:
             logging.error("Error updating service %s: %s", service_id, e)
             return None
 
+    def _write_update(self, service_id: str, update_data: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
+        """
+        $sets update_data in one write and returns the pre-image's summary inputs (None: no such service). An update
+        touching derived inputs carries the derived fields too, computed from the current document and guarded by its
+        updated_at; a concurrent write in between makes the guard miss and the update recompute.
+        """
+        if not any(k in update_data for k in DERIVED_INPUT_FIELDS):
+            return self.collection.find_one_and_update({"id": service_id}, {"$set": update_data}, projection=SUMMARY_INPUT_PROJECTION,
+                                                       return_document=ReturnDocument.BEFORE)
+        for attempt in range(DERIVED_UPDATE_ATTEMPTS):
+            current = self.collection.find_one({"id": service_id}, DERIVED_UPDATE_PROJECTION)
+            if current is None:
+                return None
+            query = {"id": service_id}
+            if attempt < DERIVED_UPDATE_ATTEMPTS - 1:
+                query["updated_at"] = current.get("updated_at")
+            before = self.collection.find_one_and_update(query, {"$set": derived_update(current, update_data, now)},
+                                                         projection=SUMMARY_INPUT_PROJECTION, return_document=ReturnDocument.BEFORE)
+            if before is not None:
+                return before
+        return None
+
     def soft_delete_service(self, service_id: str) -> None:
         try:
-            result = self.collection.update_one({"id": service_id}, {"$set": {"is_deleted": True}})
-            if result.matched_count == 0:
+            before = self.collection.find_one_and_update({"id": service_id}, {"$set": {"is_deleted": True, "updated_at": datetime.now(UTC).isoformat()}},
+                                                         projection=SUMMARY_INPUT_PROJECTION, return_document=ReturnDocument.BEFORE)
+            self._invalidate(service_id)
+            if before is None:
                 logging.warning("Service not found for soft delete: %s", service_id)
             else:
+                self._apply_summary_changes([(before, None)])
                 logging.info("Service soft-deleted: %s", service_id)
         except errors.PyMongoError as e:
             logging.error("Error soft-deleting service %s: %s", service_id, e)
+
+    def bulk_create_services(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Inserts many services with unordered insert_many calls, filling system fields like create_service.
+        Returns one result per item, in input order (see bulk_writes.bulk_insert).
+        """
+        now = datetime.now(UTC)
+        docs = [with_derived_fields(self._fill_system_fields(item, now.isoformat()), now) for item in items]
+        results = bulk_insert(self.collection, docs, chunk_size, self._invalidate)
+        self._apply_summary_changes([(None, r["document"]) for r in results if r["status"] == "created"])
+        logging.info("Bulk-created %d of %d services", sum(r["status"] == "created" for r in results), len(items))
+        return results
+
+    def bulk_update_services(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Applies many partial updates ({"id": ..., <fields>}) with unordered bulk_write calls."""
+        now = datetime.now(UTC)
+        items = [strip_derived_fields(item) for item in items]
+        current = self._derived_inputs([item["id"] for item in items if any(k in item for k in DERIVED_INPUT_FIELDS)])
+        items = with_derived_updates(items, current, now)
+        before = self._summary_inputs([item["id"] for item in items if any(k in item for k in SUMMARY_INPUT_FIELDS)])
+        results = bulk_update(self.collection, items, now.isoformat(), chunk_size, self._invalidate)
+        self._apply_summary_changes(bulk_update_pairs(before, items, results))
+        logging.info("Bulk-updated %d of %d services", sum(r["status"] == "updated" for r in results), len(items))
+        return results
+
+    def bulk_soft_delete_services(self, service_ids: List[str], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Soft-deletes many services with one update_many per chunk."""
+        before = self._summary_inputs(service_ids)
+        results = bulk_soft_delete(self.collection, service_ids, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
+        self._apply_summary_changes(bulk_delete_pairs(before, results))
+        logging.info("Bulk soft-deleted %d of %d services", sum(r["status"] == "deleted" for r in results), len(service_ids))
+        return results
+
+    def _summary_inputs(self, service_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Pre-images (SUMMARY_INPUT_PROJECTION) of the services a bulk write is about to change."""
+        if not service_ids:
+            return {}
+        try:
+            return {doc["id"]: doc for doc in self.collection.find({"id": {"$in": service_ids}}, SUMMARY_INPUT_PROJECTION)}
+        except errors.PyMongoError as e:
+            logging.error("Error reading services before a bulk write: %s", e)
+            return {}
+
+    def _derived_inputs(self, service_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Current derived inputs (DERIVED_UPDATE_PROJECTION) of the active services a bulk update is about to change."""
+        if not service_ids:
+            return {}
+        try:
+            return {doc["id"]: doc for doc in self.collection.find({"id": {"$in": service_ids}, "is_deleted": False}, DERIVED_UPDATE_PROJECTION)}
+        except errors.PyMongoError as e:
+            logging.error("Error reading services before a bulk write: %s", e)
+            return {}
+
+    def _apply_summary_changes(self, pairs: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """
+        Applies (before, after) service images to the vendor summaries: counters and bounds move with $inc/$min/$max,
+        and vendors whose min or max base price was removed get their bounds recomputed from their active services.
+        Failures are logged, not raised: the service write already happened and rebuild_vendor_summaries repairs drift.
+        """
+        changes = summary_changes(pairs)
+        if not changes:
+            return
+        try:
+            ops, rebuild = summary_update_ops(changes, datetime.now(UTC).isoformat())
+            if ops:
+                self.summaries.bulk_write(ops, ordered=False)
+            removed = [vendor_id for vendor_id, change in changes.items() if change["removed"] and vendor_id not in rebuild]
+            stale = stale_bounds(changes, self.summaries.find({"vendor_id": {"$in": removed}}, {"_id": 0})) if removed else []
+            if stale:
+                self.summaries.bulk_write(bounds_update_ops(stale, self.collection.aggregate(bounds_pipeline(stale))), ordered=False)
+            if rebuild:
+                self.rebuild_vendor_summaries(sorted(rebuild))
+        except errors.PyMongoError as e:
+            logging.error("Error updating vendor summaries of %s: %s", sorted(changes), e)
+
+    def rebuild_vendor_summaries(self, vendor_ids: Optional[List[str]] = None) -> int:
+        """
+        Recomputes vendor summaries from the active services (all of them, or those of vendor_ids), replacing the
+        stored documents; summaries of vendors left without active services are reset. Returns the number written.
+        """
+        now = datetime.now(UTC).isoformat()
+        try:
+            summaries = build_summaries(self.collection.aggregate(rebuild_pipeline(vendor_ids), allowDiskUse=True), now)
+            known = vendor_ids if vendor_ids is not None else [doc["vendor_id"] for doc in self.summaries.find({}, {"_id": 0, "vendor_id": 1})]
+            ops = rebuild_ops(summaries, known, now)
+            for start in range(0, len(ops), BULK_CHUNK_SIZE):
+                self.summaries.bulk_write(ops[start:start + BULK_CHUNK_SIZE], ordered=False)
+        except errors.PyMongoError as e:
+            logging.error("Error rebuilding vendor summaries: %s", e)
+            return 0
+        if vendor_ids is None:
+            logging.info("Rebuilt the summaries of %d vendors", len(ops))
+        return len(ops)
+
+    def _write_derived_fields(self, docs: List[Dict[str, Any]], now: datetime) -> Dict[str, Dict[str, Any]]:
+        ops, changed = derived_refresh_ops(docs, now)
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+            for service_id in changed:
+                self._invalidate(service_id)
+        return changed
+
+    def refresh_derived_fields(self, service_ids: Optional[List[str]] = None, all_services: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Recomputes the derived price and availability fields. By default only services whose
+        price_refresh_at has passed (a pricing rule window opened or closed: the scheduled pass);
+        service_ids restricts it to those services and all_services recomputes every active service (backfill).
+        Returns the new values of the services that changed.
+        """
+        now = datetime.now(UTC)
+        query = derived_refresh_query(service_ids, None if all_services else now.isoformat())
+        changed: Dict[str, Dict[str, Any]] = {}
+        batch: List[Dict[str, Any]] = []
+        try:
+            for doc in self.collection.find(query, DERIVED_REFRESH_PROJECTION, batch_size=BULK_CHUNK_SIZE):
+                batch.append(doc)
+                if len(batch) == BULK_CHUNK_SIZE:
+                    changed.update(self._write_derived_fields(batch, now))
+                    batch = []
+            if batch:
+                changed.update(self._write_derived_fields(batch, now))
+        except errors.PyMongoError as e:
+            logging.error("Error refreshing derived service fields: %s", e)
+        if service_ids is None:
+            logging.info("Refreshed derived fields of %d services", len(changed))
+        return changed
@@ -0,0 +1,82 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type, Union
+
+from src.infrastructure.memory_store import AsyncMemoryDatabase, MemoryClient
+from src.infrastructure.mongo_connection import MongoConnectionManager, get_connection_manager
+
+
+class StorageBackend(ABC):
+    """
+    Where the repositories keep their collections. Both backends hand out databases with the pymongo
+    (database()) and motor (async_database()) collection APIs, so the repositories work unchanged on either.
+    A backend missing either method cannot be instantiated.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def database(self, db_name: Optional[str] = None):
+        """The named (default: MONGO_DB_NAME) database with the pymongo collection API."""
+
+    @abstractmethod
+    def async_database(self, db_name: Optional[str] = None):
+        """The same database with the motor (coroutine) collection API."""
+
+    def close(self) -> None:
+        pass
+
+
+class MongoBackend(StorageBackend):
+    """MongoDB through the connection manager; clients connect lazily, on their first operation."""
+
+    name = "mongo"
+
+    def __init__(self, mongo_url: Optional[str] = None, connection_manager: Optional[MongoConnectionManager] = None):
+        self.mongo_url = mongo_url
+        self.connection_manager = connection_manager or get_connection_manager()
+
+    def database(self, db_name: Optional[str] = None):
+        return self.connection_manager.get_database(db_name, self.mongo_url)
+
+    def async_database(self, db_name: Optional[str] = None):
+        return self.connection_manager.get_async_database(db_name, self.mongo_url)
+
+    def close(self) -> None:
+        self.connection_manager.close_all()
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Process-local collections with hash indexes (memory_store.py): no server, instant startup, and data that
+    lives as long as the backend. For tests, benchmarks and local development; nothing is persisted or shared.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.client = MemoryClient()
+
+    def database(self, db_name: Optional[str] = None):
+        return self.client.get_database(db_name)
+
+    def async_database(self, db_name: Optional[str] = None):
+        return AsyncMemoryDatabase(self.database(db_name))
+
+
+BACKENDS: Dict[str, Type[StorageBackend]] = {"mongo": MongoBackend, "memory": MemoryBackend}
+
+
+def create_backend(name: Union[str, StorageBackend, None] = None) -> StorageBackend:
+    """
+    Creates the backend named by `name` or CATALOG_STORAGE_BACKEND (default: mongo). Raises ValueError for unknown names.
+    A backend instance is returned as is, e.g. to serve one memory catalog from several apps.
+    """
+    if isinstance(name, StorageBackend):
+        return name
+    name = (name or os.getenv("CATALOG_STORAGE_BACKEND", "mongo")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}': expected one of {', '.join(BACKENDS)}")
+    logging.info("Using the %s storage backend", name)
+    return BACKENDS[name]()
@@ -1,98 +1,203 @@
+import dataclasses
 import os
-from pymongo import MongoClient
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+from pymongo import DESCENDING, errors
 from src.domain.service.vendor import Vendor
-from src.domain.service.value_objects import Contact, Rating, MediaReference
+from src.domain.service.codec import decode_vendor, encode_vendor
 from bson.objectid import ObjectId # Import ObjectId for type checking/conversion
 import uuid
 from datetime import datetime, UTC
 from dotenv import load_dotenv
 import logging
+from src.infrastructure.mongo_connection import get_database
+from src.infrastructure.query_utils import CHANGES_SORT, changes_query, fill_system_fields, build_projection, apply_projection
+from src.infrastructure.indexes import summarize_explain
+from src.infrastructure.cache import TTLCache, cache_from_env
+from src.infrastructure.bulk_writes import bulk_insert, bulk_update, bulk_soft_delete
+from src.infrastructure.vendor_summaries import SUMMARY_COLLECTION
 
 load_dotenv()  # Load environment variables from .env
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+# Top-level fields of the Vendor model, and the {lang: text} dicts narrowed by ?lang=
+VENDOR_FIELDS = tuple(f.name for f in dataclasses.fields(Vendor))
+LOCALIZED_VENDOR_FIELDS = ("logo.alt_text", "cover_image.alt_text")
 
 class VendorRepository:
-    def __init__(self, mongo_url=None, db_name=None):
-        mongo_url = mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017/")
+    def __init__(self, mongo_url=None, db_name=None, db=None):
         db_name = db_name or os.getenv("MONGO_DB_NAME", "service_catalog")
-        self.client = MongoClient(mongo_url)
-        self.db = self.client[db_name]
+        self.db = db if db is not None else get_database(db_name, mongo_url)
+        self.client = self.db.client
         self.collection = self.db.vendors
-        logging.info("VendorRepository initialized with DB: %s", db_name)
+        # Maintained by the service writes (see vendor_summaries.py); read-only here
+        self.summaries = self.db[SUMMARY_COLLECTION]
+        # Read-through cache for vendor lookups by id (None when CATALOG_CACHE_SIZE=0)
+        self.cache = cache_from_env("vendors")
+        # Latest updated_at of the collection (list validators); local writes drop it, other processes' show up within the TTL
+        self.version_cache = TTLCache(maxsize=1, ttl=float(os.getenv("CATALOG_VERSION_CACHE_TTL", "1")), name="vendor_versions")
+        logging.info("VendorRepository initialized with DB: %s", self.db.name)
 
     def _doc_to_vendor(self, doc: Dict[str, Any]) -> Optional[Vendor]:
-        """Converts a MongoDB document (dict) to a Vendor dataclass instance."""
+        """Converts a MongoDB document (dict) to a Vendor instance without modifying the document."""
         if not doc:
             return None
-        
-        # Convert nested dictionaries back to dataclass instances
-        if 'contact' in doc and isinstance(doc['contact'], dict):
-            doc['contact'] = Contact(**doc['contact'])
-        if 'rating' in doc and isinstance(doc['rating'], dict):
-            doc['rating'] = Rating(**doc['rating'])
-        if 'logo' in doc and isinstance(doc['logo'], dict):
-            doc['logo'] = MediaReference(**doc['logo'])
-        if 'cover_image' in doc and isinstance(doc['cover_image'], dict):
-            doc['cover_image'] = MediaReference(**doc['cover_image'])
-
-        if '_id' in doc: # Remove or handle MongoDB's internal _id
-            del doc['_id']
-
-        # Convert 'created_at' and 'updated_at' strings back to datetime objects if needed
-        if isinstance(doc.get('created_at'), str):
-            doc['created_at'] = datetime.fromisoformat(doc['created_at'])
-        if isinstance(doc.get('updated_at'), str):
-            doc['updated_at'] = datetime.fromisoformat(doc['updated_at'])
-
         try:
-            return Vendor(**doc)
-        except TypeError as e:
+            return decode_vendor(doc)
+        except (KeyError, TypeError, ValueError) as e:
             logging.error("Error converting document to Vendor: %s - Document: %s", e, doc)
             return None
 
     def _vendor_to_doc(self, vendor: Vendor) -> Dict[str, Any]:
-        """Converts a Vendor dataclass instance to a dictionary suitable for MongoDB storage."""
-        return vendor.to_dict() # Use the to_dict method defined in the dataclass
+        """Converts a Vendor instance to a dictionary suitable for MongoDB storage."""
+        return encode_vendor(vendor)
+
+    def _projection(self, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Dict[str, int]:
+        return build_projection(fields, lang, LOCALIZED_VENDOR_FIELDS, VENDOR_FIELDS)
 
-    def get_all_vendors(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    def get_all_vendors(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> List[Dict]:
         query = filters or {}
         query["is_deleted"] = False
-        return list(self.collection.find(query)) # Returns raw dicts
+        return list(self.collection.find(query, self._projection(fields, lang))) # Returns raw dicts
+
+    def explain_all_vendors(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns the summarized query plan of the get_all_vendors query."""
+        query = dict(filters or {})
+        query["is_deleted"] = False
+        return summarize_explain(self.collection.find(query, {"_id": 0}).explain())
+
+    def export_vendors(self, filters: Optional[Dict[str, Any]] = None, updated_since: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Streams active vendors matching the equality filters straight from the cursor, without the _id field."""
+        query = dict(filters or {})
+        query["is_deleted"] = False
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        yield from self.collection.find(query, {"_id": 0}, batch_size=batch_size)
 
-    def get_vendor_by_id(self, vendor_id: str) -> Optional[Dict]:
-        """Returns raw MongoDB document for controller to convert."""
-        return self.collection.find_one({"id": vendor_id, "is_deleted": False})
+    def get_changes(self, after: Optional[tuple], until: str, limit: int) -> List[Dict]:
+        """Vendors created, updated or soft-deleted after `after` (see changes_query), oldest first, without _id."""
+        return list(self.collection.find(changes_query(after, until), {"_id": 0}).sort(CHANGES_SORT).limit(limit))
+
+    def get_vendor_by_id(self, vendor_id: str, fields: Optional[List[str]] = None, lang: Optional[str] = None) -> Optional[Dict]:
+        """
+        Returns raw MongoDB document for controller to convert. Served from the cache when possible;
+        with fields/lang, cached documents are projected in memory and uncached reads are projected by MongoDB.
+        """
+        projection = self._projection(fields, lang)
+        if self.cache is not None:
+            cached = self.cache.get(vendor_id)
+            if cached is not None:
+                return apply_projection(cached, projection)
+        doc = self.collection.find_one({"id": vendor_id, "is_deleted": False}, projection if self.cache is None else {"_id": 0})
+        if doc is not None and self.cache is not None:
+            self.cache.set(vendor_id, doc)
+            return apply_projection(doc, projection)
+        return doc
+
+    def get_vendors_by_ids(self, vendor_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Resolves many vendors at once: cached vendors are served from memory and the rest
+        are fetched in a single $in query. Returns raw documents keyed by vendor id.
+        """
+        ids = {vid for vid in vendor_ids if vid}
+        found: Dict[str, Dict] = {}
+        if self.cache is not None:
+            for vid in ids:
+                cached = self.cache.get(vid)
+                if cached is not None:
+                    found[vid] = dict(cached)
+        missing = list(ids - found.keys())
+        if missing:
+            for doc in self.collection.find({"id": {"$in": missing}, "is_deleted": False}, {"_id": 0}):
+                if self.cache is not None:
+                    self.cache.set(doc["id"], doc)
+                found[doc["id"]] = dict(doc)
+        return found
+
+    def _invalidate(self, vendor_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(vendor_id)
+        self.version_cache.invalidate("last_modified")
+
+    def last_modified(self) -> Optional[str]:
+        """
+        Latest updated_at across all vendors, soft-deleted ones included (soft deletes stamp it too), so it
+        changes with every write; one index seek, cached briefly. None when it cannot be read.
+        """
+        cached = self.version_cache.get("last_modified")
+        if cached is not None:
+            return cached or None
+        try:
+            doc = self.collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest vendor update: %s", e)
+            return None
+        value = str(doc["updated_at"]) if doc and doc.get("updated_at") else ""
+        self.version_cache.set("last_modified", value)
+        return value or None
+
+    def get_vendor_summary(self, vendor_id: str) -> Optional[Dict]:
+        """The stored summary document of a vendor, without _id; None when none of its services was ever written."""
+        return self.summaries.find_one({"vendor_id": vendor_id}, {"_id": 0})
+
+    def get_vendor_summaries(self, vendor_ids: List[str]) -> Dict[str, Dict]:
+        """Stored summaries of many vendors in one $in query, keyed by vendor id."""
+        ids = [vid for vid in vendor_ids if vid]
+        if not ids:
+            return {}
+        return {doc["vendor_id"]: doc for doc in self.summaries.find({"vendor_id": {"$in": ids}}, {"_id": 0})}
+
+    def summaries_last_modified(self) -> Optional[str]:
+        """
+        Latest updated_at across vendor summaries. Not cached: service writes (another repository) move it,
+        and it is one seek on the updated_at index. None when it cannot be read.
+        """
+        try:
+            doc = self.summaries.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        except errors.PyMongoError as e:
+            logging.error("Error reading the latest vendor summary update: %s", e)
+            return None
+        return str(doc["updated_at"]) if doc and doc.get("updated_at") else None
+
+    def _fill_system_fields(self, vendor_data: Dict[str, Any], now: str) -> Dict[str, Any]:
+        return fill_system_fields(vendor_data, now)
 
     def create_vendor(self, vendor_data: Dict[str, Any]) -> Dict:
         # Ensure system-managed fields are set
-        now = datetime.now(UTC).isoformat()
-        if 'id' not in vendor_data or not vendor_data['id']:
-            vendor_data['id'] = str(uuid.uuid4())
-        if 'created_at' not in vendor_data:
-            vendor_data['created_at'] = now
-        if 'updated_at' not in vendor_data:
-            vendor_data['updated_at'] = now
-        if 'is_deleted' not in vendor_data:
-            vendor_data['is_deleted'] = False
-        if 'status' not in vendor_data:
-            vendor_data['status'] = 'active'
+        self._fill_system_fields(vendor_data, datetime.now(UTC).isoformat())
         # Assuming vendor_data already contains the 'id' and other fields needed for Vendor creation
         self.collection.insert_one(vendor_data)
+        vendor_data.pop("_id", None) # insert_one adds the ObjectId to the dict; responses never carry it
+        self._invalidate(vendor_data['id'])
         logging.info("Vendor created: %s", vendor_data['id'])
         return vendor_data # Return the inserted data as raw dict
 
     def update_vendor(self, vendor_id: str, update_data: Dict[str, Any]) -> Optional[Dict]:
         update_data['updated_at'] = datetime.now(UTC).isoformat()
         self.collection.update_one({"id": vendor_id}, {"$set": update_data})
+        self._invalidate(vendor_id)
         logging.info("Vendor updated: %s", vendor_id)
         return self.get_vendor_by_id(vendor_id) # Returns raw dict
 
     def soft_delete_vendor(self, vendor_id: str) -> None:
-        self.collection.update_one({"id": vendor_id}, {"$set": {"is_deleted": True}})
+        self.collection.update_one({"id": vendor_id}, {"$set": {"is_deleted": True, "updated_at": datetime.now(UTC).isoformat()}})
+        self._invalidate(vendor_id)
         logging.info("Vendor soft-deleted: %s", vendor_id)
+
+    def bulk_create_vendors(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Inserts many vendors with unordered insert_many calls, filling system fields like create_vendor."""
+        now = datetime.now(UTC).isoformat()
+        docs = [self._fill_system_fields(item, now) for item in items]
+        results = bulk_insert(self.collection, docs, chunk_size, self._invalidate)
+        logging.info("Bulk-created %d of %d vendors", sum(r["status"] == "created" for r in results), len(items))
+        return results
+
+    def bulk_update_vendors(self, items: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Applies many partial updates ({"id": ..., <fields>}) with unordered bulk_write calls."""
+        results = bulk_update(self.collection, items, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
+        logging.info("Bulk-updated %d of %d vendors", sum(r["status"] == "updated" for r in results), len(items))
+        return results
+
+    def bulk_soft_delete_vendors(self, vendor_ids: List[str], chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Soft-deletes many vendors with one update_many per chunk."""
+        results = bulk_soft_delete(self.collection, vendor_ids, datetime.now(UTC).isoformat(), chunk_size, self._invalidate)
+        logging.info("Bulk soft-deleted %d of %d vendors", sum(r["status"] == "deleted" for r in results), len(vendor_ids))
+        return results
@@ -0,0 +1,189 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+
+# Materialized per-vendor statistics over active services, one document per vendor in this collection.
+# Service writes apply their difference with $inc/$min/$max; a removed price that was a bound triggers a
+# recompute of that vendor's bounds, and rebuild_vendor_summaries repairs everything from scratch.
+SUMMARY_COLLECTION = "vendor_summaries"
+
+# Service fields a summary depends on; writes touching none of them leave summaries alone
+SUMMARY_INPUT_FIELDS = ("vendor_id", "category", "base_price", "is_on_sale", "is_deleted")
+SUMMARY_INPUT_PROJECTION = {"_id": 0, "id": 1, **{f: 1 for f in SUMMARY_INPUT_FIELDS}}
+
+# Counters of a summary document; categories holds {category: active service count} and the optional
+# min_base_price/max_base_price are absent (never null, which $min would keep) while no active service has a price
+SUMMARY_COUNTERS = ("active_services", "on_sale_services")
+
+
+def _price(doc: Dict[str, Any]) -> Optional[float]:
+    price = doc.get("base_price")
+    return price if isinstance(price, (int, float)) and not isinstance(price, bool) else None
+
+
+def _contribution(doc: Optional[Dict[str, Any]]) -> Optional[Tuple[str, Optional[str], Optional[float], bool]]:
+    """What a service adds to its vendor's summary: (vendor_id, category, base_price, on sale); None if nothing."""
+    if not doc or doc.get("is_deleted") or not doc.get("vendor_id"):
+        return None
+    return doc["vendor_id"], doc.get("category"), _price(doc), bool(doc.get("is_on_sale"))
+
+
+def _safe_key(category: Any) -> bool:
+    """Whether a category can be a field name under categories (no path separators or operators)."""
+    return isinstance(category, str) and bool(category) and "." not in category and not category.startswith("$")
+
+
+def summary_changes(pairs: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Folds (before, after) images of written services (None: did not exist / was not written) into per-vendor
+    changes: {"inc": {path: delta}, "min"/"max": lowest/highest added price, "removed": removed prices,
+    "rebuild": a category that cannot be a field name was involved}.
+    """
+    changes: Dict[str, Dict[str, Any]] = {}
+
+    def apply(contribution, sign: int) -> None:
+        vendor_id, category, price, on_sale = contribution
+        change = changes.setdefault(vendor_id, {"inc": {}, "min": None, "max": None, "removed": set(), "rebuild": False})
+        inc = change["inc"]
+        inc["active_services"] = inc.get("active_services", 0) + sign
+        if on_sale:
+            inc["on_sale_services"] = inc.get("on_sale_services", 0) + sign
+        if category is not None:
+            if _safe_key(category):
+                inc[f"categories.{category}"] = inc.get(f"categories.{category}", 0) + sign
+            else:
+                change["rebuild"] = True
+        if price is None:
+            return
+        if sign < 0:
+            change["removed"].add(price)
+        else:
+            change["min"] = price if change["min"] is None else min(change["min"], price)
+            change["max"] = price if change["max"] is None else max(change["max"], price)
+
+    for before, after in pairs:
+        old, new = _contribution(before), _contribution(after)
+        if old == new:
+            continue
+        if old is not None:
+            apply(old, -1)
+        if new is not None:
+            apply(new, 1)
+    return changes
+
+
+def updated_image(before: Optional[Dict[str, Any]], update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The summary inputs of a service after $set-ting update_data over its pre-image (None: it did not exist)."""
+    if before is None:
+        return None
+    return {**before, **{k: update_data[k] for k in SUMMARY_INPUT_FIELDS if k in update_data}}
+
+
+def bulk_update_pairs(before: Dict[str, Dict[str, Any]], items: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(before, after) images of a bulk update's written items; an id updated twice starts from its first update."""
+    images, pairs = dict(before), []
+    for item, result in zip(items, results):
+        image = images.get(item["id"])
+        if image is not None and result["status"] != "error":
+            images[item["id"]] = updated_image(image, item)
+            pairs.append((image, images[item["id"]]))
+    return pairs
+
+
+def bulk_delete_pairs(before: Dict[str, Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], None]]:
+    """(before, None) images of a bulk soft delete's deleted services, each id once."""
+    images = dict(before)
+    return [(images.pop(r["id"]), None) for r in results if r["status"] == "deleted" and r["id"] in images]
+
+
+def summary_update_ops(changes: Dict[str, Dict[str, Any]], now: str) -> Tuple[List[UpdateOne], Set[str]]:
+    """Upserting $inc/$min/$max updates for the changes; also returns the vendors that need a full rebuild."""
+    ops, rebuild = [], set()
+    for vendor_id, change in changes.items():
+        if change["rebuild"]:
+            rebuild.add(vendor_id)
+            continue
+        update: Dict[str, Any] = {"$set": {"updated_at": now}}
+        # Counters are always incremented (by 0 too) so that a newly upserted summary has all of them
+        update["$inc"] = {**{c: 0 for c in SUMMARY_COUNTERS}, **{path: delta for path, delta in change["inc"].items() if delta}}
+        if change["min"] is not None:
+            update["$min"] = {"min_base_price": change["min"]}
+            update["$max"] = {"max_base_price": change["max"]}
+        ops.append(UpdateOne({"vendor_id": vendor_id}, update, upsert=True))
+    return ops, rebuild
+
+
+def stale_bounds(changes: Dict[str, Dict[str, Any]], summaries: Iterable[Dict[str, Any]]) -> List[str]:
+    """Vendors whose current min or max base price belonged to a removed service, so it must be recomputed."""
+    stale = []
+    for summary in summaries:
+        removed = changes.get(summary["vendor_id"], {}).get("removed")
+        if removed and (summary.get("min_base_price") in removed or summary.get("max_base_price") in removed):
+            stale.append(summary["vendor_id"])
+    return stale
+
+
+def bounds_pipeline(vendor_ids: List[str]) -> List[Dict[str, Any]]:
+    """Min/max base price of the vendors' active services (served by the vendor_id_active index)."""
+    return [
+        {"$match": {"vendor_id": {"$in": vendor_ids}, "is_deleted": False}},
+        {"$group": {"_id": "$vendor_id", "min_base_price": {"$min": "$base_price"}, "max_base_price": {"$max": "$base_price"}}},
+    ]
+
+
+def bounds_update_ops(vendor_ids: List[str], rows: Iterable[Dict[str, Any]]) -> List[UpdateOne]:
+    """Writes recomputed bounds; vendors without priced active services lose them."""
+    bounds = {row["_id"]: row for row in rows}
+    ops = []
+    for vendor_id in vendor_ids:
+        row = bounds.get(vendor_id) or {}
+        if row.get("min_base_price") is None:
+            update: Dict[str, Any] = {"$unset": {"min_base_price": "", "max_base_price": ""}}
+        else:
+            update = {"$set": {"min_base_price": row["min_base_price"], "max_base_price": row["max_base_price"]}}
+        ops.append(UpdateOne({"vendor_id": vendor_id}, update))
+    return ops
+
+
+def rebuild_pipeline(vendor_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Active service counts and price bounds per (vendor, category, on sale), folded by build_summaries."""
+    match: Dict[str, Any] = {"is_deleted": False}
+    if vendor_ids is not None:
+        match["vendor_id"] = {"$in": vendor_ids}
+    return [
+        {"$match": match},
+        {"$group": {"_id": {"vendor_id": "$vendor_id", "category": "$category", "is_on_sale": "$is_on_sale"},
+                    "count": {"$sum": 1}, "min_base_price": {"$min": "$base_price"}, "max_base_price": {"$max": "$base_price"}}},
+    ]
+
+
+def empty_summary(vendor_id: str, now: str) -> Dict[str, Any]:
+    return {"vendor_id": vendor_id, **{c: 0 for c in SUMMARY_COUNTERS}, "categories": {}, "updated_at": now}
+
+
+def build_summaries(rows: Iterable[Dict[str, Any]], now: str) -> Dict[str, Dict[str, Any]]:
+    """Folds rebuild_pipeline rows into complete summary documents keyed by vendor id."""
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        vendor_id = row["_id"].get("vendor_id")
+        if not vendor_id:
+            continue
+        summary = summaries.setdefault(vendor_id, empty_summary(vendor_id, now))
+        summary["active_services"] += row["count"]
+        if row["_id"].get("is_on_sale"):
+            summary["on_sale_services"] += row["count"]
+        category = row["_id"].get("category")
+        if category is not None:
+            key = str(category)
+            summary["categories"][key] = summary["categories"].get(key, 0) + row["count"]
+        for bound, pick in (("min_base_price", min), ("max_base_price", max)):
+            if isinstance(row.get(bound), (int, float)) and not isinstance(row[bound], bool):
+                summary[bound] = row[bound] if bound not in summary else pick(summary[bound], row[bound])
+    return summaries
+
+
+def rebuild_ops(summaries: Dict[str, Dict[str, Any]], vendor_ids: Iterable[str], now: str) -> List[ReplaceOne]:
+    """Replaces the summaries of vendor_ids (and of every vendor in summaries) with the rebuilt documents."""
+    ids = set(vendor_ids) | set(summaries)
+    return [ReplaceOne({"vendor_id": vid}, summaries.get(vid) or empty_summary(vid, now), upsert=True) for vid in sorted(ids)]
+
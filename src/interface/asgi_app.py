@@ -0,0 +1,91 @@
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from pymongo import errors
+from quart import Quart
+
+from src.infrastructure.async_service_repository import AsyncServiceRepository
+from src.infrastructure.async_vendor_repository import AsyncVendorRepository
+from src.infrastructure.search_indexer import SearchIndexer
+from src.infrastructure.mongo_connection import get_connection_manager
+from src.infrastructure.storage import create_backend
+from src.infrastructure.indexes import apply_indexes
+from src.application.async_catalog_service import AsyncCatalogService
+from src.application.async_vendor_service import AsyncVendorService
+from src.application.async_change_feed_service import AsyncChangeFeedService
+from src.application.async_search_service import AsyncSearchService
+from src.application.async_search_sync import AsyncSearchIndexSync
+from src.interface.async_catalog_controller import create_async_catalog_controller
+from src.interface.async_search_controller import create_async_search_controller
+from src.interface.async_vendor_controller import create_async_vendor_controller
+from src.interface.async_change_controller import create_async_change_controller
+from src.interface.async_admin_controller import create_async_admin_controller
+from src.interface.json_provider import CatalogJSONProvider
+from src.interface.request_logging import install_async_request_logging
+from src.interface.async_metrics_controller import create_async_metrics_controller, install_async_http_metrics
+from src.interface.compression import install_async_compression
+
+
+def create_asgi_app(config: Optional[Dict[str, Any]] = None) -> Quart:
+    """
+    Builds the ASGI variant of the catalog API: the same routes as main.py, served by Quart over motor,
+    so a single process can keep thousands of requests in flight while they wait on MongoDB.
+    Run with: hypercorn asgi:app
+    """
+    app = Quart(__name__)
+    app.json = CatalogJSONProvider(app)
+    app.config['EXPLAIN_ENABLED'] = os.getenv("CATALOG_DEBUG_EXPLAIN", "false").lower() == "true"
+    app.config['ADMIN_ENABLED'] = os.getenv("CATALOG_ADMIN_ENDPOINTS", "false").lower() == "true"
+    app.config['STORAGE_BACKEND'] = os.getenv("CATALOG_STORAGE_BACKEND", "mongo")
+    app.config['ENSURE_INDEXES'] = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+    app.config['CHANGES_SETTLE_SECONDS'] = None
+    app.config['SEARCH_SYNC_SECONDS'] = None
+    if config:
+        app.config.update(config)
+    install_async_request_logging(app)
+    http_metrics = install_async_http_metrics(app)
+    install_async_compression(app)
+
+    # motor binds to the running event loop on first use, so nothing touches the network until serving starts
+    backend = create_backend(app.config['STORAGE_BACKEND'])
+    service_repo = AsyncServiceRepository(db=backend.async_database())
+    vendor_repo = AsyncVendorRepository(db=backend.async_database())
+    search_indexer = SearchIndexer()
+
+    catalog_service = AsyncCatalogService(service_repo, vendor_repo, search_indexer)
+    search_service = AsyncSearchService(search_indexer, service_repo)
+    vendor_service = AsyncVendorService(vendor_repo)
+    change_feed_service = AsyncChangeFeedService(service_repo, vendor_repo, app.config['CHANGES_SETTLE_SECONDS'])
+    search_sync = AsyncSearchIndexSync(search_indexer, service_repo, app.config['SEARCH_SYNC_SECONDS'], app.config['CHANGES_SETTLE_SECONDS'], vendor_repo=vendor_repo)
+    app.extensions["storage"] = backend
+
+    @app.before_serving
+    async def build_search_index():
+        # Ensure the declarative index registry is applied (idempotent), as main.py does; the memory backend
+        # always needs it, as its hash indexes and unique constraints come from the registry
+        if app.config['ENSURE_INDEXES'] or backend.name == "memory":
+            try:
+                apply_indexes(backend.database())
+            except errors.PyMongoError as e:
+                logging.error("Failed to apply indexes: %s", e)
+        search_sync.reset()
+        await catalog_service.rebuild_search_index()
+        search_sync.start()
+        if backend.name == "memory":
+            await service_repo.rebuild_vendor_summaries()
+
+    @app.after_serving
+    async def close_clients():
+        search_sync.stop()
+        backend.close()
+
+    app.register_blueprint(create_async_catalog_controller(catalog_service))
+    app.register_blueprint(create_async_search_controller(search_service))
+    app.register_blueprint(create_async_vendor_controller(vendor_service))
+    app.register_blueprint(create_async_change_controller(change_feed_service))
+    app.register_blueprint(create_async_admin_controller(get_connection_manager(), [service_repo.cache, vendor_repo.cache, service_repo.count_cache, service_repo.facet_cache]))
+    app.register_blueprint(create_async_metrics_controller(http_metrics, get_connection_manager(), [service_repo.cache, vendor_repo.cache, service_repo.count_cache, service_repo.facet_cache]))
+
+    logging.info("ASGI app initialized and all blueprints registered.")
+    return app
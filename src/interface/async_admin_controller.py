@@ -0,0 +1,28 @@
+from quart import Blueprint, current_app, jsonify
+from typing import List, Optional
+from .utils import format_response, format_error_response # Import utility functions
+
+def create_async_admin_controller(connection_manager, caches: Optional[List] = None):
+    """Quart blueprint with the same admin routes as create_admin_controller."""
+    bp = Blueprint('admin', __name__)
+    caches = [c for c in (caches or []) if c is not None]
+
+    def _disabled():
+        # Process internals are for operators: like ?explain=, only on deployments that enable them
+        return jsonify(format_error_response("Admin endpoints are disabled", "FORBIDDEN", 403)), 403
+
+    @bp.route('/admin/pool-stats', methods=['GET'])
+    async def pool_stats():
+        """MongoDB connection pool checkout statistics, used to size maxPoolSize/minPoolSize."""
+        if not current_app.config.get('ADMIN_ENABLED'):
+            return _disabled()
+        return jsonify(format_response(connection_manager.get_pool_stats())), 200
+
+    @bp.route('/admin/cache-stats', methods=['GET'])
+    async def cache_stats():
+        """Hit, miss and eviction counters of the in-process caches."""
+        if not current_app.config.get('ADMIN_ENABLED'):
+            return _disabled()
+        return jsonify(format_response([cache.stats() for cache in caches])), 200
+
+    return bp
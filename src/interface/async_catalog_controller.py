@@ -0,0 +1,231 @@
+import asyncio
+from quart import Blueprint, Response, current_app, request, jsonify
+from pymongo import ASCENDING, DESCENDING
+from .catalog_controller import AVAILABILITY_PARAMS, RESERVED_LIST_PARAMS, SERVICE_FACETS
+from .utils import format_response, format_error_response, parse_expand, parse_fields, parse_lang, encode_cursor, decode_cursor, parse_bulk_items, parse_bulk_ids, validate_service_body, parse_export_params, parse_instant, parse_bounded_int, parse_page, parse_price_filters, parse_facets, ndjson_stream_async, response_validators, not_modified, EXPORT_PARAMS # Import utility functions
+import logging
+from src.application.service_graph import GRAPH_MAX_DEPTH, parse_relations
+
+def create_async_catalog_controller(catalog_service):
+    """Quart blueprint with the same routes and responses as create_catalog_controller, over AsyncCatalogService."""
+    bp = Blueprint('catalog', __name__)
+
+    @bp.route('/services', methods=['GET'])
+    async def list_services():
+        page = int(request.args.get('page', 1))
+        page_size = int(request.args.get('pageSize', 20))
+        skip = (page - 1) * page_size
+
+        filters = {k: v for k, v in request.args.items() if k not in RESERVED_LIST_PARAMS}
+        expand = parse_expand(request.args.get('expand'))
+        total_mode = request.args.get('total', 'none').lower()
+        if total_mode not in ('exact', 'estimate', 'none'):
+            return jsonify(format_error_response("total must be one of exact, estimate, none", "INVALID_PARAM", 400)), 400
+        # Sparse fieldsets: ?fields=name,base_price and/or ?lang=fr become a MongoDB projection
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+            facets = parse_facets(request.args.get('facets'), SERVICE_FACETS)
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+
+        explain = request.args.get('explain', '').lower() == 'true'
+        if explain and not current_app.config.get('EXPLAIN_ENABLED'):
+            return jsonify(format_error_response("Query explain is disabled", "FORBIDDEN", 403)), 403
+
+        validators = response_validators(request.full_path, await catalog_service.catalog_version('vendor' in expand))
+        if not explain and not_modified(request.headers, validators):
+            return "", 304, validators
+
+        sort_by = request.args.get('sort_by')
+        sort_order = request.args.get('sort_order', 'asc') # 'asc' or 'desc'
+        sort_direction = ASCENDING if sort_order.lower() == 'asc' else DESCENDING
+        sort_param = None
+        if sort_by:
+            sort_param = [(sort_by, sort_direction)]
+
+        if 'cursor' in request.args:
+            sort_field = sort_by or 'id'
+            after = None
+            if request.args['cursor']:
+                try:
+                    after = decode_cursor(request.args['cursor'], sort_field, sort_direction)
+                except ValueError as e:
+                    return jsonify(format_error_response(str(e), "INVALID_CURSOR", 400)), 400
+            if explain:
+                plan = await catalog_service.explain_list_services(filters, limit=page_size, keyset=(sort_field, sort_direction, after))
+                return jsonify(format_response(plan)), 200
+            page_query = catalog_service.list_services_page(filters, page_size, sort_field, sort_direction, after, expand_vendor='vendor' in expand, fields=fields, lang=lang)
+        else:
+            if explain:
+                plan = await catalog_service.explain_list_services(filters, skip, page_size, sort_param)
+                return jsonify(format_response(plan)), 200
+            if facets:
+                page_query = catalog_service.list_services_with_facets(filters, facets, skip, page_size, sort_param, expand_vendor='vendor' in expand, fields=fields, lang=lang, total=total_mode != 'none')
+            else:
+                page_query = catalog_service.list_services(filters, skip, page_size, sort_param, expand_vendor='vendor' in expand, fields=fields, lang=lang)
+
+        if facets and 'cursor' not in request.args:
+            # Page, facet counts and (unless total=none) the total from a single $facet aggregation
+            page_result, total_services, facet_counts = await page_query
+        elif facets:
+            page_result, (_, total_services, facet_counts) = await asyncio.gather(page_query, catalog_service.list_services_with_facets(filters, facets, limit=0, total=total_mode != 'none'))
+        # The page (with its vendor lookup) and the total count are independent, so run them concurrently
+        elif total_mode != 'none':
+            page_result, total_services = await asyncio.gather(page_query, catalog_service.count_services(filters, total_mode))
+        else:
+            page_result, total_services = await page_query, None
+
+        if 'cursor' in request.args:
+            services, next_after = page_result
+            pagination_info = {
+                "pageSize": page_size,
+                "next_cursor": encode_cursor(sort_field, sort_direction, next_after) if next_after else None
+            }
+        else:
+            services = page_result
+            pagination_info = {
+                "page": page,
+                "pageSize": page_size
+            }
+        if total_services is not None:
+            pagination_info["total_items"] = total_services
+            pagination_info["total_pages"] = (total_services + page_size - 1) // page_size
+
+        body = format_response(services, pagination_info)
+        if facets:
+            body["facets"] = facet_counts
+        return jsonify(body), 200, validators
+
+    @bp.route('/services/export', methods=['GET'])
+    async def export_services():
+        """Streams the catalog as NDJSON (optionally gzip) straight from a MongoDB cursor."""
+        try:
+            updated_since, batch_size, gzip = parse_export_params(request.args, request.headers.get('Accept-Encoding', ''))
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in EXPORT_PARAMS}
+        docs = catalog_service.export_services(filters, updated_since, batch_size)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if gzip else {"Vary": "Accept-Encoding"}
+        return Response(ndjson_stream_async(docs, gzip), mimetype="application/x-ndjson", headers=headers)
+
+    @bp.route('/services/available', methods=['GET'])
+    async def available_services():
+        """Services bookable in ?location= at ?at= (ISO timestamp, default now)."""
+        location = request.args.get('location', '').strip()
+        if not location:
+            return jsonify(format_error_response("location is required", "INVALID_PARAM", 400)), 400
+        try:
+            at = parse_instant(request.args.get('at'))
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+            page, page_size = parse_page(request.args)
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in AVAILABILITY_PARAMS}
+        services = await catalog_service.list_available_services(location, at, filters, (page - 1) * page_size, page_size, fields, lang)
+        return jsonify(format_response(services, {"page": page, "pageSize": page_size, "at": at.isoformat()})), 200
+
+    @bp.route('/services/<service_id>/graph', methods=['GET'])
+    async def service_graph(service_id):
+        """Resolves the bundle around a service: ?depth= levels (default 2) of ?include= relations (default children)."""
+        expand = parse_expand(request.args.get('expand'))
+        try:
+            depth = parse_bounded_int(request.args.get('depth'), 'depth', 2, 0, GRAPH_MAX_DEPTH)
+            relations = parse_relations(request.args.get('include'))
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        graph = await catalog_service.get_service_graph(service_id, depth, relations, 'vendor' in expand, fields, lang)
+        if graph is None:
+            return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+        return jsonify(format_response(graph)), 200
+
+    @bp.route('/services/<service_id>', methods=['GET'])
+    async def service_details(service_id):
+        expand = parse_expand(request.args.get('expand', 'vendor'))
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        stamps = await catalog_service.service_version(service_id, expand_vendor='vendor' in expand)
+        if stamps is None:
+            return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        service = await catalog_service.get_service_details(service_id, expand_vendor='vendor' in expand, fields=fields, lang=lang)
+        if not service:
+            return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+
+        return jsonify(format_response(service)), 200, validators
+
+    @bp.route('/services', methods=['POST'])
+    async def create_service():
+        data = await request.get_json()
+        try:
+            validate_service_body(data)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        try:
+            created = await catalog_service.create_service(data)
+            return jsonify(format_response(created)), 201
+        except Exception as e:
+            logging.error("Error creating service: %s", e)
+            return jsonify(format_error_response(str(e), "CREATE_ERROR", 500)), 500
+
+    @bp.route('/services/<service_id>', methods=['PUT'])
+    async def update_service(service_id):
+        data = await request.get_json()
+        try:
+            validate_service_body(data)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        try:
+            updated = await catalog_service.update_service(service_id, data)
+            if not updated:
+                return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+            return jsonify(format_response(updated)), 200
+        except Exception as e:
+            logging.error("Error updating service: %s", e)
+            return jsonify(format_error_response(str(e), "UPDATE_ERROR", 500)), 500
+
+    @bp.route('/services/<service_id>', methods=['DELETE'])
+    async def delete_service(service_id):
+        try:
+            await catalog_service.delete_service(service_id)
+            return jsonify({"message": "Service soft-deleted successfully"}), 200
+        except Exception as e:
+            logging.error("Error deleting service: %s", e)
+            return jsonify(format_error_response(str(e), "DELETE_ERROR", 500)), 500
+
+    @bp.route('/services/bulk', methods=['POST'])
+    async def bulk_create_services():
+        try:
+            items = parse_bulk_items(await request.get_json(silent=True), validate=validate_service_body)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await catalog_service.bulk_create_services(items))), 200
+
+    @bp.route('/services/bulk', methods=['PATCH'])
+    async def bulk_update_services():
+        try:
+            items = parse_bulk_items(await request.get_json(silent=True), require_id=True, validate=validate_service_body)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await catalog_service.bulk_update_services(items))), 200
+
+    @bp.route('/services/bulk', methods=['DELETE'])
+    async def bulk_delete_services():
+        try:
+            ids = parse_bulk_ids(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await catalog_service.bulk_delete_services(ids))), 200
+
+    return bp
@@ -0,0 +1,38 @@
+from quart import Blueprint, Response, g, request
+from typing import List, Optional
+from src.infrastructure.metrics import CONTENT_TYPE, HttpMetrics
+from .metrics_controller import render_metrics
+
+def install_async_http_metrics(app, http_metrics: Optional[HttpMetrics] = None) -> HttpMetrics:
+    """Quart counterpart of install_http_metrics (async hooks, so nothing is pushed to the thread pool)."""
+    http_metrics = http_metrics or HttpMetrics()
+
+    @app.before_request
+    async def _metrics_start():
+        g.metrics_route = request.url_rule.rule if request.url_rule else None
+        g.metrics_started = http_metrics.start(request.method, g.metrics_route)
+
+    @app.after_request
+    async def _metrics_finish(response):
+        if 'metrics_started' in g:
+            http_metrics.finish(request.method, g.metrics_route, response.status_code, response.content_length, g.metrics_started)
+        return response
+
+    @app.teardown_request
+    async def _metrics_done(exc):
+        if 'metrics_started' in g:
+            http_metrics.done(request.method, g.metrics_route)
+
+    return http_metrics
+
+def create_async_metrics_controller(http_metrics: HttpMetrics, connection_manager, caches: Optional[List] = None):
+    """Quart blueprint with the same /metrics route as create_metrics_controller."""
+    bp = Blueprint('metrics', __name__)
+    caches = [c for c in (caches or []) if c is not None]
+
+    @bp.route('/metrics', methods=['GET'])
+    async def metrics():
+        """Prometheus scrape endpoint: HTTP, MongoDB command, pool, cache and logging metrics."""
+        return Response(render_metrics(http_metrics, connection_manager, caches), content_type=CONTENT_TYPE)
+
+    return bp
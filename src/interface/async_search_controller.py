@@ -0,0 +1,36 @@
+from quart import Blueprint, request, jsonify
+from .search_controller import SUGGEST_MAX_LIMIT
+from .utils import format_response, format_error_response, parse_bounded_int, parse_lang, parse_page # Import utility functions
+
+def create_async_search_controller(search_service):
+    """Quart blueprint for /services/search and /services/suggest; the indexes are in memory, only search hits are read from the repository."""
+    bp = Blueprint('search', __name__)
+
+    @bp.route('/services/search', methods=['GET'])
+    async def search_services():
+        query = request.args.get('q', '')
+        lang = request.args.get('lang')
+        try:
+            page, page_size = parse_page(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        results, total = await search_service.search(query, lang, page, page_size)
+        pagination_info = {
+            "page": page,
+            "pageSize": page_size,
+            "total_items": total,
+            "total_pages": (total + page_size - 1) // page_size
+        }
+        return jsonify(format_response(results, pagination_info)), 200
+
+    @bp.route('/services/suggest', methods=['GET'])
+    async def suggest_services():
+        """Typeahead: ?q= prefix, optional ?lang= locale of service names, ?limit= (1-50, default 10)."""
+        try:
+            lang = parse_lang(request.args.get('lang'))
+            limit = parse_bounded_int(request.args.get('limit'), 'limit', 10, 1, SUGGEST_MAX_LIMIT)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        return jsonify(format_response(search_service.suggest(request.args.get('q', ''), lang, limit))), 200
+
+    return bp
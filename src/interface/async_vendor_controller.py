@@ -0,0 +1,124 @@
+from quart import Blueprint, Response, current_app, request, jsonify
+from .utils import format_response, format_error_response, parse_expand, parse_fields, parse_lang, parse_bulk_items, parse_bulk_ids, parse_export_params, ndjson_stream_async, response_validators, not_modified, EXPORT_PARAMS # Import utility functions
+
+def create_async_vendor_controller(vendor_service):
+    """Quart blueprint with the same routes and responses as create_vendor_controller, over AsyncVendorService."""
+    bp = Blueprint('vendor', __name__)
+
+    @bp.route('/vendors', methods=['GET'])
+    async def list_vendors():
+        filters = {k: v for k, v in request.args.items() if k not in ('explain', 'expand', 'fields', 'lang')}
+        if request.args.get('explain', '').lower() == 'true':
+            if not current_app.config.get('EXPLAIN_ENABLED'):
+                return jsonify(format_error_response("Query explain is disabled", "FORBIDDEN", 403)), 403
+            return jsonify(format_response(await vendor_service.explain_list_vendors(filters))), 200
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        # ?expand=summary attaches each vendor's service statistics (see /vendors/<id>/summary)
+        with_summary = 'summary' in parse_expand(request.args.get('expand'))
+        validators = response_validators(request.full_path, await vendor_service.vendors_version(with_summary))
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        vendors = await vendor_service.list_vendors(filters, fields, lang, with_summary)
+        return jsonify(format_response(vendors)), 200, validators
+
+    @bp.route('/vendors/export', methods=['GET'])
+    async def export_vendors():
+        """Streams all vendors as NDJSON (optionally gzip) straight from a MongoDB cursor."""
+        try:
+            updated_since, batch_size, gzip = parse_export_params(request.args, request.headers.get('Accept-Encoding', ''))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in EXPORT_PARAMS}
+        docs = vendor_service.export_vendors(filters, updated_since, batch_size)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if gzip else {"Vary": "Accept-Encoding"}
+        return Response(ndjson_stream_async(docs, gzip), mimetype="application/x-ndjson", headers=headers)
+
+    @bp.route('/vendors/<vendor_id>', methods=['GET'])
+    async def vendor_details(vendor_id):
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        stamps = await vendor_service.vendor_version(vendor_id)
+        if stamps is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        vendor = await vendor_service.get_vendor_details(vendor_id, fields, lang)
+        if not vendor:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        return jsonify(format_response(vendor)), 200, validators
+
+    @bp.route('/vendors/<vendor_id>/summary', methods=['GET'])
+    async def vendor_summary(vendor_id):
+        """The vendor's rating with its active service count, category mix, base price range and on-sale count."""
+        stamps = await vendor_service.vendor_summary_version(vendor_id)
+        if stamps is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        summary = await vendor_service.get_vendor_summary(vendor_id)
+        if summary is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        return jsonify(format_response(summary)), 200, validators
+
+    @bp.route('/vendors', methods=['POST'])
+    async def create_vendor():
+        data = await request.get_json()
+        try:
+            created = await vendor_service.create_vendor(data)
+            return jsonify(format_response(created)), 201
+        except Exception as e:
+            return jsonify(format_error_response(str(e), "CREATE_ERROR", 500)), 500
+
+    @bp.route('/vendors/<vendor_id>', methods=['PUT'])
+    async def update_vendor(vendor_id):
+        data = await request.get_json()
+        try:
+            updated = await vendor_service.update_vendor(vendor_id, data)
+            if not updated:
+                return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+            return jsonify(format_response(updated)), 200
+        except Exception as e:
+            return jsonify(format_error_response(str(e), "UPDATE_ERROR", 500)), 500
+
+    @bp.route('/vendors/<vendor_id>', methods=['DELETE'])
+    async def delete_vendor(vendor_id):
+        try:
+            await vendor_service.delete_vendor(vendor_id)
+            return jsonify({"message": "Vendor soft-deleted successfully"}), 200
+        except Exception as e:
+            return jsonify(format_error_response(str(e), "DELETE_ERROR", 500)), 500
+
+    @bp.route('/vendors/bulk', methods=['POST'])
+    async def bulk_create_vendors():
+        try:
+            items = parse_bulk_items(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await vendor_service.bulk_create_vendors(items))), 200
+
+    @bp.route('/vendors/bulk', methods=['PATCH'])
+    async def bulk_update_vendors():
+        try:
+            items = parse_bulk_items(await request.get_json(silent=True), require_id=True)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await vendor_service.bulk_update_vendors(items))), 200
+
+    @bp.route('/vendors/bulk', methods=['DELETE'])
+    async def bulk_delete_vendors():
+        try:
+            ids = parse_bulk_ids(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(await vendor_service.bulk_delete_vendors(ids))), 200
+
+    return bp
@@ -1,20 +1,51 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from typing import Optional, Dict, Any, List
-from .utils import format_response, format_error_response, convert_objectid # Import utility functions
+from pymongo import ASCENDING, DESCENDING
+from .utils import format_response, format_error_response, parse_expand, parse_fields, parse_lang, encode_cursor, decode_cursor, parse_bulk_items, parse_bulk_ids, validate_service_body, parse_export_params, parse_instant, parse_bounded_int, parse_page, parse_price_filters, parse_facets, ndjson_stream, response_validators, not_modified, EXPORT_PARAMS # Import utility functions
 import logging
+from src.application.service_graph import GRAPH_MAX_DEPTH, parse_relations
+
+# Query parameters of GET /services that are not field filters
+RESERVED_LIST_PARAMS = {'page', 'pageSize', 'sort_by', 'sort_order', 'expand', 'cursor', 'total', 'explain', 'fields', 'lang', 'facets'}
+# Facets GET /services?facets= can count (price counts effective_price ranges)
+SERVICE_FACETS = ('category', 'tags', 'vendor_id', 'price', 'is_on_sale')
+# Query parameters of GET /services/available that are not field filters
+AVAILABILITY_PARAMS = {'location', 'at', 'page', 'pageSize', 'fields', 'lang'}
 
 def create_catalog_controller(catalog_service):
     bp = Blueprint('catalog', __name__)
 
     @bp.route('/services', methods=['GET'])
     def list_services():
-        logging.info("Received request: LIST services with args: %s", dict(request.args))
         page = int(request.args.get('page', 1))
         page_size = int(request.args.get('pageSize', 20))
         skip = (page - 1) * page_size
         
         # Collect filters from request arguments, excluding pagination params
-        filters = {k: v for k, v in request.args.items() if k not in ['page', 'pageSize', 'sort_by', 'sort_order']}
+        filters = {k: v for k, v in request.args.items() if k not in RESERVED_LIST_PARAMS}
+        expand = parse_expand(request.args.get('expand'))
+        # Optional total count: "none" (default, no extra round trip), "exact" (count_documents) or "estimate" (collection metadata)
+        total_mode = request.args.get('total', 'none').lower()
+        if total_mode not in ('exact', 'estimate', 'none'):
+            return jsonify(format_error_response("total must be one of exact, estimate, none", "INVALID_PARAM", 400)), 400
+        # Sparse fieldsets: ?fields=name,base_price and/or ?lang=fr become a MongoDB projection
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+            facets = parse_facets(request.args.get('facets'), SERVICE_FACETS)
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        
+        # ?explain=true returns the MongoDB query plan instead of results (debug deployments only)
+        explain = request.args.get('explain', '').lower() == 'true'
+        if explain and not current_app.config.get('EXPLAIN_ENABLED'):
+            return jsonify(format_error_response("Query explain is disabled", "FORBIDDEN", 403)), 403
+
+        # Conditional GET: the ETag covers the query string and the latest write to the collection(s) behind it
+        validators = response_validators(request.full_path, catalog_service.catalog_version('vendor' in expand))
+        if not explain and not_modified(request.headers, validators):
+            return "", 304, validators
         
         # Handle specific filter types if needed (e.g., convert 'true'/'false' strings to bools)
         # Example: filters['is_on_sale'] = request.args.get('is_on_sale', type=lambda x: x.lower() == 'true')
@@ -22,38 +53,130 @@ def create_catalog_controller(catalog_service):
         # Handle sorting
         sort_by = request.args.get('sort_by')
         sort_order = request.args.get('sort_order', 'asc') # 'asc' or 'desc'
+        sort_direction = ASCENDING if sort_order.lower() == 'asc' else DESCENDING
         sort_param = None
         if sort_by:
-            from pymongo import ASCENDING, DESCENDING # Import here to avoid circular dependency if placed at top
-            sort_direction = ASCENDING if sort_order.lower() == 'asc' else DESCENDING
             sort_param = [(sort_by, sort_direction)]
 
-        services = catalog_service.list_services(filters, skip, page_size, sort_param)
-        
-        # Pagination metadata (you might fetch total count from repo for more accuracy)
-        total_services = len(services) # This would ideally come from a separate count query in repo
-        pagination_info = {
-            "page": page,
-            "pageSize": page_size,
-            "total_items": total_services,
-            "total_pages": (total_services + page_size - 1) // page_size
-        }
+        if 'cursor' in request.args:
+            # Keyset pagination: an empty cursor requests the first page, next_cursor continues from there
+            sort_field = sort_by or 'id'
+            after = None
+            if request.args['cursor']:
+                try:
+                    after = decode_cursor(request.args['cursor'], sort_field, sort_direction)
+                except ValueError as e:
+                    return jsonify(format_error_response(str(e), "INVALID_CURSOR", 400)), 400
+            if explain:
+                plan = catalog_service.explain_list_services(filters, limit=page_size, keyset=(sort_field, sort_direction, after))
+                return jsonify(format_response(plan)), 200
+            services, next_after = catalog_service.list_services_page(filters, page_size, sort_field, sort_direction, after, expand_vendor='vendor' in expand, fields=fields, lang=lang)
+            pagination_info = {
+                "pageSize": page_size,
+                "next_cursor": encode_cursor(sort_field, sort_direction, next_after) if next_after else None
+            }
+        else:
+            if explain:
+                plan = catalog_service.explain_list_services(filters, skip, page_size, sort_param)
+                return jsonify(format_response(plan)), 200
+            if facets:
+                # Page, facet counts and (unless total=none) the total from a single $facet aggregation
+                services, total_services, facet_counts = catalog_service.list_services_with_facets(filters, facets, skip, page_size, sort_param, expand_vendor='vendor' in expand, fields=fields, lang=lang, total=total_mode != 'none')
+            else:
+                services = catalog_service.list_services(filters, skip, page_size, sort_param, expand_vendor='vendor' in expand, fields=fields, lang=lang)
+            pagination_info = {
+                "page": page,
+                "pageSize": page_size
+            }
+
+        if facets and 'cursor' in request.args:
+            _, total_services, facet_counts = catalog_service.list_services_with_facets(filters, facets, limit=0, total=total_mode != 'none')
+        elif not facets:
+            total_services = catalog_service.count_services(filters, total_mode) if total_mode != 'none' else None
+        if total_services is not None:
+            pagination_info["total_items"] = total_services
+            pagination_info["total_pages"] = (total_services + page_size - 1) // page_size
         
-        return jsonify(format_response(services, pagination_info)), 200
+        body = format_response(services, pagination_info)
+        if facets:
+            body["facets"] = facet_counts
+        return jsonify(body), 200, validators
+
+    @bp.route('/services/export', methods=['GET'])
+    def export_services():
+        """Streams the catalog as NDJSON (optionally gzip) straight from a MongoDB cursor."""
+        try:
+            updated_since, batch_size, gzip = parse_export_params(request.args, request.headers.get('Accept-Encoding', ''))
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in EXPORT_PARAMS}
+        docs = catalog_service.export_services(filters, updated_since, batch_size)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if gzip else {"Vary": "Accept-Encoding"}
+        return Response(ndjson_stream(docs, gzip), mimetype="application/x-ndjson", headers=headers)
+
+    @bp.route('/services/available', methods=['GET'])
+    def available_services():
+        """Services bookable in ?location= at ?at= (ISO timestamp, default now)."""
+        location = request.args.get('location', '').strip()
+        if not location:
+            return jsonify(format_error_response("location is required", "INVALID_PARAM", 400)), 400
+        try:
+            at = parse_instant(request.args.get('at'))
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+            page, page_size = parse_page(request.args)
+            parse_price_filters(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in AVAILABILITY_PARAMS}
+        services = catalog_service.list_available_services(location, at, filters, (page - 1) * page_size, page_size, fields, lang)
+        return jsonify(format_response(services, {"page": page, "pageSize": page_size, "at": at.isoformat()})), 200
+
+    @bp.route('/services/<service_id>/graph', methods=['GET'])
+    def service_graph(service_id):
+        """Resolves the bundle around a service: ?depth= levels (default 2) of ?include= relations (default children)."""
+        expand = parse_expand(request.args.get('expand'))
+        try:
+            depth = parse_bounded_int(request.args.get('depth'), 'depth', 2, 0, GRAPH_MAX_DEPTH)
+            relations = parse_relations(request.args.get('include'))
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        graph = catalog_service.get_service_graph(service_id, depth, relations, 'vendor' in expand, fields, lang)
+        if graph is None:
+            return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+        return jsonify(format_response(graph)), 200
 
     @bp.route('/services/<service_id>', methods=['GET'])
     def service_details(service_id):
-        logging.info("Received request: GET service details for ID: %s", service_id)
-        service = catalog_service.get_service_details(service_id)
+        # Vendor details are embedded by default; pass ?expand= (empty) to skip the vendor lookup
+        expand = parse_expand(request.args.get('expand', 'vendor'))
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        stamps = catalog_service.service_version(service_id, expand_vendor='vendor' in expand)
+        if stamps is None:
+            return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        service = catalog_service.get_service_details(service_id, expand_vendor='vendor' in expand, fields=fields, lang=lang)
         if not service:
             return jsonify(format_error_response("Service not found", "NOT_FOUND", 404)), 404
         
-        return jsonify(format_response(service)), 200
+        return jsonify(format_response(service)), 200, validators
 
     @bp.route('/services', methods=['POST'])
     def create_service():
         data = request.json
-        logging.info("Received request: CREATE service with data: %s", data)
+        try:
+            validate_service_body(data)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
         # TODO: Add Pydantic validation here for 'data' against your Service DTO schema
         try:
             created = catalog_service.create_service(data)
@@ -66,7 +189,10 @@ def create_catalog_controller(catalog_service):
     @bp.route('/services/<service_id>', methods=['PUT'])
     def update_service(service_id):
         data = request.json
-        logging.info("Received request: UPDATE service %s with data: %s", service_id, data)
+        try:
+            validate_service_body(data)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
         # TODO: Add Pydantic validation here for 'data' against your Service Update DTO schema
         try:
             updated = catalog_service.update_service(service_id, data)
@@ -79,7 +205,6 @@ def create_catalog_controller(catalog_service):
 
     @bp.route('/services/<service_id>', methods=['DELETE'])
     def delete_service(service_id):
-        logging.info("Received request: DELETE service %s", service_id)
         try:
             catalog_service.delete_service(service_id)
             return jsonify({"message": "Service soft-deleted successfully"}), 200
@@ -87,4 +212,28 @@ def create_catalog_controller(catalog_service):
             logging.error("Error deleting service: %s", e)
             return jsonify(format_error_response(str(e), "DELETE_ERROR", 500)), 500
 
+    @bp.route('/services/bulk', methods=['POST'])
+    def bulk_create_services():
+        try:
+            items = parse_bulk_items(request.get_json(silent=True), validate=validate_service_body)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(catalog_service.bulk_create_services(items))), 200
+
+    @bp.route('/services/bulk', methods=['PATCH'])
+    def bulk_update_services():
+        try:
+            items = parse_bulk_items(request.get_json(silent=True), require_id=True, validate=validate_service_body)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(catalog_service.bulk_update_services(items))), 200
+
+    @bp.route('/services/bulk', methods=['DELETE'])
+    def bulk_delete_services():
+        try:
+            ids = parse_bulk_ids(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(catalog_service.bulk_delete_services(ids))), 200
+
     return bp
@@ -0,0 +1,26 @@
+from flask import Blueprint, request, jsonify
+from .utils import format_response, format_error_response, parse_bounded_int, encode_change_token, decode_change_token
+from src.application.change_feed_service import CHANGES_MAX_LIMIT, parse_change_types
+
+def create_change_controller(change_feed_service):
+    bp = Blueprint('changes', __name__)
+
+    @bp.route('/changes', methods=['GET'])
+    def list_changes():
+        """
+        Change feed for downstream sync: ?since= (the next_token of the previous response; omit to start from
+        the beginning), ?limit= (1-1000, default 100), ?types=services,vendors.
+        """
+        try:
+            position = decode_change_token(request.args['since']) if request.args.get('since') else {}
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_CURSOR", 400)), 400
+        try:
+            limit = parse_bounded_int(request.args.get('limit'), "limit", 100, 1, CHANGES_MAX_LIMIT)
+            types = parse_change_types(request.args.get('types'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        entries, position, has_more = change_feed_service.changes(position, types, limit)
+        return jsonify(format_response(entries, {"limit": limit, "next_token": encode_change_token(position), "has_more": has_more})), 200
+
+    return bp
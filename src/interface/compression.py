@@ -0,0 +1,100 @@
+import gzip
+import os
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is offered alone without it
+    brotli = None
+
+# Bodies smaller than this are sent as-is: the headers and CPU cost outweigh the saved bytes
+MIN_SIZE = int(os.getenv("CATALOG_COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("CATALOG_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("CATALOG_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    """Parses Accept-Encoding into {coding: q}."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported content coding for an Accept-Encoding header ("br" over "gzip" on ties), or None."""
+    accepted = _accepted(accept_encoding or "")
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _compressible(response, length: Optional[int]) -> bool:
+    return (response.status_code == 200
+            and "Content-Encoding" not in response.headers
+            and (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+            and length is not None and length >= MIN_SIZE)
+
+
+def _encode(response, body: bytes, encoding: Optional[str]) -> Optional[bytes]:
+    response.vary.add("Accept-Encoding")
+    if encoding is None:
+        return None
+    response.headers["Content-Encoding"] = encoding
+    return compress(body, encoding)
+
+
+def install_compression(app) -> None:
+    """
+    Compresses buffered JSON/text responses with the client's preferred coding (br when brotli is
+    installed, else gzip). Streamed responses (exports) and small bodies are left alone.
+    Register after the metrics hooks so response sizes are recorded compressed.
+    """
+    from flask import request
+
+    @app.after_request
+    def _compress(response):
+        if response.direct_passthrough or response.is_streamed or not _compressible(response, response.content_length):
+            return response
+        body = _encode(response, response.get_data(), choose_encoding(request.headers.get("Accept-Encoding")))
+        if body is not None:
+            response.set_data(body)
+        return response
+
+
+def install_async_compression(app) -> None:
+    """Quart counterpart of install_compression."""
+    from quart import request
+    from quart.wrappers.response import DataBody
+
+    @app.after_request
+    async def _compress(response):
+        if not isinstance(response.response, DataBody) or not _compressible(response, response.content_length):
+            return response
+        body = _encode(response, await response.get_data(), choose_encoding(request.headers.get("Accept-Encoding")))
+        if body is not None:
+            response.set_data(body)
+        return response
@@ -0,0 +1,64 @@
+import dataclasses
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional accelerated backend, the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Serializes the non-JSON types found in MongoDB documents and domain objects."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    Encodes obj to compact UTF-8 JSON in a single pass over the structure.
+    Uses orjson when installed (which also encodes datetimes and dataclasses natively).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class CatalogJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for Flask and Quart apps: jsonify() encodes documents straight to bytes with
+    dumps_bytes instead of pre-converting them, so ObjectIds, datetimes, Decimals and dataclass
+    value objects need no intermediate copy.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,48 @@
+from flask import Blueprint, Response, g, request
+from typing import List, Optional
+from src.infrastructure.logging_config import dropped_records
+from src.infrastructure.metrics import CONTENT_TYPE, HttpMetrics, render, render_cache_stats, render_pool_stats
+
+def install_http_metrics(app, http_metrics: Optional[HttpMetrics] = None) -> HttpMetrics:
+    """Registers the request hooks feeding the per-route latency, size and in-flight metrics."""
+    http_metrics = http_metrics or HttpMetrics()
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_route = request.url_rule.rule if request.url_rule else None
+        g.metrics_started = http_metrics.start(request.method, g.metrics_route)
+
+    @app.after_request
+    def _metrics_finish(response):
+        if 'metrics_started' in g:
+            http_metrics.finish(request.method, g.metrics_route, response.status_code, response.content_length, g.metrics_started)
+        return response
+
+    @app.teardown_request
+    def _metrics_done(exc):
+        if 'metrics_started' in g:
+            http_metrics.done(request.method, g.metrics_route)
+
+    return http_metrics
+
+def render_metrics(http_metrics: HttpMetrics, connection_manager, caches: List) -> str:
+    return render(
+        http_metrics.render,
+        connection_manager.command_stats.render,
+        lambda: render_pool_stats(connection_manager.get_pool_stats()),
+        lambda: render_cache_stats(caches),
+        lambda: ["# HELP catalog_log_records_dropped_total Log records dropped because the log queue was full.",
+                 "# TYPE catalog_log_records_dropped_total counter",
+                 f"catalog_log_records_dropped_total {dropped_records()}"],
+    )
+
+def create_metrics_controller(http_metrics: HttpMetrics, connection_manager, caches: Optional[List] = None):
+    bp = Blueprint('metrics', __name__)
+    caches = [c for c in (caches or []) if c is not None]
+
+    @bp.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint: HTTP, MongoDB command, pool, cache and logging metrics."""
+        return Response(render_metrics(http_metrics, connection_manager, caches), content_type=CONTENT_TYPE)
+
+    return bp
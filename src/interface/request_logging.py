@@ -0,0 +1,109 @@
+import logging
+import os
+import random
+import time
+from typing import Dict, Optional
+
+from src.infrastructure.logging_config import redact
+
+access_logger = logging.getLogger("catalog.access")
+
+# Responses at or above this status, or slower than this, are logged whatever the sampling rate
+ALWAYS_LOG_STATUS = 500
+SLOW_REQUEST_MS = float(os.getenv("CATALOG_LOG_SLOW_MS", "1000"))
+
+
+def parse_sample_rates(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parses "GET /services=0.01,GET /services/<service_id>=0.1" into {route key: rate}.
+    Route keys are "<METHOD> <url rule>"; malformed entries are ignored with a warning.
+    """
+    rates: Dict[str, float] = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        key, sep, value = entry.rpartition("=")
+        try:
+            rate = float(value)
+        except ValueError:
+            rate = -1.0
+        if not sep or not key.strip() or not 0.0 <= rate <= 1.0:
+            logging.warning("Ignoring invalid log sample rate: %s", entry.strip())
+            continue
+        rates[" ".join(key.split())] = rate
+    return rates
+
+
+class RequestLogger:
+    """
+    Emits one structured access-log line per request: method, route, status, duration and the
+    (redacted, truncated) query arguments. Request bodies are never logged.
+    Successful fast requests are sampled per route (CATALOG_LOG_SAMPLE_RATES, default CATALOG_LOG_SAMPLE_RATE).
+    """
+
+    def __init__(self, default_rate: Optional[float] = None, rates: Optional[Dict[str, float]] = None,
+                 slow_ms: Optional[float] = None):
+        self.default_rate = default_rate if default_rate is not None else float(os.getenv("CATALOG_LOG_SAMPLE_RATE", "1.0"))
+        self.rates = rates if rates is not None else parse_sample_rates(os.getenv("CATALOG_LOG_SAMPLE_RATES"))
+        self.slow_ms = slow_ms if slow_ms is not None else SLOW_REQUEST_MS
+
+    def should_log(self, route_key: str, status: int, duration_ms: float) -> bool:
+        if status >= ALWAYS_LOG_STATUS or duration_ms >= self.slow_ms:
+            return True
+        rate = self.rates.get(route_key, self.default_rate)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def log(self, method: str, rule: Optional[str], path: str, status: int, started: float, args) -> None:
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        route = rule or "<unmatched>"
+        if not self.should_log(f"{method} {route}", status, duration_ms):
+            return
+        access_logger.info(
+            "%s %s %d %.1fms", method, path, status, duration_ms,
+            extra={"http": {"method": method, "route": route, "path": redact(path), "status": status,
+                            "duration_ms": round(duration_ms, 2), "query": redact(args.to_dict(flat=True))}},
+        )
+
+
+def install_request_logging(app, request_logger: Optional[RequestLogger] = None) -> RequestLogger:
+    """Registers the access log on a Flask app."""
+    from flask import g, request
+
+    request_logger = request_logger or RequestLogger()
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            rule = request.url_rule.rule if request.url_rule else None
+            request_logger.log(request.method, rule, request.path, response.status_code, started, request.args)
+        return response
+
+    return request_logger
+
+
+def install_async_request_logging(app, request_logger: Optional[RequestLogger] = None) -> RequestLogger:
+    """Registers the access log on a Quart app (async hooks, so nothing is pushed to the thread pool)."""
+    from quart import g, request
+
+    request_logger = request_logger or RequestLogger()
+
+    @app.before_request
+    async def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    async def _log_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            rule = request.url_rule.rule if request.url_rule else None
+            request_logger.log(request.method, rule, request.path, response.status_code, started, request.args)
+        return response
+
+    return request_logger
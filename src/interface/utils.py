@@ -1,29 +1,322 @@
-from bson.objectid import ObjectId
-from typing import Any, Dict, List, Union,Optional
-
-def convert_objectid(data: Union[Dict, List, Any]) -> Union[Dict, List, Any]:
-    """
-    Recursively converts ObjectId fields within a dictionary or list of dictionaries
-    to their string representation for JSON serialization.
-    Handles lists of dictionaries and nested dictionaries.
-    """
-    if isinstance(data, list):
-        return [convert_objectid(item) for item in data]
-    elif isinstance(data, dict):
-        return {
-            k: str(v) if isinstance(v, ObjectId) else convert_objectid(v)
-            for k, v in data.items()
-        }
-    else:
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple, Union,Optional
+from src.domain.service.availability import validate_availability_rules
+from src.domain.service.pricing import validate_pricing_rules
+from .json_provider import dumps_bytes
+
+def parse_expand(value: Optional[str]) -> set:
+    """
+    Parses a comma-separated ?expand= parameter (e.g. "vendor") into a set of relation names.
+    """
+    if not value:
+        return set()
+    return {part.strip().lower() for part in value.split(",") if part.strip()}
+
+_FIELD_PATH_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+_LANG_RE = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$")
+MAX_FIELDS = 50
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parses a comma-separated ?fields= parameter (e.g. "name,base_price,images.url") into field paths.
+    Returns None when absent; raises ValueError on malformed paths.
+    """
+    if value is None:
+        return None
+    fields = [part.strip() for part in value.split(",") if part.strip()]
+    if not fields:
+        raise ValueError("fields must list at least one field")
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"fields accepts at most {MAX_FIELDS} fields")
+    for field in fields:
+        if not _FIELD_PATH_RE.match(field):
+            raise ValueError(f"Invalid field: {field}")
+    return fields
+
+def parse_lang(value: Optional[str]) -> Optional[str]:
+    """Validates a ?lang= locale code (e.g. "en", "fr", "pt-BR"); returns None when absent."""
+    if not value:
+        return None
+    if not _LANG_RE.match(value):
+        raise ValueError(f"Invalid lang: {value}")
+    return value
+
+def encode_cursor(sort_field: str, direction: int, after: tuple) -> str:
+    """
+    Encodes a keyset position (sort value, id) into an opaque URL-safe cursor token.
+    The sort field and direction are embedded so a cursor cannot be replayed against another ordering.
+    """
+    payload = json.dumps({"f": sort_field, "d": direction, "v": after[0], "id": after[1]}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, sort_field: str, direction: int) -> tuple:
+    """
+    Decodes a cursor produced by encode_cursor back into its (sort value, id) position.
+    Raises ValueError if the token is malformed or was issued for a different ordering.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = (payload["v"], payload["id"])
+        issued_for = (payload["f"], payload["d"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if issued_for != (sort_field, direction):
+        raise ValueError("Cursor was issued for a different sort order")
+    return position
+
+def encode_change_token(position: Dict[str, tuple]) -> str:
+    """Encodes change feed positions ({type: (updated_at, id)}) into an opaque URL-safe token."""
+    payload = json.dumps({kind: list(after) for kind, after in position.items()}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_change_token(token: str) -> Dict[str, tuple]:
+    """Decodes a token produced by encode_change_token. Raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = {kind: (after[0], after[1]) for kind, after in payload.items()}
+    except (ValueError, AttributeError, IndexError, TypeError) as e:
+        raise ValueError("Malformed change token") from e
+    if not all(isinstance(v, str) for after in position.values() for v in after):
+        raise ValueError("Malformed change token")
+    return position
+
+# Maximum number of items accepted by one bulk request
+BULK_MAX_ITEMS = int(os.getenv("CATALOG_BULK_MAX_ITEMS", "5000"))
+# Bounds of ?page= and ?pageSize= on the search and availability endpoints
+MAX_PAGE = 10000
+MAX_PAGE_SIZE = 100
+
+def validate_service_body(data: Any) -> Dict[str, Any]:
+    """
+    Validates a service create/update body before anything is written: a JSON object whose rule windows parse,
+    so that derived fields can be computed. Raises ValueError describing the first problem found.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    validate_pricing_rules(data.get("pricing_rules"))
+    validate_availability_rules(data.get("availability_rules"))
+    return data
+
+def parse_bulk_items(data: Any, require_id: bool = False, validate: Optional[Callable[[Any], Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Validates a bulk request body: a JSON array of objects (or {"items": [...]}), each also checked by
+    `validate` when given. Raises ValueError describing the first problem found.
+    """
+    if isinstance(data, dict) and "items" in data:
+        data = data["items"]
+    if not isinstance(data, list) or not data:
+        raise ValueError("Request body must be a non-empty JSON array")
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_MAX_ITEMS} items are accepted per bulk request")
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {i} is not an object")
+        if require_id and not item.get("id"):
+            raise ValueError(f"Item {i} has no id")
+        if validate is not None:
+            try:
+                validate(item)
+            except ValueError as e:
+                raise ValueError(f"Item {i}: {e}") from None
+    return data
+
+def parse_bulk_ids(data: Any) -> List[str]:
+    """
+    Validates a bulk delete body: a JSON array of ids, of {"id": ...} objects, or {"ids": [...]}.
+    Raises ValueError describing the first problem found.
+    """
+    if isinstance(data, dict) and "ids" in data:
+        data = data["ids"]
+    if not isinstance(data, list) or not data:
+        raise ValueError("Request body must be a non-empty JSON array of ids")
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_MAX_ITEMS} ids are accepted per bulk request")
+    ids = [item.get("id") if isinstance(item, dict) else item for item in data]
+    for i, item_id in enumerate(ids):
+        if not isinstance(item_id, str) or not item_id:
+            raise ValueError(f"Item {i} is not a valid id")
+    return ids
+
+def parse_timestamp(value: str) -> str:
+    """
+    Normalizes an ISO 8601 timestamp to the UTC isoformat() used for stored created_at/updated_at
+    values, so it can be compared against them. Naive timestamps are taken as UTC.
+    Raises ValueError for unparseable input.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+def parse_instant(value: Optional[str]) -> datetime:
+    """Parses an optional ISO 8601 timestamp (naive = UTC) into an aware datetime; None means now."""
+    if not value:
+        return datetime.now(timezone.utc)
+    return datetime.fromisoformat(parse_timestamp(value))
+
+def parse_facets(value: Optional[str], allowed: Iterable[str]) -> List[str]:
+    """Parses ?facets=category,price into the requested facet names. Raises ValueError for unknown facets."""
+    if not value:
+        return []
+    facets = list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+    allowed = tuple(allowed)
+    unknown = [f for f in facets if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)} (available: {', '.join(allowed)})")
+    return facets
+
+def parse_bounded_int(value: Optional[str], name: str, default: int, minimum: int, maximum: int) -> int:
+    """Parses an optional integer query parameter within [minimum, maximum]. Raises ValueError otherwise."""
+    if value is None or value == "":
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not minimum <= parsed <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return parsed
+
+def parse_page(args: Mapping[str, str]) -> Tuple[int, int]:
+    """Parses ?page= (default 1) and ?pageSize= (default 20) within MAX_PAGE / MAX_PAGE_SIZE. Raises ValueError otherwise."""
+    return (parse_bounded_int(args.get('page'), 'page', 1, 1, MAX_PAGE),
+            parse_bounded_int(args.get('pageSize'), 'pageSize', 20, 1, MAX_PAGE_SIZE))
+
+def parse_price_filters(args: Mapping[str, str]) -> None:
+    """Checks that ?min_price= / ?max_price=, when given, are finite numbers. Raises ValueError otherwise."""
+    for name in ('min_price', 'max_price'):
+        if name in args:
+            try:
+                value = float(args[name])
+            except ValueError:
+                value = None
+            if value is None or not math.isfinite(value):
+                raise ValueError(f"{name} must be a number")
+
+# Query parameters of the export endpoints that are not field filters
+EXPORT_PARAMS = {'updated_since', 'batch_size', 'compression'}
+
+def parse_export_params(args: Dict[str, str], accept_encoding: str = "") -> Tuple[Optional[str], int, bool]:
+    """
+    Reads updated_since, batch_size (1-10000, default 1000) and compression ("gzip" or "none";
+    by default gzip when the client accepts it) from export query parameters.
+    Returns (updated_since, batch_size, gzip). Raises ValueError for invalid values.
+    """
+    updated_since = parse_timestamp(args['updated_since']) if args.get('updated_since') else None
+    batch_size = min(max(int(args.get('batch_size', 1000)), 1), 10000)
+    compression = args.get('compression', 'gzip' if 'gzip' in accept_encoding.lower() else 'none').lower()
+    if compression not in ('gzip', 'none'):
+        raise ValueError("compression must be gzip or none")
+    return updated_since, batch_size, compression == 'gzip'
+
+class _NdjsonBuffer:
+    """Accumulates NDJSON lines (optionally gzip-compressed) and releases them in chunks of about chunk_bytes."""
+
+    def __init__(self, gzip: bool, chunk_bytes: int):
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self.chunk_bytes = chunk_bytes
+        self.buffer: List[bytes] = []
+        self.size = 0
+
+    def add(self, doc: Dict[str, Any]) -> bytes:
+        line = dumps_bytes(doc) + b"\n"
+        self.buffer.append(line)
+        self.size += len(line)
+        if self.size < self.chunk_bytes:
+            return b""
+        data = b"".join(self.buffer)
+        self.buffer, self.size = [], 0
+        return self.compressor.compress(data) if self.compressor else data
+
+    def finish(self) -> bytes:
+        data = b"".join(self.buffer)
+        if self.compressor:
+            data = self.compressor.compress(data) + self.compressor.flush()
         return data
 
+def ndjson_stream(docs: Iterable[Dict[str, Any]], gzip: bool = False, chunk_bytes: int = 65536) -> Iterator[bytes]:
+    """
+    Encodes documents as newline-delimited JSON, yielding chunks of about chunk_bytes
+    (optionally gzip-compressed) so memory stays flat regardless of how many documents there are.
+    """
+    out = _NdjsonBuffer(gzip, chunk_bytes)
+    try:
+        for doc in docs:
+            data = out.add(doc)
+            if data:
+                yield data
+    except Exception as e:
+        # Headers are already sent, so the only option is to end the stream early
+        logging.error("Export stream aborted: %s", e)
+    data = out.finish()
+    if data:
+        yield data
+
+async def ndjson_stream_async(docs: AsyncIterable[Dict[str, Any]], gzip: bool = False, chunk_bytes: int = 65536) -> AsyncIterator[bytes]:
+    """asyncio counterpart of ndjson_stream for async document iterators."""
+    out = _NdjsonBuffer(gzip, chunk_bytes)
+    try:
+        async for doc in docs:
+            data = out.add(doc)
+            if data:
+                yield data
+    except Exception as e:
+        logging.error("Export stream aborted: %s", e)
+    data = out.finish()
+    if data:
+        yield data
+
+def response_validators(key: str, stamps: Iterable[Any]) -> Dict[str, str]:
+    """
+    ETag and Last-Modified headers of a response that depends on `key` (the request path and query string)
+    and on the updated_at `stamps` of the documents behind it. The ETag is weak, so it holds for every
+    Content-Encoding of the body.
+    """
+    stamps = [str(s) if s else "" for s in stamps]
+    digest = hashlib.sha1("|".join([key, *stamps]).encode()).hexdigest()[:20]
+    headers = {"ETag": f'W/"{digest}"'}
+    latest = max((s for s in stamps if s), default=None)
+    if latest:
+        try:
+            headers["Last-Modified"] = format_datetime(datetime.fromisoformat(parse_timestamp(latest)), usegmt=True)
+        except ValueError:
+            pass
+    return headers
+
+def not_modified(request_headers: Mapping[str, str], validators: Dict[str, str]) -> bool:
+    """
+    True when the request's If-None-Match (weak comparison) or, without it, If-Modified-Since
+    shows the client already holds the representation described by `validators`.
+    """
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"].removeprefix("W/") in tags
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if if_modified_since and "Last-Modified" in validators:
+        try:
+            return parsedate_to_datetime(validators["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
 def format_response(data: Any, pagination: Optional[Dict[str, Any]] = None) -> Dict:
     """
     Standardizes the API response format.
-    Ensures ObjectIds are converted to strings.
+    ObjectIds, datetimes and the like are serialized by the app's JSON provider (see json_provider.py).
     """
-    formatted_data = convert_objectid(data)
-    response = {"data": formatted_data}
+    response = {"data": data}
     if pagination:
         response["pagination"] = pagination
     return response
@@ -1,6 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from typing import Optional, Dict, Any, List
-from .utils import format_response, format_error_response # Import utility functions
+from .utils import format_response, format_error_response, parse_expand, parse_fields, parse_lang, parse_bulk_items, parse_bulk_ids, parse_export_params, ndjson_stream, response_validators, not_modified, EXPORT_PARAMS # Import utility functions
 
 def create_vendor_controller(vendor_service):
     bp = Blueprint('vendor', __name__)
@@ -8,16 +8,68 @@ def create_vendor_controller(vendor_service):
     @bp.route('/vendors', methods=['GET'])
     def list_vendors():
         # Filters from request arguments
-        filters = {k: v for k, v in request.args.items()}
-        vendors = vendor_service.list_vendors(filters)
-        return jsonify(format_response(vendors)), 200
+        filters = {k: v for k, v in request.args.items() if k not in ('explain', 'expand', 'fields', 'lang')}
+        if request.args.get('explain', '').lower() == 'true':
+            # Debug deployments only: return the MongoDB query plan instead of results
+            if not current_app.config.get('EXPLAIN_ENABLED'):
+                return jsonify(format_error_response("Query explain is disabled", "FORBIDDEN", 403)), 403
+            return jsonify(format_response(vendor_service.explain_list_vendors(filters))), 200
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        # ?expand=summary attaches each vendor's service statistics (see /vendors/<id>/summary)
+        with_summary = 'summary' in parse_expand(request.args.get('expand'))
+        validators = response_validators(request.full_path, vendor_service.vendors_version(with_summary))
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        vendors = vendor_service.list_vendors(filters, fields, lang, with_summary)
+        return jsonify(format_response(vendors)), 200, validators
+
+    @bp.route('/vendors/export', methods=['GET'])
+    def export_vendors():
+        """Streams all vendors as NDJSON (optionally gzip) straight from a MongoDB cursor."""
+        try:
+            updated_since, batch_size, gzip = parse_export_params(request.args, request.headers.get('Accept-Encoding', ''))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        filters = {k: v for k, v in request.args.items() if k not in EXPORT_PARAMS}
+        docs = vendor_service.export_vendors(filters, updated_since, batch_size)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if gzip else {"Vary": "Accept-Encoding"}
+        return Response(ndjson_stream(docs, gzip), mimetype="application/x-ndjson", headers=headers)
 
     @bp.route('/vendors/<vendor_id>', methods=['GET'])
     def vendor_details(vendor_id):
-        vendor = vendor_service.get_vendor_details(vendor_id)
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            lang = parse_lang(request.args.get('lang'))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_PARAM", 400)), 400
+        stamps = vendor_service.vendor_version(vendor_id)
+        if stamps is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        vendor = vendor_service.get_vendor_details(vendor_id, fields, lang)
         if not vendor:
             return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
-        return jsonify(format_response(vendor)), 200
+        return jsonify(format_response(vendor)), 200, validators
+
+    @bp.route('/vendors/<vendor_id>/summary', methods=['GET'])
+    def vendor_summary(vendor_id):
+        """The vendor's rating with its active service count, category mix, base price range and on-sale count."""
+        stamps = vendor_service.vendor_summary_version(vendor_id)
+        if stamps is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        validators = response_validators(request.full_path, stamps)
+        if not_modified(request.headers, validators):
+            return "", 304, validators
+        summary = vendor_service.get_vendor_summary(vendor_id)
+        if summary is None:
+            return jsonify(format_error_response("Vendor not found", "NOT_FOUND", 404)), 404
+        return jsonify(format_response(summary)), 200, validators
 
     @bp.route('/vendors', methods=['POST'])
     def create_vendor():
@@ -49,4 +101,28 @@ def create_vendor_controller(vendor_service):
         except Exception as e:
             return jsonify(format_error_response(str(e), "DELETE_ERROR", 500)), 500
 
+    @bp.route('/vendors/bulk', methods=['POST'])
+    def bulk_create_vendors():
+        try:
+            items = parse_bulk_items(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(vendor_service.bulk_create_vendors(items))), 200
+
+    @bp.route('/vendors/bulk', methods=['PATCH'])
+    def bulk_update_vendors():
+        try:
+            items = parse_bulk_items(request.get_json(silent=True), require_id=True)
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(vendor_service.bulk_update_vendors(items))), 200
+
+    @bp.route('/vendors/bulk', methods=['DELETE'])
+    def bulk_delete_vendors():
+        try:
+            ids = parse_bulk_ids(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(str(e), "INVALID_BODY", 400)), 400
+        return jsonify(format_response(vendor_service.bulk_delete_vendors(ids))), 200
+
     return bp
@@ -1,15 +1,19 @@
 import sys
 import os
+import gzip
+import json
 import pytest
 
 # Ensure the project root is in sys.path so 'main' can be imported
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from main import app
+from main import create_app
+
+# One app (and in-memory catalog) for the whole module: tests build on each other's data
+app = create_app({"TESTING": True, "STORAGE_BACKEND": "memory", "CHANGES_SETTLE_SECONDS": 0})
 
 @pytest.fixture
 def client():
-    app.config['TESTING'] = True
     with app.test_client() as client:
         yield client
 
@@ -123,3 +127,680 @@ def test_search_services(client):
     assert response.status_code == 200
     assert "data" in response.get_json()
     assert isinstance(response.get_json()["data"], list)
+
+def test_search_rejects_invalid_paging(client):
+    assert client.get('/services/search?q=hall&pageSize=0').status_code == 400
+    assert client.get('/services/search?q=hall&page=x').status_code == 400
+    assert client.get('/services/search?q=hall&pageSize=1000').status_code == 400
+
+def test_search_services_tolerates_typos(client):
+    created = client.post('/services', json={
+        "name": {"en": "Riverside Banquet Hall"},
+        "description": {"en": "A banquet hall by the river"},
+        "category": "venue",
+        "vendor_id": "vendor1",
+        "tags": ["wedding"]
+    }).get_json()["data"]
+    response = client.get('/services/search?q=banqet&lang=en&pageSize=50')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert "pagination" in body
+    assert created["id"] in [s["id"] for s in body["data"]]
+
+def test_list_services_expand_vendor(client):
+    vendor = client.post('/vendors', json={
+        "name": "Expand Vendor",
+        "contact": {"email": "expand@vendor.com"},
+        "rating": {"average": 4.5, "count": 2}
+    }).get_json()["data"]
+    client.post('/services', json={
+        "name": {"en": "Expandable Hall"},
+        "description": {"en": "A hall with a vendor"},
+        "category": "venue",
+        "vendor_id": vendor["id"]
+    })
+    response = client.get(f'/services?vendor_id={vendor["id"]}&expand=vendor')
+    assert response.status_code == 200
+    services = response.get_json()["data"]
+    assert services
+    assert all(s["vendorDetails"]["id"] == vendor["id"] for s in services)
+
+def test_list_services_cursor_pagination(client):
+    for i in range(3):
+        client.post('/services', json={
+            "name": {"en": f"Cursor Hall {i}"},
+            "description": {"en": "Paged hall"},
+            "category": "cursor-test",
+            "vendor_id": "vendor1"
+        })
+    seen = []
+    cursor = ''
+    while True:
+        response = client.get(f'/services?category=cursor-test&pageSize=2&total=exact&cursor={cursor}')
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(s["id"] for s in body["data"])
+        cursor = body["pagination"]["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == body["pagination"]["total_items"]
+    # Without ?total= no count is run
+    assert "total_items" not in client.get('/services?category=cursor-test&pageSize=2').get_json()["pagination"]
+
+def test_list_services_rejects_invalid_cursor(client):
+    response = client.get('/services?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def test_list_services_explain_disabled_by_default(client):
+    response = client.get('/services?explain=true')
+    assert response.status_code == 403
+
+def test_service_details_cache_invalidated_on_update(client):
+    sid = client.post('/services', json={
+        "name": {"en": "Cached Hall"},
+        "description": {"en": "A hall read twice"},
+        "category": "venue",
+        "vendor_id": "vendor1"
+    }).get_json()["data"]["id"]
+    assert client.get(f'/services/{sid}').get_json()["data"]["name"]["en"] == "Cached Hall"
+    client.put(f'/services/{sid}', json={"name": {"en": "Renamed Hall"}})
+    assert client.get(f'/services/{sid}').get_json()["data"]["name"]["en"] == "Renamed Hall"
+    client.delete(f'/services/{sid}')
+    assert client.get(f'/services/{sid}').status_code == 404
+
+def test_bulk_create_update_delete_services(client):
+    items = [{
+        "name": {"en": f"Bulk Hall {i}"},
+        "description": {"en": "Imported hall"},
+        "category": "venue",
+        "vendor_id": "vendor1"
+    } for i in range(5)]
+    created = client.post('/services/bulk', json=items).get_json()["data"]
+    assert [r["status"] for r in created] == ["created"] * 5
+    ids = [r["id"] for r in created]
+
+    updated = client.patch('/services/bulk', json=[{"id": sid, "category": "bulk-updated"} for sid in ids] + [{"id": "missing-id", "category": "x"}]).get_json()["data"]
+    assert [r["status"] for r in updated] == ["updated"] * 5 + ["not_found"]
+
+    deleted = client.delete('/services/bulk', json=ids).get_json()["data"]
+    assert [r["status"] for r in deleted] == ["deleted"] * 5
+
+def test_bulk_rejects_invalid_body(client):
+    response = client.post('/services/bulk', json={"not": "a list"})
+    assert response.status_code == 400
+
+def test_export_services_ndjson(client):
+    client.post('/services', json={
+        "name": {"en": "Exported Hall"},
+        "description": {"en": "Streamed hall"},
+        "category": "export-test",
+        "vendor_id": "vendor1"
+    })
+    response = client.get('/services/export?category=export-test&compression=none')
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert lines and all(doc["category"] == "export-test" for doc in lines)
+    assert all("_id" not in doc for doc in lines)
+
+def test_asgi_app_exposes_same_routes():
+    from src.interface.asgi_app import create_asgi_app
+    asgi_app = create_asgi_app({"STORAGE_BACKEND": "memory"})
+    def routes(application):
+        return {(rule.rule, method) for rule in application.url_map.iter_rules()
+                for method in rule.methods if method not in ('HEAD', 'OPTIONS') and rule.endpoint != 'static'}
+    assert routes(asgi_app) == routes(app)
+
+def test_asgi_app_applies_indexes_when_asked(monkeypatch):
+    import asyncio
+    from src.infrastructure.storage import MemoryBackend
+    from src.interface import asgi_app as asgi_module
+
+    class SharedBackend(MemoryBackend):
+        name = "shared"  # any backend other than memory, whose indexes come from the registry regardless
+    applied = []
+    monkeypatch.setattr(asgi_module, "apply_indexes", applied.append)
+
+    async def serve(ensure_indexes):
+        application = asgi_module.create_asgi_app({"STORAGE_BACKEND": SharedBackend(), "ENSURE_INDEXES": ensure_indexes, "SEARCH_SYNC_SECONDS": 0})
+        await application.startup()
+        await application.shutdown()
+    asyncio.run(serve(False))
+    assert applied == []
+    asyncio.run(serve(True))
+    assert len(applied) == 1
+
+def test_responses_omit_mongo_id(client):
+    created = client.post('/services', json={"name": {"en": "No Id Hall"}, "category": "venue", "vendor_id": "vendor1"}).get_json()["data"]
+    assert "_id" not in created
+    services = client.get('/services?pageSize=5').get_json()["data"]
+    assert services and all("_id" not in s for s in services)
+    assert "_id" not in client.get(f'/services/{created["id"]}').get_json()["data"]
+
+def test_list_services_sparse_fields_and_lang(client):
+    client.post('/services', json={
+        "name": {"en": "Sparse Hall", "fr": "Salle Sparse"},
+        "description": {"en": "Long text", "fr": "Texte long"},
+        "category": "sparse-test",
+        "base_price": 10,
+        "images": [{"url": "http://example.com/a.jpg", "type": "image"}]
+    })
+    data = client.get('/services?category=sparse-test&fields=name,base_price&lang=fr').get_json()["data"]
+    assert data
+    for service in data:
+        assert set(service) <= {"id", "name", "base_price"}
+        assert set(service["name"]) <= {"fr"}
+    service_id = data[0]["id"]
+    detail = client.get(f'/services/{service_id}?fields=name&lang=fr&expand=').get_json()["data"]
+    assert detail == {"id": service_id, "name": {"fr": "Salle Sparse"}}
+
+def test_list_services_rejects_invalid_fields(client):
+    assert client.get('/services?fields=$where').status_code == 400
+    assert client.get('/services?lang=not a locale').status_code == 400
+
+def test_service_codec_round_trip():
+    from src.domain.service.codec import decode_service, encode_service
+    doc = {
+        "_id": "ignored", "id": "svc-1", "name": {"en": "Hall"}, "description": {"en": "Big"}, "category": "venue",
+        "pricing_tiers": [{"min_quantity": 1, "price": 100, "currency": "INR"}],
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-02T00:00:00+00:00",
+    }
+    service = decode_service(doc)
+    assert not hasattr(service, "__dict__")
+    assert service.pricing_tiers[0].price == 100
+    assert "_id" in doc and doc["pricing_tiers"][0] == {"min_quantity": 1, "price": 100, "currency": "INR"}
+    encoded = encode_service(service)
+    assert encoded["pricing_tiers"] == doc["pricing_tiers"]
+    assert encoded["created_at"] == doc["created_at"]
+    assert decode_service(encoded) == service
+
+def test_log_redaction_bounds_payloads():
+    from src.infrastructure.logging_config import redact, MAX_ITEMS, MAX_STRING
+    payload = {"name": "x" * 10000, "password": "hunter2", "tags": list(range(1000)), "nested": {"a": {"b": {"c": {}}}}}
+    safe = redact(payload)
+    assert safe["password"] == "[REDACTED]"
+    assert len(safe["name"]) < MAX_STRING + 32
+    assert len(safe["tags"]) == MAX_ITEMS + 1
+    assert isinstance(safe["nested"]["a"]["b"], str)
+
+def test_request_log_sampling():
+    from src.interface.request_logging import RequestLogger, parse_sample_rates
+    rates = parse_sample_rates("GET /services=0, GET /services/<service_id>=1, bogus")
+    assert rates == {"GET /services": 0.0, "GET /services/<service_id>": 1.0}
+    request_logger = RequestLogger(default_rate=1.0, rates=rates, slow_ms=1000)
+    assert not request_logger.should_log("GET /services", 200, 5)
+    assert request_logger.should_log("GET /services", 500, 5)
+    assert request_logger.should_log("GET /services", 200, 2000)
+    assert request_logger.should_log("GET /vendors", 200, 5)
+
+def test_benchmark_catalog_matches_domain_model():
+    from benchmarks.catalog_data import generate_services, generate_vendors
+    from src.domain.service.codec import decode_service, decode_vendor
+    vendors = generate_vendors(3, seed=7)
+    services = list(generate_services(5, [v["id"] for v in vendors], seed=7))
+    assert services == list(generate_services(5, [v["id"] for v in vendors], seed=7))
+    assert all(decode_vendor(v).contact.email for v in vendors)
+    assert all(decode_service(s).pricing_tiers for s in services)
+
+def test_admin_endpoints_disabled_by_default(client):
+    assert client.get('/admin/pool-stats').status_code == 403
+    assert client.get('/admin/cache-stats').status_code == 403
+    admin_client = create_app({"STORAGE_BACKEND": "memory", "ADMIN_ENABLED": True}).test_client()
+    assert admin_client.get('/admin/pool-stats').status_code == 200
+    assert admin_client.get('/admin/cache-stats').status_code == 200
+
+def test_metrics_endpoint(client):
+    client.get('/services?pageSize=1')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.get_data(as_text=True)
+    assert 'catalog_http_request_duration_seconds_count{method="GET",route="/services",status="200"}' in body
+    assert 'catalog_http_requests_in_flight{method="GET",route="/metrics"} 1' in body
+
+def test_mongo_command_metrics():
+    from types import SimpleNamespace
+    from src.infrastructure.metrics import CommandStatsListener
+    listener = CommandStatsListener()
+    listener.started(SimpleNamespace(command={"find": "services"}, command_name="find", connection_id=("h", 1), request_id=7))
+    listener.succeeded(SimpleNamespace(command_name="find", connection_id=("h", 1), request_id=7, duration_micros=1500))
+    body = "\n".join(listener.render())
+    assert 'catalog_mongo_command_duration_seconds_bucket{collection="services",command="find",le="0.0025"} 1' in body
+    assert 'catalog_mongo_command_duration_seconds_count{collection="services",command="find"} 1' in body
+
+def test_compute_prices_windows_and_tiers():
+    from datetime import datetime, UTC
+    from src.domain.service.pricing import compute_prices
+    now = datetime(2025, 6, 1, tzinfo=UTC)
+    service = {
+        "base_price": 100.0, "is_on_sale": True, "sale_price": 90.0,
+        "pricing_tiers": [{"min_quantity": 10, "price": 70, "currency": "INR"}],
+        "pricing_rules": [
+            {"rule_type": "summer", "price": 80.0, "valid_from": "2025-05-01T00:00:00+00:00", "valid_to": "2025-07-01T00:00:00+00:00"},
+            {"rule_type": "autumn", "price": 60.0, "valid_from": "2025-09-01T00:00:00+00:00"},
+        ],
+    }
+    prices = compute_prices(service, now)
+    assert prices == {"effective_price": 80.0, "min_tier_price": 70.0, "price_refresh_at": "2025-07-01T00:00:00+00:00"}
+    assert compute_prices(service, datetime(2025, 9, 2, tzinfo=UTC))["effective_price"] == 60.0
+
+def test_price_filter_uses_effective_price(client):
+    created = client.post('/services', json={
+        "name": {"en": "Sale Hall"}, "description": {"en": "On sale"}, "category": "venue_sale",
+        "vendor_id": "vendor1", "base_price": 5000, "is_on_sale": True, "sale_price": 1200, "effective_price": 1,
+    }).get_json()["data"]
+    assert created["effective_price"] == 1200.0
+    ids = [s["id"] for s in client.get('/services?category=venue_sale&max_price=1500').get_json()["data"]]
+    assert created["id"] in ids
+    updated = client.put(f'/services/{created["id"]}', json={"is_on_sale": False}).get_json()["data"]
+    assert updated["effective_price"] == 5000.0
+    assert client.get('/services?category=venue_sale&max_price=1500').get_json()["data"] == []
+    for path in ('/services', '/services/export', '/services/available?location=paris'):
+        for query in ('min_price=abc', 'max_price=nan', 'min_price=1&max_price='):
+            response = client.get(f'{path}{"&" if "?" in path else "?"}{query}')
+            assert response.status_code == 400 and "INVALID_PARAM" in response.get_data(as_text=True), (path, query)
+
+def test_updates_write_derived_fields_with_their_inputs(client, monkeypatch):
+    sid = client.post('/services', json={
+        "name": {"en": "One Write"}, "description": {"en": "One write"}, "category": "one_write", "vendor_id": "vendor1", "base_price": 100,
+    }).get_json()["data"]["id"]
+    collection = app.extensions["search_sync"].service_repo.collection
+    writes = []
+    for name in ("find_one_and_update", "update_one", "update_many", "bulk_write"):
+        original = getattr(collection, name)
+        monkeypatch.setattr(collection, name, lambda *args, _name=name, _original=original, **kwargs: writes.append(_name) or _original(*args, **kwargs))
+    assert client.put(f'/services/{sid}', json={"base_price": 150}).get_json()["data"]["effective_price"] == 150.0
+    assert writes == ["find_one_and_update"]
+    writes.clear()
+    assert client.patch('/services/bulk', json=[{"id": sid, "base_price": 90}, {"id": sid, "is_on_sale": True, "sale_price": 80}]).status_code == 200
+    assert writes == ["bulk_write"]
+    assert client.get(f'/services/{sid}').get_json()["data"]["effective_price"] == 80.0
+    monkeypatch.undo()
+
+    # A write landing between the read and the guarded write makes the update recompute from it
+    find_one = collection.find_one
+    def racing_find_one(*args, **kwargs):
+        current = find_one(*args, **kwargs)
+        if not writes:
+            writes.append("concurrent")
+            collection.update_one({"id": sid}, {"$set": {"sale_price": 50, "updated_at": "9999"}})
+        return current
+    monkeypatch.setattr(collection, "find_one", racing_find_one)
+    writes.clear()
+    assert client.put(f'/services/{sid}', json={"base_price": 200}).get_json()["data"]["effective_price"] == 50.0
+
+def test_malformed_pricing_rule_dates_are_rejected(client):
+    bad_rules = [{"rule_type": "promo", "price": 10.0, "valid_from": "next tuesday"}]
+    body = {"name": {"en": "Bad Dates"}, "description": {"en": "Bad dates"}, "category": "bad_dates", "vendor_id": "vendor1"}
+    before = client.get('/services?category=bad_dates').get_json()["data"]
+    response = client.post('/services', json={**body, "pricing_rules": bad_rules})
+    assert response.status_code == 400
+    assert "pricing_rules[0].valid_from" in response.get_data(as_text=True)
+    assert client.post('/services/bulk', json=[body, {**body, "pricing_rules": bad_rules}]).status_code == 400
+    assert client.get('/services?category=bad_dates').get_json()["data"] == before
+
+    sid = client.post('/services', json={**body, "base_price": 100}).get_json()["data"]["id"]
+    assert client.put(f'/services/{sid}', json={"pricing_rules": bad_rules}).status_code == 400
+    assert client.patch('/services/bulk', json=[{"id": sid, "pricing_rules": bad_rules}]).status_code == 400
+    assert client.get(f'/services/{sid}').get_json()["data"].get("pricing_rules") in (None, [])
+
+    # Documents stored before validation existed are skipped by the refresh pass rather than aborting it
+    app.extensions["storage"].database()["services"].update_one({"id": sid}, {"$set": {"pricing_rules": bad_rules}})
+    result = app.test_cli_runner().invoke(args=["refresh-derived-fields", "--all"])
+    assert result.exit_code == 0, result.output
+
+def test_available_services_by_location_and_time(client):
+    def create(name, **fields):
+        body = {"name": {"en": name}, "description": {"en": name}, "category": "avail_test", "vendor_id": "vendor1", **fields}
+        return client.post('/services', json=body).get_json()["data"]["id"]
+    summer = create("Summer Lawn", available_locations=["Goa"], availability_rules=[
+        {"valid_from": "2025-05-01T00:00:00+00:00", "valid_to": "2025-09-01T00:00:00+00:00", "conditions": {"days": ["sat", "sun"]}}])
+    anywhere = create("Anywhere Band", availability_rules=[
+        {"is_available": False, "valid_from": "2025-06-01T00:00:00+00:00", "valid_to": "2025-06-30T00:00:00+00:00"}])
+
+    def available(at):
+        response = client.get(f'/services/available?location=goa&at={at}&category=avail_test')
+        assert response.status_code == 200
+        return {s["id"] for s in response.get_json()["data"]}
+    assert available("2025-07-05T12:00:00") == {summer, anywhere}  # a Saturday
+    assert available("2025-07-07T12:00:00") == {anywhere}  # a Monday
+    assert available("2025-06-14T12:00:00") == {summer}  # blackout of the band
+    client.put(f'/services/{summer}', json={"available_locations": ["Pune"]})
+    assert available("2025-07-05T12:00:00") == {anywhere}
+    assert client.get('/services/available').status_code == 400
+    assert client.get('/services/available?location=goa&pageSize=0').status_code == 400
+    assert client.get('/services/available?location=goa&page=x').status_code == 400
+
+def test_refresh_pass_reindexes_search(client):
+    sid = client.post('/services', json={"name": {"en": "Quokka Garden"}, "description": {"en": "Garden"}, "category": "refresh_search",
+                                          "vendor_id": "vendor1", "base_price": 300}).get_json()["data"]["id"]
+    # A price written behind the API's back, picked up by the backfill
+    app.extensions["storage"].database()["services"].update_one({"id": sid}, {"$set": {"base_price": 120}})
+    assert app.test_cli_runner().invoke(args=["refresh-derived-fields", "--all"]).exit_code == 0
+    hits = client.get('/services/search?q=quokka').get_json()["data"]
+    assert [(h["id"], h["effective_price"]) for h in hits] == [(sid, 120.0)]
+
+def test_responses_omit_internal_derived_fields(client):
+    internal = {"availability_index", "availability_blackouts", "price_refresh_at"}
+    created = client.post('/services', json={"name": {"en": "Ocelot Terrace"}, "description": {"en": "Terrace"}, "category": "internal_fields",
+                                              "vendor_id": "vendor1", "base_price": 10, "available_locations": ["Goa"],
+                                              "pricing_rules": [{"price": 5, "valid_from": "2999-01-01T00:00:00+00:00"}]}).get_json()["data"]
+    sid = created["id"]
+    docs = [created,
+            client.get(f'/services/{sid}').get_json()["data"],
+            client.put(f'/services/{sid}', json={"base_price": 12}).get_json()["data"],
+            *client.get('/services?category=internal_fields').get_json()["data"],
+            *client.get('/services?category=internal_fields&lang=en').get_json()["data"],
+            *client.get('/services/search?q=ocelot').get_json()["data"],
+            *client.get('/services/available?location=goa&category=internal_fields').get_json()["data"],
+            *[json.loads(line) for line in client.get('/services/export?category=internal_fields').get_data(as_text=True).splitlines()]]
+    assert len(docs) >= 8 and all(not internal & doc.keys() and "effective_price" in doc for doc in docs)
+    assert not internal & client.get(f'/services/{sid}?fields=availability_index,price_refresh_at').get_json()["data"].keys()
+
+def test_malformed_availability_rules_are_rejected(client):
+    body = {"name": {"en": "Bad Rules"}, "description": {"en": "Bad rules"}, "category": "bad_rules", "vendor_id": "vendor1"}
+    for rules in ([{"valid_to": "2025-13-45"}], [{"conditions": {"months": ["june"]}}],
+                  [{"conditions": {"months": [13]}}], [{"conditions": {"days": ["someday"]}}]):
+        assert client.post('/services', json={**body, "availability_rules": rules}).status_code == 400
+    sid = client.post('/services', json={**body, "available_locations": ["Goa"]}).get_json()["data"]["id"]
+    assert client.put(f'/services/{sid}', json={"availability_rules": [{"conditions": {"months": ["june"]}}]}).status_code == 400
+    assert client.patch('/services/bulk', json=[{"id": sid, "availability_rules": [{"valid_from": "soon"}]}]).status_code == 400
+
+    # A malformed stored rule is skipped when flattening; the valid rule still applies
+    from src.domain.service.availability import compute_availability
+    flattened = compute_availability({"available_locations": ["Goa"], "availability_rules": [
+        {"conditions": {"months": ["june"]}}, {"valid_from": "2025-05-01T00:00:00+00:00", "conditions": {"months": [5]}}]})
+    assert flattened["availability_index"] == [{"loc": "goa", "from": "2025-05-01T00:00:00+00:00", "to": "9999-12-31T23:59:59+00:00", "months": [5]}]
+
+def test_service_graph_resolves_bundle_with_cycles(client):
+    def create(name, **fields):
+        body = {"name": {"en": name}, "description": {"en": name}, "category": "graph_test", "vendor_id": "vendor1", **fields}
+        return client.post('/services', json=body).get_json()["data"]["id"]
+    package = create("Wedding Package", service_type="package")
+    composite = create("Decor", service_type="composite", parent_service_ids=[package])
+    flowers = create("Flowers", service_type="atomic", parent_service_ids=[composite])
+    lights = create("Lights", service_type="atomic", parent_service_ids=[composite], related_service_ids=[package])
+    client.put(f'/services/{package}', json={"parent_service_ids": [lights]})  # a cycle
+
+    response = client.get(f'/services/{package}/graph?depth=5&fields=name')
+    assert response.status_code == 200
+    graph = response.get_json()["data"]
+    depths = {n["service"]["id"]: n["depth"] for n in graph["nodes"]}
+    assert depths == {package: 0, composite: 1, flowers: 2, lights: 2}
+    edges = {(e["from"], e["to"], e["type"]) for e in graph["edges"]}
+    assert (lights, package, "child") in edges and (composite, flowers, "child") in edges
+
+    shallow = client.get(f'/services/{package}/graph?depth=1&include=children,related&expand=vendor').get_json()["data"]
+    assert [n["service"]["id"] for n in shallow["nodes"]] == [package, composite]
+    assert "vendorDetails" in shallow["nodes"][0]["service"]
+    assert client.get(f'/services/{package}/graph?depth=99').status_code == 400
+    assert client.get(f'/services/{package}/graph?include=siblings').status_code == 400
+    assert client.get('/services/missing/graph').status_code == 404
+
+def test_list_facets_in_one_aggregation(client):
+    for i, (tags, price, sale) in enumerate([(["outdoor"], 500, False), (["outdoor", "music"], 3000, True), (["music"], 20000, False)]):
+        client.post('/services', json={"name": {"en": f"Facet {i}"}, "description": {"en": "f"}, "category": "facet_test",
+                                       "vendor_id": "vendor1", "tags": tags, "base_price": price, "is_on_sale": sale, "sale_price": price - 100})
+    response = client.get('/services?category=facet_test&facets=tags,price,is_on_sale&pageSize=2&sort_by=base_price')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [s["base_price"] for s in body["data"]] == [500, 3000]
+    assert "total_items" not in body["pagination"]
+    assert client.get('/services?category=facet_test&facets=tags&total=exact').get_json()["pagination"]["total_items"] == 3
+    assert "total_items" not in client.get('/services?category=facet_test&facets=tags&cursor=').get_json()["pagination"]
+    assert {(f["value"], f["count"]) for f in body["facets"]["tags"]} == {("outdoor", 2), ("music", 2)}
+    assert body["facets"]["price"] == [{"min": 0, "max": 1000, "count": 1}, {"min": 1000, "max": 5000, "count": 1},
+                                       {"min": 10000, "max": 50000, "count": 1}]
+    assert {(f["value"], f["count"]) for f in body["facets"]["is_on_sale"]} == {(True, 1), (False, 2)}
+
+    cached = client.get('/services?category=facet_test&facets=tags,price,is_on_sale&pageSize=2&page=2&sort_by=base_price').get_json()
+    assert cached["facets"] == body["facets"] and [s["base_price"] for s in cached["data"]] == [20000]
+    cursor = client.get('/services?category=facet_test&facets=category&cursor=&pageSize=1').get_json()
+    assert cursor["facets"]["category"] == [{"value": "facet_test", "count": 3}] and len(cursor["data"]) == 1
+    assert client.get('/services?facets=color').status_code == 400
+
+def test_suggest_prefixes_follow_writes(client):
+    def create(name, tags, popularity=0):
+        body = {"name": name, "description": {"en": "x"}, "category": "Zumba Classes", "vendor_id": "vendor1",
+                "tags": tags, "metadata": {"popularity": popularity}}
+        return client.post('/services', json=body).get_json()["data"]["id"]
+    quiet = create({"en": "Zydeco Night", "fr": "Soirée Zydeco"}, ["zydeco"])
+    loud = create({"en": "Zydeco Brunch"}, ["zydeco"], popularity=1000)
+
+    def suggest(query):
+        response = client.get(f'/services/suggest?{query}')
+        assert response.status_code == 200
+        return response.get_json()["data"]
+    top = suggest("q=zyd&limit=3")
+    assert top[0] == {"text": "zydeco", "type": "tag", "services": 2}
+    assert [s["id"] for s in top[1:]] == [loud, quiet]
+    assert [s["text"] for s in suggest("q=Soiree&lang=fr")] == ["Soirée Zydeco"]
+    assert suggest("q=soiree&lang=en") == []
+    assert suggest("q=ZUMBA cl")[0]["type"] == "category"
+
+    client.put(f'/services/{loud}', json={"name": {"en": "Jazz Brunch"}, "tags": []})
+    assert [s["id"] for s in suggest("q=zydeco n") if s["type"] == "service"] == [quiet]
+    client.delete(f'/services/{quiet}')
+    assert suggest("q=zyd") == []
+    assert client.get('/services/suggest?q=a&limit=500').status_code == 400
+
+def test_suggest_index_ranks_like_a_scan():
+    from src.infrastructure.search_indexer import SUGGEST_BURST_SIZE, SuggestIndex
+    index = SuggestIndex()
+    docs = [{"id": f"s{i}", "name": {"en": f"Premium Package {i}"}, "tags": [f"tag{i % 7}"], "category": "venue",
+             "metadata": {"popularity": i}} for i in range(SUGGEST_BURST_SIZE * 3)]
+    for doc in docs:
+        index.index_service(doc)
+    index.warm()
+    for doc in docs[::5]:
+        index.index_service({**doc, "metadata": {"popularity": 0}})
+    index.remove_service("s191")
+
+    def scan(prefix):
+        popularity = {d["id"]: 0 if int(d["id"][1:]) % 5 == 0 else d["metadata"]["popularity"] for d in docs}
+        names = {d["id"]: d["name"]["en"].lower() for d in docs if d["id"] != "s191"}
+        return sorted((i for i, name in names.items() if name.startswith(prefix)), key=lambda i: (-popularity[i], names[i]))[:5]
+    for prefix in ("premium", "premium package 1", "premium package 19"):
+        assert [s["id"] for s in index.suggest(prefix, limit=5)] == scan(prefix)
+    assert [s["id"] for s in index.suggest("package 18", limit=3)] == ["s189", "s188", "s187"]
+
+def test_suggest_index_batches_rank_like_a_fresh_index():
+    import random
+    from src.infrastructure.search_indexer import SuggestIndex
+    rng = random.Random(7)
+    words = ["grand", "garden", "gala", "river", "royal", "rose", "studio", "sunset"]
+
+    def doc(i):
+        return {"id": f"s{i}", "name": {"en": f"{rng.choice(words)} {rng.choice(words)} {i}", "fr": f"{rng.choice(words)} {i}"},
+                "tags": rng.sample(["garden party", "gala dinner", "rooftop", "riverside"], 2), "category": rng.choice(["venue", "catering"]),
+                "metadata": {"popularity": rng.randint(0, 1000)}}
+    final = {f"s{i}": doc(i) for i in range(300)}
+    index = SuggestIndex()
+    index.index_services(final.values())
+    prefixes = ("g", "ga", "gar", "r", "ro", "river", "s", "sunset", "v", "c")
+
+    def rank(suggest_index):
+        return [suggest_index.suggest(prefix, lang, 10) for prefix in prefixes for lang in (None, "en", "fr")]
+    rank(index)
+    # Bulk writes touching shared tags and categories: updates, soft deletes and new services in each batch
+    for batch in range(10):
+        docs = [doc(rng.randrange(320)) for _ in range(30)]
+        docs += [{"id": f"s{rng.randrange(320)}", "is_deleted": True} for _ in range(5)]
+        index.index_services(docs)
+        for d in docs:
+            if d.get("is_deleted"):
+                final.pop(d["id"], None)
+            else:
+                final[d["id"]] = d
+        rank(index)
+    # Additions only: shared entries gain weight and overtake each other within the cached rankings
+    docs = [{**doc(400 + i), "tags": ["rooftop", "riverside"][:1 + i % 2], "metadata": {"popularity": 10 ** 6}} for i in range(20)]
+    index.index_services(docs)
+    final.update((d["id"], d) for d in docs)
+    fresh = SuggestIndex()
+    for d in final.values():
+        fresh.index_service(d)
+    assert rank(index) == rank(fresh)
+
+def test_conditional_get_and_compression(client):
+    sid = client.post('/services', json={"name": {"en": "Etag Hall"}, "description": {"en": "x" * 2000},
+                                         "category": "etag_test", "vendor_id": "vendor1"}).get_json()["data"]["id"]
+    first = client.get(f'/services/{sid}?expand=')
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"') and "Last-Modified" in first.headers
+    assert client.get(f'/services/{sid}?expand=', headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f'/services/{sid}?expand=', headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert client.get(f'/services/{sid}?expand=&fields=name', headers={"If-None-Match": etag}).status_code == 200
+
+    listing = client.get('/services?category=etag_test')
+    assert client.get('/services?category=etag_test', headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+    client.put(f'/services/{sid}', json={"name": {"en": "Renamed Etag Hall"}})
+    assert client.get(f'/services/{sid}?expand=', headers={"If-None-Match": etag}).status_code == 200
+    assert client.get('/services?category=etag_test', headers={"If-None-Match": listing.headers["ETag"]}).status_code == 200
+
+    compressed = client.get(f'/services/{sid}?expand=', headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in compressed.headers["Vary"]
+    assert json.loads(gzip.decompress(compressed.data))["data"]["name"]["en"] == "Renamed Etag Hall"
+    assert "Content-Encoding" not in client.get(f'/services/{sid}?expand=&fields=name', headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get(f'/services/{sid}?expand=', headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+    listing = client.get('/services?category=etag_test')
+    client.delete(f'/services/{sid}')
+    assert client.get('/services?category=etag_test', headers={"If-None-Match": listing.headers["ETag"]}).status_code == 200
+
+def test_change_feed_resumes_from_token(client):
+    token, has_more = "", True
+    while has_more:  # catch up with everything written so far
+        page = client.get(f'/changes?since={token}&limit=1000').get_json()["pagination"]
+        token, has_more = page["next_token"], page["has_more"]
+
+    sid = client.post('/services', json={"name": {"en": "Feed Hall"}, "description": {"en": "x"}, "category": "feed_test", "vendor_id": "vendor1"}).get_json()["data"]["id"]
+    client.put(f'/services/{sid}', json={"base_price": 10})
+    vid = client.post('/vendors', json={"name": {"en": "Feed Vendor"}, "description": {"en": "v"}, "contact_info": {"email": "f@example.com", "phone": "1"}}).get_json()["data"]["id"]
+    client.delete(f'/vendors/{vid}')
+
+    first = client.get(f'/changes?since={token}&limit=1').get_json()
+    assert [(e["type"], e["id"], e["op"]) for e in first["data"]] == [("service", sid, "updated")]
+    assert first["data"][0]["document"]["base_price"] == 10 and first["pagination"]["has_more"]
+    rest = client.get(f'/changes?since={first["pagination"]["next_token"]}').get_json()
+    assert [(e["type"], e["id"], e["op"], e["document"]) for e in rest["data"]] == [("vendor", vid, "deleted", None)]
+    assert not rest["pagination"]["has_more"]
+    assert client.get(f'/changes?since={rest["pagination"]["next_token"]}&types=services').get_json()["data"] == []
+    assert client.get('/changes?since=garbage').status_code == 400
+    assert client.get('/changes?types=orders').status_code == 400
+
+def test_memory_backend_indexes_match_a_scan():
+    from pymongo import errors
+    from src.infrastructure.indexes import apply_indexes
+    from src.infrastructure.storage import create_backend
+    db = create_backend("memory").database("memory_backend_test")
+    docs = [{"id": f"s{i:03}", "category": ["venue", "catering", "decor"][i % 3], "base_price": [100, 250.5, None][i % 3 if i % 7 else 2],
+             "tags": [f"t{i % 4}", f"t{i % 5}"], "is_deleted": i % 6 == 0} for i in range(120)]
+    db.services.insert_many([dict(d) for d in docs])
+    apply_indexes(db)
+    db.services.update_many({"category": "decor"}, {"$set": {"base_price": 75}})
+    for d in docs:
+        d["base_price"] = 75 if d["category"] == "decor" else d["base_price"]
+
+    def scan(match, key, reverse=False):
+        return [d["id"] for d in sorted((d for d in docs if match(d)), key=key, reverse=reverse)]
+    price = lambda d: (d["base_price"] is not None, d["base_price"] or 0, d["id"])
+    active = {"is_deleted": False}
+    assert [d["id"] for d in db.services.find(active, {"_id": 0}).sort([("base_price", 1), ("id", 1)]).skip(10).limit(15)] == \
+        scan(lambda d: not d["is_deleted"], price)[10:25]
+    assert [d["id"] for d in db.services.find({**active, "base_price": {"$gte": 100}}).sort([("base_price", -1), ("id", -1)])] == \
+        scan(lambda d: not d["is_deleted"] and (d["base_price"] or 0) >= 100, price, reverse=True)
+    assert [d["id"] for d in db.services.find({"category": {"$in": ["venue", "decor"]}, "tags": "t3"}).sort("id", 1)] == \
+        scan(lambda d: d["category"] in ("venue", "decor") and "t3" in d["tags"], lambda d: d["id"])
+    assert db.services.count_documents({"base_price": None}) == sum(d["base_price"] is None for d in docs)
+    assert db.services.find({"category": "venue"}).explain()["queryPlanner"]["winningPlan"]["inputStage"]["indexName"].startswith("category_")
+    db.services.update_one({"id": "s001"}, {"$set": {"is_deleted": True}})
+    assert db.services.find_one({"id": "s001", **active}) is None
+    with pytest.raises(errors.DuplicateKeyError):
+        db.services.insert_one({"id": "s002"})
+
+def test_storage_backends_must_implement_databases():
+    from src.infrastructure.storage import StorageBackend
+    class Incomplete(StorageBackend):
+        def database(self, db_name=None):
+            return None
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_gunicorn_workers_warm_their_own_app():
+    import runpy
+    from types import SimpleNamespace
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py'))
+    assert conf["workers"] >= 1 and conf["graceful_timeout"] > 0
+    worker_app = create_app({"STORAGE_BACKEND": "memory"})
+    storage = worker_app.extensions["storage"].database()
+    assert "id_unique" not in storage.services.index_information()  # building the app does no I/O
+    conf["post_worker_init"](SimpleNamespace(wsgi=worker_app))
+    assert "id_unique" in storage.services.index_information()
+
+def test_search_follows_writes_of_other_workers():
+    from src.infrastructure.storage import MemoryBackend
+    # Two workers over one catalog; the background sync is off so that each pass is explicit
+    config = {"TESTING": True, "STORAGE_BACKEND": MemoryBackend(), "CHANGES_SETTLE_SECONDS": 0, "SEARCH_SYNC_SECONDS": 0}
+    writer, reader = create_app(config), create_app(config)
+    writer.extensions["catalog_startup"]()
+    reader.extensions["catalog_startup"]()
+    writes, reads = writer.test_client(), reader.test_client()
+
+    def hits():
+        return [(s["id"], s["effective_price"]) for s in reads.get('/services/search?q=zephyr').get_json()["data"]]
+    sid = writes.post('/services', json={"name": {"en": "Zephyr Pavilion"}, "description": {"en": "Open air"}, "category": "venue",
+                                          "vendor_id": "vendor1", "base_price": 400}).get_json()["data"]["id"]
+    assert hits() == []
+    assert reader.extensions["search_sync"].sync() == 1
+    assert hits() == [(sid, 400.0)]
+    assert reads.get('/services/suggest?q=zeph').get_json()["data"][0]["id"] == sid
+
+    # Hits are read from the repository, so they carry the writer's update once it is synced
+    writes.put(f'/services/{sid}', json={"base_price": 350})
+    reader.extensions["search_sync"].sync()
+    assert hits() == [(sid, 350.0)]
+    writes.delete(f'/services/{sid}')
+    reader.extensions["search_sync"].sync()
+    assert hits() == []
+    assert reads.get('/services/suggest?q=zeph').get_json()["data"] == []
+
+    # The same pass drops vendor cache entries and cached versions made stale by the writer
+    vid = writes.post('/vendors', json={"name": "Zephyr Events", "contact": {"email": "zephyr@vendor.com"}}).get_json()["data"]["id"]
+    etag = reads.get(f'/vendors/{vid}').headers.get("ETag")
+    assert reads.get(f'/vendors/{vid}').get_json()["data"]["name"] == "Zephyr Events"
+    writes.put(f'/vendors/{vid}', json={"name": "Zephyr Events Ltd"})
+    reader.extensions["search_sync"].sync()
+    response = reads.get(f'/vendors/{vid}', headers={"If-None-Match": etag} if etag else {})
+    assert response.status_code == 200 and response.get_json()["data"]["name"] == "Zephyr Events Ltd"
+
+def test_vendor_summary_maintained_by_service_writes(client):
+    vid = client.post('/vendors', json={"name": "Summary Vendor", "contact": {"email": "summary@vendor.com"},
+                                         "rating": {"average": 4.0, "count": 3}}).get_json()["data"]["id"]
+    def create(category, price, on_sale=False):
+        return client.post('/services', json={"name": {"en": f"{category} {price}"}, "category": category, "vendor_id": vid,
+                                              "base_price": price, "is_on_sale": on_sale}).get_json()["data"]["id"]
+    hall, room, menu = create("venue", 100, True), create("venue", 50), create("catering", 200)
+    summary = client.get(f'/vendors/{vid}/summary').get_json()["data"]
+    assert summary["rating"]["average"] == 4.0
+    assert (summary["active_services"], summary["on_sale_services"]) == (3, 1)
+    assert summary["categories"] == {"catering": 1, "venue": 2}
+    assert (summary["min_base_price"], summary["max_base_price"]) == (50, 200)
+
+    client.put(f'/services/{menu}', json={"base_price": 80})  # the max leaves: bounds are recomputed
+    client.put(f'/services/{room}', json={"category": "catering"})
+    client.delete(f'/services/{hall}')
+    response = client.get(f'/vendors/{vid}/summary')
+    summary = response.get_json()["data"]
+    assert (summary["active_services"], summary["on_sale_services"]) == (2, 0)
+    assert summary["categories"] == {"catering": 2}
+    assert (summary["min_base_price"], summary["max_base_price"]) == (50, 80)
+    assert client.get(f'/vendors/{vid}/summary', headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    # Drift is repaired by the rebuild job
+    app.extensions["storage"].database().vendor_summaries.update_one({"vendor_id": vid}, {"$set": {"active_services": 99}})
+    assert app.test_cli_runner().invoke(args=["rebuild-vendor-summaries", "--vendor", vid]).exit_code == 0
+    listed = {v["id"]: v for v in client.get('/vendors?expand=summary').get_json()["data"]}
+    assert listed[vid]["summary"]["active_services"] == 2
+    assert listed[vid]["summary"]["categories"] == {"catering": 2}
+    assert client.get('/vendors/missing-vendor/summary').status_code == 404